@@ -14,3 +14,17 @@ python -m grpc_tools.protoc \
 # Removed unwanted __init__.py
 rm -f $PYTHON_SDK_OUTPUT_PATH/src/__init__.py
 
+# Generate google.protobuf code for the protobuf codec backend, under a package path so that it is importable as
+# redactive.grpc.v2.protobuf
+PROTO_ROOT=$(mktemp -d)
+PROTO_DIR=$PROTO_ROOT/redactive/grpc/v2/protobuf
+mkdir -p $PROTO_DIR
+cp protos/chunks.proto protos/search.proto $PROTO_DIR
+sed -i 's|import "chunks.proto";|import "redactive/grpc/v2/protobuf/chunks.proto";|' $PROTO_DIR/search.proto
+python -m grpc_tools.protoc \
+    --proto_path=$PROTO_ROOT \
+    --python_out=$PYTHON_SDK_OUTPUT_PATH/src \
+    --pyi_out=$PYTHON_SDK_OUTPUT_PATH/src \
+    $PROTO_DIR/chunks.proto $PROTO_DIR/search.proto
+rm -rf $PROTO_ROOT
+
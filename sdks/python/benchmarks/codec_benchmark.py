@@ -0,0 +1,107 @@
+"""
+Compare the time taken by each codec backend to decode large search and document responses.
+
+Run with `python benchmarks/codec_benchmark.py` from `sdks/python`.
+"""
+
+import argparse
+import timeit
+from datetime import UTC, datetime
+
+from redactive.codecs import CodecBackend, decode
+from redactive.grpc.v2 import (
+    Chunk,
+    ChunkMetadata,
+    ChunkReference,
+    GetDocumentResponse,
+    RelevantChunk,
+    RelevantChunkRelevance,
+    SearchChunksResponse,
+    SourceReference,
+)
+
+
+def _source(i: int) -> SourceReference:
+    return SourceReference(
+        system="confluence",
+        system_version="1.0.0",
+        connection_id="space",
+        document_id=f"document-{i // 10}",
+        document_version="42",
+        document_path=f"redactiveai.atlassian.net/Engineering/Document {i // 10}",
+        document_name=f"Document {i // 10}",
+    )
+
+
+def _metadata(i: int) -> ChunkMetadata:
+    created = datetime(2024, 1, 1, tzinfo=UTC)
+    return ChunkMetadata(created_at=created, modified_at=created, link=f"https://example.com/{i // 10}")
+
+
+def search_response(chunks: int, body_size: int) -> bytes:
+    return bytes(
+        SearchChunksResponse(
+            success=True,
+            relevant_chunks=[
+                RelevantChunk(
+                    source=_source(i),
+                    chunk=ChunkReference(chunking_version="1.0.0", chunk_id=str(i), chunk_hash=f"{i:064x}"),
+                    relevance=RelevantChunkRelevance(similarity_score=1 / (i + 1)),
+                    chunk_body="x" * body_size,
+                    document_metadata=_metadata(i),
+                )
+                for i in range(chunks)
+            ],
+            providers_used=["confluence"],
+        )
+    )
+
+
+def document_response(chunks: int, body_size: int) -> bytes:
+    return bytes(
+        GetDocumentResponse(
+            success=True,
+            chunks=[
+                Chunk(
+                    source=_source(0),
+                    chunk=ChunkReference(chunking_version="1.0.0", chunk_id=str(i), chunk_hash=f"{i:064x}"),
+                    chunk_body="x" * body_size,
+                    document_metadata=_metadata(0),
+                )
+                for i in range(chunks)
+            ],
+            providers_used=["confluence"],
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--body-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'response':<24}{'chunks':>8}{'betterproto (ms)':>20}{'protobuf (ms)':>16}{'speedup':>10}")
+    for name, message_type, build in (
+        ("SearchChunksResponse", SearchChunksResponse, search_response),
+        ("GetDocumentResponse", GetDocumentResponse, document_response),
+    ):
+        for chunks in args.chunks:
+            data = build(chunks, args.body_size)
+            timings = {}
+            for backend in CodecBackend:
+                number = max(1, 1000 // chunks)
+                best = min(
+                    timeit.repeat(lambda: decode(message_type, data, backend), number=number, repeat=args.repeat)
+                )
+                timings[backend] = best / number * 1000
+            speedup = timings[CodecBackend.Betterproto] / timings[CodecBackend.Protobuf]
+            print(
+                f"{name:<24}{chunks:>8}{timings[CodecBackend.Betterproto]:>20.3f}"
+                f"{timings[CodecBackend.Protobuf]:>16.3f}{speedup:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from grpclib.client import Channel
+from grpclib.exceptions import StreamTerminatedError
+
+
+class ChannelPool:
+    def __init__(self, host: str, port: int, size: int = 1) -> None:
+        """
+        A fixed-size pool of lazily opened gRPC channels to a single host.
+
+        Each call is dispatched to the channel with the fewest calls in flight, so that large responses on one HTTP/2
+        connection do not hold up calls on the others.
+
+        :param host: The hostname or IP address to connect to.
+        :type host: str
+        :param port: The port number to connect to.
+        :type port: int
+        :param size: The number of channels in the pool. Defaults to 1.
+        :type size: int, optional
+        """
+        if size < 1:
+            msg = "Channel pool size must be at least 1"
+            raise ValueError(msg)
+
+        self.host = host
+        self.port = port
+        self.size = size
+        self._channels: list[Channel | None] = [None] * size
+        self._in_flight = [0] * size
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._next = 0
+
+    @property
+    def in_flight(self) -> list[int]:
+        """Number of calls currently in flight on each channel of the pool."""
+        return list(self._in_flight)
+
+    def _pick(self) -> int:
+        # Least loaded channel, with ties broken round-robin so that idle channels share the load evenly
+        start = self._next
+        self._next = (self._next + 1) % self.size
+        return min(((start + offset) % self.size for offset in range(self.size)), key=self._in_flight.__getitem__)
+
+    def _get_channel(self, index: int) -> Channel:
+        # grpclib binds a channel to the event loop it was created on, so channels are recreated if the pool is
+        # reused from another loop. A channel reconnects by itself if its HTTP/2 connection has been lost.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._loop is not None and not self._loop.is_closed():
+                self.close()
+            self._channels = [None] * self.size
+            self._loop = loop
+        channel = self._channels[index]
+        if channel is None:
+            channel = self._channels[index] = Channel(self.host, self.port, ssl=True)
+        return channel
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Channel]:
+        """
+        Reserve the least loaded channel for the duration of a call.
+        """
+        index = self._pick()
+        channel = self._get_channel(index)
+        self._in_flight[index] += 1
+        try:
+            yield channel
+        except TimeoutError:
+            # A call exceeding its deadline says nothing about the connection, which other calls may be using. This
+            # must come first, as TimeoutError is an OSError.
+            raise
+        except (OSError, StreamTerminatedError):
+            # Drop a channel whose connection failed mid-call so that the next call starts from a fresh connection
+            if self._channels[index] is channel:
+                channel.close()
+                self._channels[index] = None
+            raise
+        finally:
+            self._in_flight[index] -= 1
+
+    def close(self) -> None:
+        """
+        Close all open channels. Channels are reopened on the next call.
+        """
+        for channel in self._channels:
+            if channel is not None:
+                channel.close()
+        self._channels = [None] * self.size
+        self._loop = None
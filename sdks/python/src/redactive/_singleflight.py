@@ -0,0 +1,62 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[K, T]):
+    """
+    Coalesces concurrent calls with the same key into a single call whose result is shared by every caller.
+
+    Only calls that are in flight at the same time are coalesced, so the number of tracked keys is bounded by the
+    number of concurrent calls. Cancelling one caller does not cancel the shared call while other callers are still
+    waiting for it.
+    """
+
+    def __init__(self, *, cancel_abandoned: bool = True) -> None:
+        """
+        :param cancel_abandoned: Cancel the shared call once every caller waiting for it has been cancelled. If False,
+            the call runs to completion regardless, and new callers with the same key join it meanwhile.
+        :type cancel_abandoned: bool, optional
+        """
+        self.cancel_abandoned = cancel_abandoned
+        self._calls: dict[K, tuple[asyncio.Future[T], list[int]]] = {}
+        self.coalesced = 0
+        """ Number of calls that were answered by joining a call already in flight """
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[T]]) -> T:
+        entry = self._calls.get(key)
+        if entry is None:
+            future = asyncio.ensure_future(fn())
+            entry = self._calls[key] = (future, [0])
+            future.add_done_callback(lambda f: self._forget(key, f))
+        else:
+            self.coalesced += 1
+
+        future, waiters = entry
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if self.cancel_abandoned and waiters[0] == 1 and not future.done():
+                # Nobody else is waiting for the result. The key is forgotten now rather than once the cancellation
+                # completes, so that a new caller starts a new call instead of joining the cancelled one.
+                if self._calls.get(key) is entry:
+                    del self._calls[key]
+                future.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def _forget(self, key: K, future: asyncio.Future[T]) -> None:
+        entry = self._calls.get(key)
+        if entry is not None and entry[0] is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved even if every caller has gone away
+            future.exception()
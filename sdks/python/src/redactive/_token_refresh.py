@@ -0,0 +1,147 @@
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from redactive.caching import _LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _ActiveUser:
+    last_active: float
+    id_token_expiry: datetime | None
+    jitter: float
+
+
+class TokenRefreshScheduler:
+    def __init__(
+        self,
+        refresh: Callable[[str], Awaitable[datetime | None]],
+        margin: float,
+        *,
+        jitter: float = 30,
+        max_concurrency: int = 4,
+        active_window: float = 900,
+        max_users: int = 10000,
+        interval: float | None = None,
+    ) -> None:
+        """
+        Background task refreshing the ID tokens of recently active users shortly before they expire.
+
+        :param refresh: Refreshes a user's tokens and returns the new ID token expiry, or None if the user has no
+            session to refresh.
+        :type refresh: Callable[[str], Awaitable[datetime | None]]
+        :param margin: Number of seconds before expiry at which a token is refreshed.
+        :type margin: float
+        :param jitter: Up to this many extra seconds are added to the margin of each user at random, so that tokens
+            issued together are not all refreshed at once. Defaults to 30.
+        :type jitter: float, optional
+        :param max_concurrency: Maximum number of refreshes in flight at once. Defaults to 4.
+        :type max_concurrency: int, optional
+        :param active_window: Users are no longer refreshed once they have been inactive for this many seconds.
+            Defaults to 900.
+        :type active_window: float, optional
+        :param max_users: Maximum number of active users tracked; the least recently active are dropped first.
+            Defaults to 10000.
+        :type max_users: int, optional
+        :param interval: Number of seconds between checks for expiring tokens. Defaults to half the margin, capped
+            at 60 seconds.
+        :type interval: float, optional
+        """
+        self._refresh = refresh
+        self.margin = margin
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.active_window = active_window
+        self.interval = interval if interval is not None else max(1.0, min(margin / 2, 60.0))
+        self._users: _LRUCache[str, _ActiveUser] = _LRUCache(max_entries=max_users)
+        self._task: asyncio.Task[None] | None = None
+        self.refreshes = 0
+        """ Number of tokens refreshed in the background """
+        self.failures = 0
+        """ Number of background refreshes that failed """
+
+    @property
+    def active_users(self) -> int:
+        return len(self._users)
+
+    def touch(self, user_id: str, id_token_expiry: datetime | None) -> None:
+        """
+        Record activity for a user, starting the background task if it is not running.
+        """
+        user = self._users.peek(user_id)
+        if user is None:
+            user = _ActiveUser(time.monotonic(), id_token_expiry, random.uniform(0, self.jitter))  # noqa: S311
+            self._users.set(user_id, user)
+        else:
+            user.last_active = time.monotonic()
+            user.id_token_expiry = id_token_expiry
+        self.start()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Background token refresh failed")
+
+    def _due(self) -> list[str]:
+        now = datetime.now(UTC)
+        inactive_since = time.monotonic() - self.active_window
+        due = []
+        for user_id, user in self._users.items():
+            if user.last_active < inactive_since:
+                self._users.pop(user_id)
+            elif user.id_token_expiry and user.id_token_expiry - now <= timedelta(seconds=self.margin + user.jitter):
+                due.append(user_id)
+        return due
+
+    async def run_once(self) -> int:
+        """
+        Refresh the tokens of every active user whose token is about to expire.
+
+        :return: The number of tokens refreshed.
+        :rtype: int
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _refresh(user_id: str) -> bool:
+            async with semaphore:
+                try:
+                    id_token_expiry = await self._refresh(user_id)
+                except Exception:  # noqa: BLE001
+                    # Retried on the next check, and by the request path once the token has expired
+                    self.failures += 1
+                    logger.warning("Background token refresh failed for user '%s'", user_id, exc_info=True)
+                    return False
+            if id_token_expiry is None:
+                # Nothing to refresh; stop tracking until the user is active again
+                self._users.pop(user_id)
+                return False
+            user = self._users.peek(user_id)
+            if user is not None:
+                user.id_token_expiry = id_token_expiry
+            return True
+
+        refreshed = sum(await asyncio.gather(*(_refresh(user_id) for user_id in self._due())))
+        self.refreshes += refreshed
+        return refreshed
@@ -0,0 +1,71 @@
+from collections.abc import Iterator
+
+VARINT = 0
+FIXED64 = 1
+LENGTH_DELIMITED = 2
+FIXED32 = 5
+
+
+def _read_varint(buffer: memoryview, position: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = buffer[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def iter_fields(data: bytes | memoryview) -> Iterator[tuple[int, int, int | memoryview]]:
+    """
+    Iterate over the top-level fields of a serialized protobuf message without decoding them.
+
+    Yields `(field_number, wire_type, value)`; varints are yielded as integers and every other value as a zero-copy
+    view of its bytes.
+    """
+    for field_number, wire_type, value, _ in iter_field_encodings(data):
+        yield field_number, wire_type, value
+
+
+def iter_field_encodings(data: bytes | memoryview) -> Iterator[tuple[int, int, int | memoryview, memoryview]]:
+    """
+    Like `iter_fields`, additionally yielding a zero-copy view of each field's complete encoding, key included.
+    """
+    buffer = memoryview(data)
+    position = 0
+    end = len(buffer)
+    while position < end:
+        start = position
+        key, position = _read_varint(buffer, position)
+        field_number, wire_type = key >> 3, key & 0x7
+        if wire_type == VARINT:
+            value, position = _read_varint(buffer, position)
+        elif wire_type == LENGTH_DELIMITED:
+            length, position = _read_varint(buffer, position)
+            value = buffer[position : position + length]
+            position += length
+        elif wire_type == FIXED64:
+            value = buffer[position : position + 8]
+            position += 8
+        elif wire_type == FIXED32:
+            value = buffer[position : position + 4]
+            position += 4
+        else:
+            msg = f"Unsupported protobuf wire type {wire_type}"
+            raise ValueError(msg)
+        yield field_number, wire_type, value, buffer[start:position]
+    if position != end:
+        msg = "Truncated protobuf message"
+        raise ValueError(msg)
+
+
+class RawMessage:
+    """
+    Reply type for gRPC calls whose response should be kept as serialized bytes rather than decoded.
+    """
+
+    @classmethod
+    def FromString(cls, data: bytes) -> bytes:  # noqa: N802
+        return data
@@ -1,9 +1,21 @@
+import hashlib
 import http
+import weakref
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Self
 
 import httpx
 from pydantic import BaseModel
 
 from redactive._connection_mode import get_default_http_endpoint as _get_default_http_endpoint
+from redactive.resilience import RateLimitPolicy, RateLimitStats, RetryPolicy, RetryStats, _RateLimiter, _Retrier
+
+_RETRY_AFTER_STATUSES = {http.HTTPStatus.TOO_MANY_REQUESTS, http.HTTPStatus.SERVICE_UNAVAILABLE}
+
+# Rate limiters shared by the clients using the same API key against the same API
+_rate_limiters: weakref.WeakValueDictionary[tuple[str, str], _RateLimiter] = weakref.WeakValueDictionary()
 
 
 class ListConnectionsResponse(BaseModel):
@@ -21,8 +33,85 @@ class BeginConnectionResponse(BaseModel):
     url: str
 
 
+@dataclass
+class ConnectionPoolPolicy:
+    max_connections: int | None = 100
+    """ Maximum number of open connections, or None for no limit """
+    max_keepalive_connections: int | None = 20
+    """ Maximum number of idle connections kept open for reuse, or None for no limit """
+    keepalive_expiry: float | None = 5.0
+    """ Time in seconds after which an idle connection is closed, or None to keep it open """
+    http2: bool = False
+    """ Multiplex requests over HTTP/2 connections where the server supports it; requires `httpx[http2]` """
+    timeout: float | None = 5.0
+    """ Timeout in seconds for connecting, reading, writing and waiting for a pooled connection """
+
+
+def create_http_client(pool: ConnectionPoolPolicy | None = None) -> httpx.AsyncClient:
+    """
+    Create an HTTP client which may be shared by several `AuthClient` instances.
+
+    :param pool: Connection pool settings of the client. Defaults to `ConnectionPoolPolicy()`.
+    :type pool: ConnectionPoolPolicy, optional
+    :raises ImportError: If HTTP/2 is enabled but the `h2` package is not installed.
+    :return: The HTTP client, to be closed by the caller once no longer needed.
+    :rtype: httpx.AsyncClient
+    """
+    if pool is None:
+        pool = ConnectionPoolPolicy()
+    limits = httpx.Limits(
+        max_connections=pool.max_connections,
+        max_keepalive_connections=pool.max_keepalive_connections,
+        keepalive_expiry=pool.keepalive_expiry,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=pool.timeout, http2=pool.http2)
+
+
+class RateLimitedError(httpx.RequestError):
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class _RetryableResponseError(Exception):
+    def __init__(self, response: httpx.Response) -> None:
+        self.response = response
+        super().__init__(f"Retryable response status {response.status_code}")
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(UTC)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    if response.status_code == http.HTTPStatus.OK:
+        return
+    if response.status_code == http.HTTPStatus.TOO_MANY_REQUESTS:
+        raise RateLimitedError(response.text, retry_after=_retry_after(response))
+    raise httpx.RequestError(response.text)
+
+
 class AuthClient:
-    def __init__(self, api_key: str, base_url: str | None = None):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str | None = None,
+        *,
+        retry_policy: RetryPolicy | None = None,
+        rate_limit: RateLimitPolicy | None = None,
+        connection_pool: ConnectionPoolPolicy | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ):
         """
         Initialize the connection settings for the Redactive API.
 
@@ -30,11 +119,99 @@ class AuthClient:
         :type api_key: str
         :param base_url: The base URL to the Redactive API.
         :type base_url: str, optional
+        :param retry_policy: Policy for retrying requests which fail with a retryable status or a connection error.
+            Requests are not retried if None.
+        :type retry_policy: RetryPolicy, optional
+        :param rate_limit: Client-side rate limit on requests, shared by every client in the process using the same
+            API key and base URL; the first client created configures it. Requests are queued until their turn, and
+            paused for as long as the API asks with `Retry-After`. Requests are not limited if None.
+        :type rate_limit: RateLimitPolicy, optional
+        :param connection_pool: Connection pool settings of the HTTP client the AuthClient creates. Ignored if
+            `http_client` is given.
+        :type connection_pool: ConnectionPoolPolicy, optional
+        :param http_client: An HTTP client to send requests with, e.g. one from `create_http_client` shared by several
+            AuthClients. It is not closed by `aclose()`. The AuthClient creates and owns its own client if None.
+        :type http_client: httpx.AsyncClient, optional
         """
         if base_url is None:
             base_url = _get_default_http_endpoint()
 
-        self._client = httpx.AsyncClient(base_url=f"{base_url}", auth=BearerAuth(api_key))
+        self._base_url = f"{base_url}".rstrip("/")
+        self._auth = BearerAuth(api_key)
+        self._owns_client = http_client is None
+        self._client = http_client if http_client is not None else create_http_client(connection_pool)
+        self._retrier = _Retrier(retry_policy) if retry_policy is not None else None
+        self._rate_limiter: _RateLimiter | None = None
+        if rate_limit is not None:
+            key = (f"{base_url}", hashlib.sha256(api_key.encode()).hexdigest())
+            self._rate_limiter = _rate_limiters.get(key)
+            if self._rate_limiter is None:
+                self._rate_limiter = _rate_limiters[key] = _RateLimiter(rate_limit)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close the connections of the HTTP client, unless it was passed in as `http_client`.
+        """
+        if self._owns_client:
+            await self._client.aclose()
+
+    @property
+    def retry_stats(self) -> RetryStats:
+        """Attempt, retry and retry budget counters."""
+        return self._retrier.stats if self._retrier is not None else RetryStats()
+
+    @property
+    def rate_limit_stats(self) -> RateLimitStats:
+        """Admitted, delayed and rejected request counters of the shared rate limiter."""
+        return self._rate_limiter.stats if self._rate_limiter is not None else RateLimitStats()
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+        # The base URL and API key are applied per request, as the HTTP client may be shared with other AuthClients
+        kwargs.setdefault("auth", self._auth)
+        response = await self._client.request(method, f"{self._base_url}{url}", **kwargs)
+        if self._rate_limiter is not None and response.status_code in _RETRY_AFTER_STATUSES:
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                # Hold back every request using this API key, not only this one's retries
+                self._rate_limiter.pause(retry_after)
+        return response
+
+    async def _request(self, method: str, url: str, *, idempotent: bool = True, **kwargs: Any) -> httpx.Response:
+        if self._retrier is None:
+            return await self._send(method, url, **kwargs)
+        retrier = self._retrier
+
+        async def _attempt() -> httpx.Response:
+            response = await self._send(method, url, **kwargs)
+            if response.status_code in retrier.policy.retryable_http_statuses:
+                raise _RetryableResponseError(response)
+            return response
+
+        def _is_retryable(error: Exception) -> bool:
+            if idempotent:
+                return isinstance(error, _RetryableResponseError | httpx.TransportError)
+            # Only retry requests known not to have been processed: a gateway error may hide a processed request
+            if isinstance(error, _RetryableResponseError):
+                return error.response.status_code in _RETRY_AFTER_STATUSES
+            return isinstance(error, httpx.ConnectError | httpx.ConnectTimeout | httpx.PoolTimeout)
+
+        def _requested_delay(error: Exception) -> float | None:
+            if isinstance(error, _RetryableResponseError) and error.response.status_code in _RETRY_AFTER_STATUSES:
+                return _retry_after(error.response)
+            return None
+
+        try:
+            return await retrier.run(_attempt, _is_retryable, retry_after=_requested_delay)
+        except _RetryableResponseError as e:
+            return e.response
 
     async def begin_connection(
         self,
@@ -57,6 +234,8 @@ class AuthClient:
         :type code_param_alias: str, optional
         :param state: An optional parameter that is stored as app_callback_state for building callback url.
         :type state: str, optional
+        :raises RateLimitedError: If the API rejected the request with a rate limit response.
+        :raises RateLimitExceededError: If the client-side rate limit did not admit the request in time.
         :raises httpx.RequestError: If an error occurs while making the HTTP request.
         :return: The URL to redirect the user to for beginning the connection.
         :rtype: BeginConnectionResponse
@@ -68,9 +247,8 @@ class AuthClient:
             params["code_param_alias"] = code_param_alias
         if state:
             params["state"] = state
-        response = await self._client.post(url=f"/api/auth/connect/{provider}/url", params=params)
-        if response.status_code != http.HTTPStatus.OK:
-            raise httpx.RequestError(response.text)
+        response = await self._request("POST", f"/api/auth/connect/{provider}/url", params=params)
+        _raise_for_status(response)
 
         return BeginConnectionResponse(**response.json())
 
@@ -82,6 +260,8 @@ class AuthClient:
         :type code: str, optional
         :param refresh_token: The refresh token used for token refreshing.
         :type refresh_token: str, optional
+        :raises RateLimitedError: If the API rejected the request with a rate limit response.
+        :raises RateLimitExceededError: If the client-side rate limit did not admit the request in time.
         :raises httpx.RequestError: If an error occurs while making the HTTP request.
         :return: An object containing access token and other token information.
         :rtype: ExchangeTokenResponse
@@ -92,9 +272,9 @@ class AuthClient:
         if refresh_token:
             body["refresh_token"] = refresh_token
 
-        response = await self._client.post(url="/api/auth/token", json=body)
-        if response.status_code != http.HTTPStatus.OK:
-            raise httpx.RequestError(response.text)
+        # A refresh token may be rotated by a request whose response is lost, so this request is not idempotent
+        response = await self._request("POST", "/api/auth/token", idempotent=False, json=body)
+        _raise_for_status(response)
 
         return ExchangeTokenResponse(**response.json())
 
@@ -104,14 +284,15 @@ class AuthClient:
 
         :param access_token: The user's access token for authentication..
         :type access_token: str
+        :raises RateLimitedError: If the API rejected the request with a rate limit response.
+        :raises RateLimitExceededError: If the client-side rate limit did not admit the request in time.
         :raises httpx.RequestError: If an error occurs while making the HTTP request.
         :return: An object containing the user ID and current connections.
         :rtype: UserConnections
         """
-        response = await self._client.get("/api/auth/connections", auth=BearerAuth(access_token))
+        response = await self._request("GET", "/api/auth/connections", auth=BearerAuth(access_token))
 
-        if response.status_code != http.HTTPStatus.OK:
-            raise httpx.RequestError(response.text)
+        _raise_for_status(response)
 
         return ListConnectionsResponse(**response.json())
 
@@ -0,0 +1,400 @@
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+from redactive.grpc.v2 import Chunk, GetDocumentResponse, RelevantChunk, SearchChunksRequest, SearchChunksResponse
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    """ Number of lookups answered from the cache """
+    misses: int = 0
+    """ Number of lookups that were not in the cache, or had expired """
+    evictions: int = 0
+    """ Number of entries removed to stay within the cache's entry or byte bounds """
+    entries: int = 0
+    """ Number of entries currently held """
+    bytes: int = 0
+    """ Total size of the entries currently held """
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _LRUCache(Generic[K, V]):
+    """
+    Least-recently-used cache with per-entry expiry, bounded by entry count and, optionally, total entry size.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        on_remove: Callable[[K, V], None] | None = None,
+    ) -> None:
+        if max_entries < 1:
+            msg = "max_entries must be at least 1"
+            raise ValueError(msg)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._on_remove = on_remove
+        self._entries: OrderedDict[K, tuple[V, float | None, int]] = OrderedDict()
+        self._bytes = 0
+        self._stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions,
+            entries=len(self._entries),
+            bytes=self._bytes,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry[1])
+
+    def _expired(self, expires_at: float | None) -> bool:
+        return expires_at is not None and expires_at <= self._clock()
+
+    def get(self, key: K, validate: Callable[[V], bool] | None = None) -> V | None:
+        """
+        Return the value stored under `key`. Expired entries, and entries rejected by `validate`, are dropped and
+        reported as misses.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+        value, expires_at, _ = entry
+        if self._expired(expires_at) or (validate is not None and not validate(value)):
+            self.pop(key)
+            self._stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    def peek(self, key: K) -> V | None:
+        """
+        Return the value stored under `key` without updating its recency or the hit/miss counters.
+        """
+        entry = self._entries.get(key)
+        if entry is None or self._expired(entry[1]):
+            return None
+        return entry[0]
+
+    def items(self) -> list[tuple[K, V]]:
+        """
+        Return the unexpired entries, least recently used first.
+        """
+        return [(key, value) for key, (value, expires_at, _) in self._entries.items() if not self._expired(expires_at)]
+
+    def set(self, key: K, value: V, size: int = 0, expires_at: float | None = None) -> None:
+        """
+        Store `value` under `key`. The entry expires at the earlier of `expires_at` (in the cache clock's time base)
+        and the cache's TTL.
+        """
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Would evict everything else and still not fit
+            self.pop(key)
+            return
+        if self.ttl is not None:
+            ttl_expiry = self._clock() + self.ttl
+            expires_at = ttl_expiry if expires_at is None else min(expires_at, ttl_expiry)
+        self.pop(key)
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            evicted_key, (evicted, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats.evictions += 1
+            if self._on_remove is not None:
+                self._on_remove(evicted_key, evicted)
+
+    def pop(self, key: K) -> V | None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._bytes -= entry[2]
+        if self._on_remove is not None:
+            self._on_remove(key, entry[0])
+        return entry[0]
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self.pop(key)
+
+    def remove_if(self, predicate: Callable[[K], bool]) -> None:
+        """
+        Remove every entry, expired or not, whose key satisfies `predicate`.
+        """
+        for key in [key for key in self._entries if predicate(key)]:
+            self.pop(key)
+
+
+def _token_scope(access_token: str) -> str:
+    # Cache entries are scoped to the exact token rather than to its (unverified) subject claim, so that a result
+    # can only be served to a caller presenting the credentials it was fetched with
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.split()).lower()
+
+
+class SearchCache:
+    def __init__(self, ttl: float = 300, max_entries: int = 1024, max_bytes: int | None = 64 * 1024 * 1024) -> None:
+        """
+        Opt-in TTL and LRU cache of `search_chunks` responses.
+
+        Entries are keyed by the requesting user, the normalized query, the result count and the serialized filters,
+        and are never shared between users. Responses are stored in their serialized form, so every hit returns a
+        fresh object which callers may modify freely.
+
+        :param ttl: Number of seconds a response stays valid for. Defaults to 300.
+        :type ttl: float, optional
+        :param max_entries: Maximum number of responses to hold. Defaults to 1024.
+        :type max_entries: int, optional
+        :param max_bytes: Maximum total serialized size of the held responses, or None for no bound. Defaults to 64MiB.
+        :type max_bytes: int | None, optional
+        """
+        self._cache: _LRUCache[tuple[str, str, int, bytes], bytes] = _LRUCache(
+            max_entries=max_entries, max_bytes=max_bytes, ttl=ttl
+        )
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit, miss and eviction counters and current size of the cache."""
+        return self._cache.stats
+
+    @staticmethod
+    def _key(scope: str, request: SearchChunksRequest) -> tuple[str, str, int, bytes]:
+        filters = bytes(request.filters) if request.filters is not None else b""
+        return scope, _normalize_query(request.query.semantic_query or ""), request.count or 0, filters
+
+    def get(self, scope: str, request: SearchChunksRequest) -> SearchChunksResponse | None:
+        """
+        Return the cached response for a request made on behalf of `scope`, if there is one.
+
+        :param scope: Identifies the user the request is made for, e.g. a user ID.
+        :type scope: str
+        :param request: The search request.
+        :type request: SearchChunksRequest
+        """
+        data = self.get_serialized(scope, request)
+        return SearchChunksResponse().parse(data) if data is not None else None
+
+    def get_serialized(self, scope: str, request: SearchChunksRequest) -> bytes | None:
+        """
+        Return the cached response for a request made on behalf of `scope` in its serialized form, if there is one.
+
+        :param scope: Identifies the user the request is made for, e.g. a user ID.
+        :type scope: str
+        :param request: The search request.
+        :type request: SearchChunksRequest
+        """
+        return self._cache.get(self._key(scope, request))
+
+    def set(self, scope: str, request: SearchChunksRequest, response: SearchChunksResponse) -> None:
+        """
+        Cache a successful response to a request made on behalf of `scope`.
+
+        :param scope: Identifies the user the request is made for, e.g. a user ID.
+        :type scope: str
+        :param request: The search request.
+        :type request: SearchChunksRequest
+        :param response: The response to cache. Unsuccessful responses are not cached.
+        :type response: SearchChunksResponse
+        """
+        if not response.success:
+            return
+        data = bytes(response)
+        self._cache.set(self._key(scope, request), data, size=len(data))
+
+    def invalidate(self, scope: str | None = None) -> None:
+        """
+        Drop cached responses for one user, or for every user if `scope` is None.
+        """
+        if scope is None:
+            self._cache.clear()
+            return
+        self._cache.remove_if(lambda key: key[0] == scope)
+
+
+@dataclass
+class _CachedDocument:
+    version: str
+    chunks: list[tuple[bytes, str]]
+    """ Serialized chunk without its body, and the hash of the body in the chunk store """
+    providers_used: list[str] = field(default_factory=list)
+
+
+class DocumentCache:
+    def __init__(
+        self,
+        ttl: float = 3600,
+        max_documents: int = 256,
+        max_bytes: int | None = 256 * 1024 * 1024,
+        max_tracked_versions: int = 65536,
+    ) -> None:
+        """
+        Opt-in cache of `get_document` responses with content-addressed chunk storage.
+
+        Chunk bodies are stored once per `ChunkReference.chunk_hash`, so chunks that are identical across documents,
+        document versions or users are held in memory only once. A cached document is only served when its
+        `SourceReference.document_version` matches the version the caller expects: either passed explicitly to
+        `get_document`, or the version most recently reported for the document by `search_chunks` results.
+        Cached documents are scoped per user, like `SearchCache`.
+
+        :param ttl: Number of seconds a document stays valid for. Defaults to 3600.
+        :type ttl: float, optional
+        :param max_documents: Maximum number of documents to hold. Defaults to 256.
+        :type max_documents: int, optional
+        :param max_bytes: Maximum total size of the chunk bodies referenced by the held documents, or None for no
+            bound. Defaults to 256MiB.
+        :type max_bytes: int | None, optional
+        :param max_tracked_versions: Maximum number of document versions remembered from search results.
+            Defaults to 65536.
+        :type max_tracked_versions: int, optional
+        """
+        self._documents: _LRUCache[tuple[str, str], _CachedDocument] = _LRUCache(
+            max_entries=max_documents, max_bytes=max_bytes, ttl=ttl, on_remove=self._release
+        )
+        self._versions: _LRUCache[tuple[str, str], str] = _LRUCache(max_entries=max_tracked_versions, ttl=ttl)
+        self._chunk_bodies: dict[str, str] = {}
+        self._chunk_refs: dict[str, int] = {}
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit, miss and eviction counters for document lookups, and the size of the held documents."""
+        return self._documents.stats
+
+    @property
+    def unique_chunks(self) -> int:
+        """Number of distinct chunk bodies held in the chunk store."""
+        return len(self._chunk_bodies)
+
+    @property
+    def chunk_store_bytes(self) -> int:
+        """Total size of the distinct chunk bodies held in the chunk store."""
+        return sum(len(body.encode()) for body in self._chunk_bodies.values())
+
+    @staticmethod
+    def _chunk_hash(chunk: Chunk) -> str:
+        return chunk.chunk.chunk_hash or hashlib.sha256(chunk.chunk_body.encode()).hexdigest()
+
+    def _release(self, _key: tuple[str, str], document: _CachedDocument) -> None:
+        for _, chunk_hash in document.chunks:
+            self._chunk_refs[chunk_hash] -= 1
+            if not self._chunk_refs[chunk_hash]:
+                del self._chunk_refs[chunk_hash]
+                del self._chunk_bodies[chunk_hash]
+
+    def observe(self, scope: str, relevant_chunks: list[RelevantChunk]) -> None:
+        """
+        Record the document versions reported by search results, so that later `get_document` calls for those
+        documents can be validated against them.
+
+        :param scope: Identifies the user the search was made for.
+        :type scope: str
+        :param relevant_chunks: The chunks returned by the search.
+        :type relevant_chunks: list[RelevantChunk]
+        """
+        for relevant_chunk in relevant_chunks:
+            version = relevant_chunk.source.document_version
+            if not version:
+                continue
+            for ref in (relevant_chunk.document_metadata.link, relevant_chunk.source.document_path):
+                if ref:
+                    self._versions.set((scope, ref), version)
+
+    def get(self, scope: str, ref: str, document_version: str | None = None) -> GetDocumentResponse | None:
+        """
+        Return the cached document for `ref` if it is held at the expected version.
+
+        :param scope: Identifies the user the request is made for.
+        :type scope: str
+        :param ref: The document reference passed to `get_document`.
+        :type ref: str
+        :param document_version: The expected document version. Defaults to the version last reported by search
+            results; the cache is bypassed if no version is known.
+        :type document_version: str, optional
+        """
+        if document_version is None:
+            document_version = self._versions.get((scope, ref))
+        # A document that cannot be validated is dropped: it is about to be replaced by a freshly fetched copy
+        document = self._documents.get(
+            (scope, ref), validate=lambda d: bool(d.version) and d.version == document_version
+        )
+        if document is None:
+            return None
+
+        chunks = []
+        for metadata, chunk_hash in document.chunks:
+            chunk = Chunk().parse(metadata)
+            chunk.chunk_body = self._chunk_bodies[chunk_hash]
+            chunks.append(chunk)
+        return GetDocumentResponse(success=True, chunks=chunks, providers_used=list(document.providers_used))
+
+    def set(self, scope: str, ref: str, response: GetDocumentResponse) -> None:
+        """
+        Cache a successful `get_document` response for a request made on behalf of `scope`.
+
+        :param scope: Identifies the user the request is made for.
+        :type scope: str
+        :param ref: The document reference passed to `get_document`.
+        :type ref: str
+        :param response: The response to cache. Unsuccessful or empty responses are not cached.
+        :type response: GetDocumentResponse
+        """
+        if not response.success or not response.chunks:
+            return
+
+        version = response.chunks[0].source.document_version
+        chunks = []
+        size = 0
+        for chunk in response.chunks:
+            chunk_hash = self._chunk_hash(chunk)
+            metadata = bytes(Chunk(source=chunk.source, chunk=chunk.chunk, document_metadata=chunk.document_metadata))
+            chunks.append((metadata, chunk_hash))
+            size += len(metadata) + len(chunk.chunk_body.encode())
+            self._chunk_bodies.setdefault(chunk_hash, chunk.chunk_body)
+            self._chunk_refs[chunk_hash] = self._chunk_refs.get(chunk_hash, 0) + 1
+
+        document = _CachedDocument(version=version, chunks=chunks, providers_used=list(response.providers_used))
+        self._documents.set((scope, ref), document, size=size)
+        if (scope, ref) not in self._documents:
+            # Too large to be held at all
+            self._release((scope, ref), document)
+        if version:
+            self._versions.set((scope, ref), version)
+
+    def invalidate(self, scope: str | None = None) -> None:
+        """
+        Drop cached documents for one user, or for every user if `scope` is None.
+        """
+        if scope is None:
+            self._documents.clear()
+            self._versions.clear()
+            return
+        self._documents.remove_if(lambda key: key[0] == scope)
+        self._versions.remove_if(lambda key: key[0] == scope)
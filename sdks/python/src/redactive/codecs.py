@@ -0,0 +1,174 @@
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+from typing import Any, NamedTuple, TypeVar
+
+import betterproto
+
+M = TypeVar("M", bound=betterproto.Message)
+
+
+class CodecBackend(StrEnum):
+    Betterproto = "betterproto"
+    """ Pure-Python betterproto serialization """
+    Protobuf = "protobuf"
+    """ The `google.protobuf` runtime (upb accelerated where available), converted to `redactive.grpc.v2` messages """
+
+
+class _Field(NamedTuple):
+    name: str
+    repeated: bool
+    has_presence: bool
+    convert: Callable[[Any], Any] | None
+    """ Converts a protobuf value to its betterproto equivalent, or None if it can be used as is """
+    missing: Callable[[], Any] | None
+    """ Builds the value of a field with presence which is not set """
+
+
+_protobuf_types: dict[str, type] | None = None
+_converters: dict[type[betterproto.Message], Callable[[Any], Any]] = {}
+
+
+def _get_protobuf_types() -> dict[str, type]:
+    global _protobuf_types  # noqa: PLW0603
+    if _protobuf_types is None:
+        from redactive.grpc.v2.protobuf import chunks_pb2, search_pb2
+
+        protobuf_types: dict[str, type] = {}
+
+        def _register(prefix: str, message_class: type) -> None:
+            # betterproto names nested messages by concatenating their names, e.g. RelevantChunk.Relevance becomes
+            # RelevantChunkRelevance
+            name = prefix + message_class.DESCRIPTOR.name
+            protobuf_types[name] = message_class
+            for nested in message_class.DESCRIPTOR.nested_types:
+                _register(name, getattr(message_class, nested.name))
+
+        for module in (chunks_pb2, search_pb2):
+            for name in module.DESCRIPTOR.message_types_by_name:
+                _register("", getattr(module, name))
+        _protobuf_types = protobuf_types
+    return _protobuf_types
+
+
+def protobuf_type(message_type: type[betterproto.Message]) -> type:
+    """
+    Return the `google.protobuf` message class generated for a `redactive.grpc.v2` message class.
+
+    :param message_type: A message class from `redactive.grpc.v2`.
+    :type message_type: type[betterproto.Message]
+    :raises TypeError: If no protobuf message is generated for `message_type`.
+    :return: The corresponding class from `redactive.grpc.v2.protobuf`.
+    :rtype: type[google.protobuf.message.Message]
+    """
+    try:
+        return _get_protobuf_types()[message_type.__name__]
+    except KeyError:
+        msg = f"No protobuf message is generated for '{message_type.__name__}'"
+        raise TypeError(msg) from None
+
+
+def _field_converter(message_type: type[betterproto.Message], field_type: Any, proto_type: str) -> Any:
+    if proto_type == betterproto.TYPE_ENUM:
+        return field_type
+    if proto_type != betterproto.TYPE_MESSAGE:
+        return None
+    if field_type is datetime:
+        return lambda value: value.ToDatetime(tzinfo=UTC)
+    if field_type is timedelta:
+        return lambda value: value.ToTimedelta()
+    if field_type.__module__ == message_type.__module__:
+        return _get_converter(field_type)
+    # Other well-known types, e.g. Struct, are rare enough to go through their serialized form
+    return lambda value: field_type().parse(value.SerializeToString())
+
+
+def _get_converter(message_type: type[betterproto.Message]) -> Callable[[Any], Any]:
+    converter = _converters.get(message_type)
+    if converter is not None:
+        return converter
+
+    default = message_type()
+    metadata = default._betterproto
+    fields = []
+    for name, meta in metadata.meta_by_field_name.items():
+        field_type = metadata.cls_by_field.get(name)
+        repeated = isinstance(getattr(default, name), list)
+        is_message = meta.proto_type == betterproto.TYPE_MESSAGE
+        fields.append(
+            _Field(
+                name=name,
+                repeated=repeated,
+                has_presence=not repeated and (meta.optional or is_message),
+                # Set lazily, as messages may be recursive
+                convert=None,
+                # Unset non-optional messages are default instances in betterproto
+                missing=field_type if is_message and not meta.optional and not repeated else None,
+            )
+        )
+
+    def _convert(message: Any) -> Any:
+        values = {}
+        for field in fields:
+            if field.has_presence and not message.HasField(field.name):
+                values[field.name] = field.missing() if field.missing is not None else None
+                continue
+            value = getattr(message, field.name)
+            if field.repeated:
+                values[field.name] = list(value) if field.convert is None else [field.convert(v) for v in value]
+            else:
+                values[field.name] = value if field.convert is None else field.convert(value)
+        return message_type(**values)
+
+    _converters[message_type] = _convert
+    for index, field in enumerate(fields):
+        meta = metadata.meta_by_field_name[field.name]
+        convert = _field_converter(message_type, metadata.cls_by_field.get(field.name), meta.proto_type)
+        fields[index] = field._replace(convert=convert)
+    return _convert
+
+
+def to_protobuf(message: betterproto.Message) -> Any:
+    """
+    Convert a `redactive.grpc.v2` message to its `google.protobuf` equivalent.
+
+    :param message: The message to convert.
+    :type message: betterproto.Message
+    :return: An instance of the corresponding class from `redactive.grpc.v2.protobuf`.
+    :rtype: google.protobuf.message.Message
+    """
+    return protobuf_type(type(message)).FromString(bytes(message))
+
+
+def from_protobuf(message_type: type[M], message: Any) -> M:
+    """
+    Convert a `google.protobuf` message to its `redactive.grpc.v2` equivalent.
+
+    :param message_type: The `redactive.grpc.v2` message class to convert to.
+    :type message_type: type[M]
+    :param message: An instance of the corresponding class from `redactive.grpc.v2.protobuf`.
+    :type message: google.protobuf.message.Message
+    :return: The converted message.
+    :rtype: M
+    """
+    return _get_converter(message_type)(message)
+
+
+def decode(
+    message_type: type[M], data: bytes | memoryview, backend: CodecBackend | str = CodecBackend.Betterproto
+) -> M:
+    """
+    Decode a serialized `redactive.grpc.v2` message with the given codec backend.
+
+    :param message_type: The `redactive.grpc.v2` message class to decode.
+    :type message_type: type[M]
+    :param data: The serialized message.
+    :type data: bytes | memoryview
+    :param backend: The codec backend decoding the message. Defaults to betterproto.
+    :type backend: CodecBackend | str, optional
+    :return: The decoded message.
+    :rtype: M
+    """
+    if CodecBackend(backend) == CodecBackend.Protobuf:
+        return from_protobuf(message_type, protobuf_type(message_type).FromString(data))
+    return message_type().parse(bytes(data))
@@ -0,0 +1,2 @@
+# Generated by the protocol buffer compiler from protos/chunks.proto and protos/search.proto, for the
+# `google.protobuf` codec backend (see `redactive.codecs`). See protos/README.md to regenerate.
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: redactive/grpc/v2/protobuf/chunks.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\'redactive/grpc/v2/protobuf/chunks.proto\x12\x11redactive.grpc.v2\x1a\x1fgoogle/protobuf/timestamp.proto\"\xb5\x01\n\rChunkMetadata\x12\x33\n\ncreated_at\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\x00\x88\x01\x01\x12\x34\n\x0bmodified_at\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\x01\x88\x01\x01\x12\x11\n\x04link\x18\x03 \x01(\tH\x02\x88\x01\x01\x42\r\n\x0b_created_atB\x0e\n\x0c_modified_atB\x07\n\x05_link\"\xdb\x01\n\x0fSourceReference\x12\x0e\n\x06system\x18\x01 \x01(\t\x12\x16\n\x0esystem_version\x18\x02 \x01(\t\x12\x15\n\rconnection_id\x18\x03 \x01(\t\x12\x13\n\x0b\x64ocument_id\x18\x04 \x01(\t\x12\x18\n\x10\x64ocument_version\x18\x05 \x01(\t\x12\x1a\n\rdocument_path\x18\x06 \x01(\tH\x00\x88\x01\x01\x12\x1a\n\rdocument_name\x18\x07 \x01(\tH\x01\x88\x01\x01\x42\x10\n\x0e_document_pathB\x10\n\x0e_document_name\"P\n\x0e\x43hunkReference\x12\x18\n\x10\x63hunking_version\x18\x01 \x01(\t\x12\x10\n\x08\x63hunk_id\x18\x02 \x01(\t\x12\x12\n\nchunk_hash\x18\x03 \x01(\t\"\xac\x02\n\rRelevantChunk\x12\x32\n\x06source\x18\x01 \x01(\x0b\x32\".redactive.grpc.v2.SourceReference\x12\x30\n\x05\x63hunk\x18\x02 \x01(\x0b\x32!.redactive.grpc.v2.ChunkReference\x12=\n\trelevance\x18\x03 \x01(\x0b\x32*.redactive.grpc.v2.RelevantChunk.Relevance\x12\x12\n\nchunk_body\x18\x04 \x01(\t\x12;\n\x11\x64ocument_metadata\x18\x05 \x01(\x0b\x32 .redactive.grpc.v2.ChunkMetadata\x1a%\n\tRelevance\x12\x18\n\x10similarity_score\x18\x01 \x01(\x02\"\xbe\x01\n\x05\x43hunk\x12\x32\n\x06source\x18\x01 \x01(\x0b\x32\".redactive.grpc.v2.SourceReference\x12\x30\n\x05\x63hunk\x18\x02 \x01(\x0b\x32!.redactive.grpc.v2.ChunkReference\x12\x12\n\nchunk_body\x18\x03 \x01(\t\x12;\n\x11\x64ocument_metadata\x18\x04 \x01(\x0b\x32 .redactive.grpc.v2.ChunkMetadatab\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'redactive.grpc.v2.protobuf.chunks_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _CHUNKMETADATA._serialized_start=96
+  _CHUNKMETADATA._serialized_end=277
+  _SOURCEREFERENCE._serialized_start=280
+  _SOURCEREFERENCE._serialized_end=499
+  _CHUNKREFERENCE._serialized_start=501
+  _CHUNKREFERENCE._serialized_end=581
+  _RELEVANTCHUNK._serialized_start=584
+  _RELEVANTCHUNK._serialized_end=884
+  _RELEVANTCHUNK_RELEVANCE._serialized_start=847
+  _RELEVANTCHUNK_RELEVANCE._serialized_end=884
+  _CHUNK._serialized_start=887
+  _CHUNK._serialized_end=1077
+# @@protoc_insertion_point(module_scope)
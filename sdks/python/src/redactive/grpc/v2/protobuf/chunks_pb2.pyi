@@ -0,0 +1,75 @@
+from google.protobuf import timestamp_pb2 as _timestamp_pb2
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from typing import ClassVar as _ClassVar, Mapping as _Mapping, Optional as _Optional, Union as _Union
+
+DESCRIPTOR: _descriptor.FileDescriptor
+
+class Chunk(_message.Message):
+    __slots__ = ["chunk", "chunk_body", "document_metadata", "source"]
+    CHUNK_BODY_FIELD_NUMBER: _ClassVar[int]
+    CHUNK_FIELD_NUMBER: _ClassVar[int]
+    DOCUMENT_METADATA_FIELD_NUMBER: _ClassVar[int]
+    SOURCE_FIELD_NUMBER: _ClassVar[int]
+    chunk: ChunkReference
+    chunk_body: str
+    document_metadata: ChunkMetadata
+    source: SourceReference
+    def __init__(self, source: _Optional[_Union[SourceReference, _Mapping]] = ..., chunk: _Optional[_Union[ChunkReference, _Mapping]] = ..., chunk_body: _Optional[str] = ..., document_metadata: _Optional[_Union[ChunkMetadata, _Mapping]] = ...) -> None: ...
+
+class ChunkMetadata(_message.Message):
+    __slots__ = ["created_at", "link", "modified_at"]
+    CREATED_AT_FIELD_NUMBER: _ClassVar[int]
+    LINK_FIELD_NUMBER: _ClassVar[int]
+    MODIFIED_AT_FIELD_NUMBER: _ClassVar[int]
+    created_at: _timestamp_pb2.Timestamp
+    link: str
+    modified_at: _timestamp_pb2.Timestamp
+    def __init__(self, created_at: _Optional[_Union[_timestamp_pb2.Timestamp, _Mapping]] = ..., modified_at: _Optional[_Union[_timestamp_pb2.Timestamp, _Mapping]] = ..., link: _Optional[str] = ...) -> None: ...
+
+class ChunkReference(_message.Message):
+    __slots__ = ["chunk_hash", "chunk_id", "chunking_version"]
+    CHUNKING_VERSION_FIELD_NUMBER: _ClassVar[int]
+    CHUNK_HASH_FIELD_NUMBER: _ClassVar[int]
+    CHUNK_ID_FIELD_NUMBER: _ClassVar[int]
+    chunk_hash: str
+    chunk_id: str
+    chunking_version: str
+    def __init__(self, chunking_version: _Optional[str] = ..., chunk_id: _Optional[str] = ..., chunk_hash: _Optional[str] = ...) -> None: ...
+
+class RelevantChunk(_message.Message):
+    __slots__ = ["chunk", "chunk_body", "document_metadata", "relevance", "source"]
+    class Relevance(_message.Message):
+        __slots__ = ["similarity_score"]
+        SIMILARITY_SCORE_FIELD_NUMBER: _ClassVar[int]
+        similarity_score: float
+        def __init__(self, similarity_score: _Optional[float] = ...) -> None: ...
+    CHUNK_BODY_FIELD_NUMBER: _ClassVar[int]
+    CHUNK_FIELD_NUMBER: _ClassVar[int]
+    DOCUMENT_METADATA_FIELD_NUMBER: _ClassVar[int]
+    RELEVANCE_FIELD_NUMBER: _ClassVar[int]
+    SOURCE_FIELD_NUMBER: _ClassVar[int]
+    chunk: ChunkReference
+    chunk_body: str
+    document_metadata: ChunkMetadata
+    relevance: RelevantChunk.Relevance
+    source: SourceReference
+    def __init__(self, source: _Optional[_Union[SourceReference, _Mapping]] = ..., chunk: _Optional[_Union[ChunkReference, _Mapping]] = ..., relevance: _Optional[_Union[RelevantChunk.Relevance, _Mapping]] = ..., chunk_body: _Optional[str] = ..., document_metadata: _Optional[_Union[ChunkMetadata, _Mapping]] = ...) -> None: ...
+
+class SourceReference(_message.Message):
+    __slots__ = ["connection_id", "document_id", "document_name", "document_path", "document_version", "system", "system_version"]
+    CONNECTION_ID_FIELD_NUMBER: _ClassVar[int]
+    DOCUMENT_ID_FIELD_NUMBER: _ClassVar[int]
+    DOCUMENT_NAME_FIELD_NUMBER: _ClassVar[int]
+    DOCUMENT_PATH_FIELD_NUMBER: _ClassVar[int]
+    DOCUMENT_VERSION_FIELD_NUMBER: _ClassVar[int]
+    SYSTEM_FIELD_NUMBER: _ClassVar[int]
+    SYSTEM_VERSION_FIELD_NUMBER: _ClassVar[int]
+    connection_id: str
+    document_id: str
+    document_name: str
+    document_path: str
+    document_version: str
+    system: str
+    system_version: str
+    def __init__(self, system: _Optional[str] = ..., system_version: _Optional[str] = ..., connection_id: _Optional[str] = ..., document_id: _Optional[str] = ..., document_version: _Optional[str] = ..., document_path: _Optional[str] = ..., document_name: _Optional[str] = ...) -> None: ...
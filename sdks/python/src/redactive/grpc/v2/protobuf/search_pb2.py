@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: redactive/grpc/v2/protobuf/search.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import struct_pb2 as google_dot_protobuf_dot_struct__pb2
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
+from redactive.grpc.v2.protobuf import chunks_pb2 as redactive_dot_grpc_dot_v2_dot_protobuf_dot_chunks__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\'redactive/grpc/v2/protobuf/search.proto\x12\x11redactive.grpc.v2\x1a\x1cgoogle/protobuf/struct.proto\x1a\x1fgoogle/protobuf/timestamp.proto\x1a\'redactive/grpc/v2/protobuf/chunks.proto\"e\n\x05Query\x12\x1b\n\x0esemantic_query\x18\x01 \x01(\tH\x00\x88\x01\x01\x12\x1a\n\rkeyword_query\x18\x02 \x01(\tH\x01\x88\x01\x01\x42\x11\n\x0f_semantic_queryB\x10\n\x0e_keyword_query\"\x80\x01\n\x08TimeSpan\x12.\n\x05\x61\x66ter\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\x00\x88\x01\x01\x12/\n\x06\x62\x65\x66ore\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.TimestampH\x01\x88\x01\x01\x42\x08\n\x06_afterB\t\n\x07_before\"\xf1\x01\n\x07\x46ilters\x12\r\n\x05scope\x18\x01 \x03(\t\x12\x31\n\x07\x63reated\x18\x02 \x01(\x0b\x32\x1b.redactive.grpc.v2.TimeSpanH\x00\x88\x01\x01\x12\x32\n\x08modified\x18\x03 \x01(\x0b\x32\x1b.redactive.grpc.v2.TimeSpanH\x01\x88\x01\x01\x12\x13\n\x0buser_emails\x18\x04 \x03(\t\x12%\n\x18include_content_in_trash\x18\x05 \x01(\x08H\x02\x88\x01\x01\x42\n\n\x08_createdB\x0b\n\t_modifiedB\x1b\n\x19_include_content_in_trash\"\x9a\x01\n\x13SearchChunksRequest\x12\x12\n\x05\x63ount\x18\x01 \x01(\rH\x00\x88\x01\x01\x12\'\n\x05query\x18\x02 \x01(\x0b\x32\x18.redactive.grpc.v2.Query\x12\x30\n\x07\x66ilters\x18\x03 \x01(\x0b\x32\x1a.redactive.grpc.v2.FiltersH\x01\x88\x01\x01\x42\x08\n\x06_countB\n\n\x08_filters\"_\n\x12GetDocumentRequest\x12\x0b\n\x03ref\x18\x01 \x01(\t\x12\x30\n\x07\x66ilters\x18\x02 \x01(\x0b\x32\x1a.redactive.grpc.v2.FiltersH\x00\x88\x01\x01\x42\n\n\x08_filters\"\xb1\x01\n\x14SearchChunksResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12+\n\x05\x65rror\x18\x02 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x88\x01\x01\x12\x39\n\x0frelevant_chunks\x18\x03 \x03(\x0b\x32 .redactive.grpc.v2.RelevantChunk\x12\x16\n\x0eproviders_used\x18\x04 \x03(\tB\x08\n\x06_error\"\x9f\x01\n\x13GetDocumentResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12+\n\x05\x65rror\x18\x02 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x88\x01\x01\x12(\n\x06\x63hunks\x18\x03 \x03(\x0b\x32\x18.redactive.grpc.v2.Chunk\x12\x16\n\x0eproviders_used\x18\x04 \x03(\tB\x08\n\x06_error2\xc7\x01\n\x06Search\x12_\n\x0cSearchChunks\x12&.redactive.grpc.v2.SearchChunksRequest\x1a\'.redactive.grpc.v2.SearchChunksResponse\x12\\\n\x0bGetDocument\x12%.redactive.grpc.v2.GetDocumentRequest\x1a&.redactive.grpc.v2.GetDocumentResponseb\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'redactive.grpc.v2.protobuf.search_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _QUERY._serialized_start=166
+  _QUERY._serialized_end=267
+  _TIMESPAN._serialized_start=270
+  _TIMESPAN._serialized_end=398
+  _FILTERS._serialized_start=401
+  _FILTERS._serialized_end=642
+  _SEARCHCHUNKSREQUEST._serialized_start=645
+  _SEARCHCHUNKSREQUEST._serialized_end=799
+  _GETDOCUMENTREQUEST._serialized_start=801
+  _GETDOCUMENTREQUEST._serialized_end=896
+  _SEARCHCHUNKSRESPONSE._serialized_start=899
+  _SEARCHCHUNKSRESPONSE._serialized_end=1076
+  _GETDOCUMENTRESPONSE._serialized_start=1079
+  _GETDOCUMENTRESPONSE._serialized_end=1238
+  _SEARCH._serialized_start=1241
+  _SEARCH._serialized_end=1440
+# @@protoc_insertion_point(module_scope)
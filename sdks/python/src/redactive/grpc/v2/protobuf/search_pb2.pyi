@@ -0,0 +1,81 @@
+from google.protobuf import struct_pb2 as _struct_pb2
+from google.protobuf import timestamp_pb2 as _timestamp_pb2
+from redactive.grpc.v2.protobuf import chunks_pb2 as _chunks_pb2
+from google.protobuf.internal import containers as _containers
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from typing import ClassVar as _ClassVar, Iterable as _Iterable, Mapping as _Mapping, Optional as _Optional, Union as _Union
+
+DESCRIPTOR: _descriptor.FileDescriptor
+
+class Filters(_message.Message):
+    __slots__ = ["created", "include_content_in_trash", "modified", "scope", "user_emails"]
+    CREATED_FIELD_NUMBER: _ClassVar[int]
+    INCLUDE_CONTENT_IN_TRASH_FIELD_NUMBER: _ClassVar[int]
+    MODIFIED_FIELD_NUMBER: _ClassVar[int]
+    SCOPE_FIELD_NUMBER: _ClassVar[int]
+    USER_EMAILS_FIELD_NUMBER: _ClassVar[int]
+    created: TimeSpan
+    include_content_in_trash: bool
+    modified: TimeSpan
+    scope: _containers.RepeatedScalarFieldContainer[str]
+    user_emails: _containers.RepeatedScalarFieldContainer[str]
+    def __init__(self, scope: _Optional[_Iterable[str]] = ..., created: _Optional[_Union[TimeSpan, _Mapping]] = ..., modified: _Optional[_Union[TimeSpan, _Mapping]] = ..., user_emails: _Optional[_Iterable[str]] = ..., include_content_in_trash: bool = ...) -> None: ...
+
+class GetDocumentRequest(_message.Message):
+    __slots__ = ["filters", "ref"]
+    FILTERS_FIELD_NUMBER: _ClassVar[int]
+    REF_FIELD_NUMBER: _ClassVar[int]
+    filters: Filters
+    ref: str
+    def __init__(self, ref: _Optional[str] = ..., filters: _Optional[_Union[Filters, _Mapping]] = ...) -> None: ...
+
+class GetDocumentResponse(_message.Message):
+    __slots__ = ["chunks", "error", "providers_used", "success"]
+    CHUNKS_FIELD_NUMBER: _ClassVar[int]
+    ERROR_FIELD_NUMBER: _ClassVar[int]
+    PROVIDERS_USED_FIELD_NUMBER: _ClassVar[int]
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    chunks: _containers.RepeatedCompositeFieldContainer[_chunks_pb2.Chunk]
+    error: _struct_pb2.Struct
+    providers_used: _containers.RepeatedScalarFieldContainer[str]
+    success: bool
+    def __init__(self, success: bool = ..., error: _Optional[_Union[_struct_pb2.Struct, _Mapping]] = ..., chunks: _Optional[_Iterable[_Union[_chunks_pb2.Chunk, _Mapping]]] = ..., providers_used: _Optional[_Iterable[str]] = ...) -> None: ...
+
+class Query(_message.Message):
+    __slots__ = ["keyword_query", "semantic_query"]
+    KEYWORD_QUERY_FIELD_NUMBER: _ClassVar[int]
+    SEMANTIC_QUERY_FIELD_NUMBER: _ClassVar[int]
+    keyword_query: str
+    semantic_query: str
+    def __init__(self, semantic_query: _Optional[str] = ..., keyword_query: _Optional[str] = ...) -> None: ...
+
+class SearchChunksRequest(_message.Message):
+    __slots__ = ["count", "filters", "query"]
+    COUNT_FIELD_NUMBER: _ClassVar[int]
+    FILTERS_FIELD_NUMBER: _ClassVar[int]
+    QUERY_FIELD_NUMBER: _ClassVar[int]
+    count: int
+    filters: Filters
+    query: Query
+    def __init__(self, count: _Optional[int] = ..., query: _Optional[_Union[Query, _Mapping]] = ..., filters: _Optional[_Union[Filters, _Mapping]] = ...) -> None: ...
+
+class SearchChunksResponse(_message.Message):
+    __slots__ = ["error", "providers_used", "relevant_chunks", "success"]
+    ERROR_FIELD_NUMBER: _ClassVar[int]
+    PROVIDERS_USED_FIELD_NUMBER: _ClassVar[int]
+    RELEVANT_CHUNKS_FIELD_NUMBER: _ClassVar[int]
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    error: _struct_pb2.Struct
+    providers_used: _containers.RepeatedScalarFieldContainer[str]
+    relevant_chunks: _containers.RepeatedCompositeFieldContainer[_chunks_pb2.RelevantChunk]
+    success: bool
+    def __init__(self, success: bool = ..., error: _Optional[_Union[_struct_pb2.Struct, _Mapping]] = ..., relevant_chunks: _Optional[_Iterable[_Union[_chunks_pb2.RelevantChunk, _Mapping]]] = ..., providers_used: _Optional[_Iterable[str]] = ...) -> None: ...
+
+class TimeSpan(_message.Message):
+    __slots__ = ["after", "before"]
+    AFTER_FIELD_NUMBER: _ClassVar[int]
+    BEFORE_FIELD_NUMBER: _ClassVar[int]
+    after: _timestamp_pb2.Timestamp
+    before: _timestamp_pb2.Timestamp
+    def __init__(self, after: _Optional[_Union[_timestamp_pb2.Timestamp, _Mapping]] = ..., before: _Optional[_Union[_timestamp_pb2.Timestamp, _Mapping]] = ...) -> None: ...
@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+import betterproto
+
+from redactive._wire import iter_field_encodings
+
+M = TypeVar("M", bound=betterproto.Message)
+
+
+@dataclass(frozen=True)
+class _FieldSpec:
+    number: int
+    repeated: bool
+    optional: bool
+    nested_type: type[betterproto.Message] | None
+    """ Generated message type decoded lazily in turn, or None for fields decoded directly """
+
+
+_field_specs: dict[type[betterproto.Message], dict[str, _FieldSpec]] = {}
+
+
+def _get_field_specs(message_type: type[betterproto.Message]) -> dict[str, _FieldSpec]:
+    specs = _field_specs.get(message_type)
+    if specs is None:
+        default = message_type()
+        metadata = default._betterproto
+        specs = {}
+        for name, meta in metadata.meta_by_field_name.items():
+            field_type = metadata.cls_by_field.get(name)
+            nested_type = None
+            if (
+                meta.proto_type == betterproto.TYPE_MESSAGE
+                and isinstance(field_type, type)
+                and issubclass(field_type, betterproto.Message)
+                and field_type.__module__ == message_type.__module__
+            ):
+                nested_type = field_type
+            specs[name] = _FieldSpec(
+                number=meta.number,
+                repeated=isinstance(getattr(default, name), list),
+                optional=bool(meta.optional),
+                nested_type=nested_type,
+            )
+        _field_specs[message_type] = specs
+    return specs
+
+
+class LazyMessage(Generic[M]):
+    """
+    Read-only view of a serialized message which decodes each field on first access.
+
+    It exposes the same attributes as the generated message class it wraps, and passes `isinstance` checks against
+    it. Fields holding other generated messages are themselves returned as `LazyMessage` views of the same buffer, so
+    nothing is copied or decoded until it is read. Other attributes, such as `to_dict()` or `is_set()`, are read from
+    the whole message, decoded once on first use. Use `to_message()` to obtain a regular, mutable message.
+    """
+
+    __slots__ = ("_data", "_decoded", "_encodings", "_message", "_message_type")
+
+    def __init__(self, message_type: type[M], data: bytes | memoryview) -> None:
+        self._message_type = message_type
+        self._data = data
+        self._encodings: dict[int, list[tuple[Any, memoryview]]] | None = None
+        self._decoded: dict[str, Any] = {}
+        self._message: M | None = None
+
+    def _index(self) -> dict[int, list[tuple[Any, memoryview]]]:
+        if self._encodings is None:
+            encodings: dict[int, list[tuple[Any, memoryview]]] = {}
+            for field_number, _, value, encoding in iter_field_encodings(self._data):
+                encodings.setdefault(field_number, []).append((value, encoding))
+            self._encodings = encodings
+        return self._encodings
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            # Private attributes, including slots not yet set, are never delegated
+            msg = f"'LazyMessage' object has no attribute '{name}'"
+            raise AttributeError(msg)
+        spec = _get_field_specs(self._message_type).get(name)
+        if spec is None:
+            return getattr(self._decode_all(), name)
+        try:
+            return self._decoded[name]
+        except KeyError:
+            pass
+
+        encodings = self._index().get(spec.number, [])
+        if spec.nested_type is not None and spec.repeated:
+            value: Any = [LazyMessage(spec.nested_type, field_value) for field_value, _ in encodings]
+        elif spec.nested_type is not None:
+            if not encodings:
+                value = None if spec.optional else spec.nested_type()
+            else:
+                # A message field split over several encodings is merged by the decoder
+                value = (
+                    LazyMessage(spec.nested_type, encodings[0][0])
+                    if len(encodings) == 1
+                    else spec.nested_type().parse(b"".join(bytes(field_value) for field_value, _ in encodings))
+                )
+        else:
+            partial = self._message_type().parse(b"".join(bytes(encoding) for _, encoding in encodings))
+            value = getattr(partial, name)
+        self._decoded[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in LazyMessage.__slots__:
+            object.__setattr__(self, name, value)
+            return
+        msg = f"LazyMessage views are read-only; use to_message() to obtain a mutable '{self._message_type.__name__}'"
+        raise AttributeError(msg)
+
+    def __bytes__(self) -> bytes:
+        return bytes(self._data)
+
+    def SerializeToString(self) -> bytes:  # noqa: N802
+        return bytes(self._data)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazyMessage | betterproto.Message):
+            return self.to_message() == (other.to_message() if isinstance(other, LazyMessage) else other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"LazyMessage({self._message_type.__name__}, {len(self._data)} bytes)"
+
+    @property
+    def __class__(self) -> type[M]:  # type: ignore[override]
+        return self._message_type
+
+    @property
+    def message_type(self) -> type[M]:
+        return self._message_type
+
+    def _decode_all(self) -> M:
+        if self._message is None:
+            self._message = self.to_message()
+        return self._message
+
+    def to_message(self) -> M:
+        """
+        Decode the whole message.
+        """
+        return self._message_type().parse(bytes(self._data))
@@ -1,13 +1,39 @@
+import asyncio
+import dataclasses
+import time
 import uuid
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
-from typing import Annotated, Any
+from typing import Annotated, Any, Self, cast
 
+import httpx
 import jwt
 
-from redactive.auth_client import AuthClient
-from redactive.grpc.v2 import Filters, GetDocumentResponse, SearchChunksResponse
+from redactive._singleflight import SingleFlight
+from redactive._token_refresh import TokenRefreshScheduler
+from redactive.auth_client import AuthClient, ConnectionPoolPolicy
+from redactive.caching import DocumentCache, SearchCache, _LRUCache
+from redactive.codecs import CodecBackend
+from redactive.grpc.v2 import Chunk, Filters, GetDocumentResponse, SearchChunksResponse
+from redactive.lazy import LazyMessage
+from redactive.resilience import (
+    CircuitBreakerPolicy,
+    ConcurrencyLimitPolicy,
+    HedgingPolicy,
+    RateLimitPolicy,
+    RetryPolicy,
+)
+from redactive.scheduling import (
+    FairSchedulerStats,
+    FairSchedulingPolicy,
+    Priority,
+    PriorityPolicy,
+    UserQuota,
+    _FairScheduler,
+    _UserQuotas,
+)
 from redactive.search_client import SearchClient
 
 
@@ -34,8 +60,29 @@ class MultiUserClient:
         write_user_data: Callable[[Annotated[str, "user_id"], UserData | None], Awaitable[None]],
         *,
         auth_base_url: str | None = None,
+        auth_connection_pool: ConnectionPoolPolicy | None = None,
+        auth_http_client: httpx.AsyncClient | None = None,
         grpc_host: str | None = None,
         grpc_port: int | None = None,
+        grpc_pool_size: int = 1,
+        search_cache: SearchCache | None = None,
+        document_cache: DocumentCache | None = None,
+        lazy_decoding: bool = False,
+        codec: CodecBackend | str = CodecBackend.Betterproto,
+        grpc_timeout: float | None = None,
+        hedging: HedgingPolicy | None = None,
+        retry_policy: RetryPolicy | None = None,
+        auth_rate_limit: RateLimitPolicy | None = None,
+        concurrency_limit: ConcurrencyLimitPolicy | None = None,
+        circuit_breaker: CircuitBreakerPolicy | None = None,
+        priorities: PriorityPolicy | None = None,
+        fair_scheduling: FairSchedulingPolicy | None = None,
+        user_quota: UserQuota | None = None,
+        user_data_cache_size: int | None = None,
+        user_data_cache_ttl: float = 300,
+        proactive_refresh_margin: float | None = None,
+        proactive_refresh_jitter: float = 30,
+        proactive_refresh_concurrency: int = 4,
     ) -> None:
         """
         Redactive client handling multiple users authentication and access to the Redactive Search service.
@@ -50,17 +97,173 @@ class MultiUserClient:
         :type write_user_data: Callable[[[Annotated[str, user_id], UserData | None], Awaitable[None]]
         :param auth_base_url: Base URL for the authentication service. Optional.
         :type auth_base_url: str | None
+        :param auth_connection_pool: Connection pool settings of the authentication service's HTTP client. Ignored if
+            `auth_http_client` is given.
+        :type auth_connection_pool: ConnectionPoolPolicy | None
+        :param auth_http_client: An HTTP client shared with other clients for the authentication service, e.g. one
+            from `create_http_client`. It is not closed by `aclose()`.
+        :type auth_http_client: httpx.AsyncClient | None
         :param grpc_host: Host for the Redactive API service. Optional.
         :type grpc_host: str | None
         :param grpc_port: Port for the Redactive API service. Optional.
         :type grpc_port: int | None
+        :param grpc_pool_size: Number of gRPC channels the search client spreads calls over. Defaults to 1.
+        :type grpc_pool_size: int
+        :param search_cache: Cache for search responses, scoped by user ID, so that a user's token refreshes do not
+            discard their cached responses. Responses are not cached if None.
+        :type search_cache: SearchCache | None
+        :param document_cache: Cache for documents, scoped per user. Documents are not cached if None.
+        :type document_cache: DocumentCache | None
+        :param lazy_decoding: Return search results and documents as `LazyMessage` views which decode fields on first
+            access. Defaults to False.
+        :type lazy_decoding: bool
+        :param codec: The codec backend decoding search responses. Defaults to betterproto.
+        :type codec: CodecBackend | str
+        :param grpc_timeout: Default deadline in seconds for search calls. Calls have no deadline if None.
+        :type grpc_timeout: float | None
+        :param hedging: Hedging policy for search calls. Calls are not hedged if None.
+        :type hedging: HedgingPolicy | None
+        :param retry_policy: Policy for retrying failed auth requests and search calls. Requests are not retried if
+            None.
+        :type retry_policy: RetryPolicy | None
+        :param auth_rate_limit: Client-side rate limit on auth requests, shared with other clients using the same API
+            key, so that token refresh storms are queued rather than rejected by the API. Requests are not limited if
+            None.
+        :type auth_rate_limit: RateLimitPolicy | None
+        :param concurrency_limit: Adaptive limit on the number of search calls in flight. Calls are not limited if
+            None.
+        :type concurrency_limit: ConcurrencyLimitPolicy | None
+        :param circuit_breaker: Circuit breaker for search calls. Calls are always sent if None.
+        :type circuit_breaker: CircuitBreakerPolicy | None
+        :param priorities: Share search capacity between interactive and batch calls. Calls are started in arrival
+            order if None.
+        :type priorities: PriorityPolicy | None
+        :param fair_scheduling: Share search and document calls fairly between users, so that one user with many
+            calls queued does not delay everyone else's. Calls are started in arrival order if None.
+        :type fair_scheduling: FairSchedulingPolicy | None
+        :param user_quota: Per-user rate limits on searches and document fetches. Users are not limited if None.
+        :type user_quota: UserQuota | None
+        :param user_data_cache_size: Maximum number of users whose data is kept in an in-process write-through cache,
+            saving a `read_user_data` call per request while their ID token is valid. Calls that update user data
+            always read it from storage. No cache is used if None.
+        :type user_data_cache_size: int | None
+        :param user_data_cache_ttl: Number of seconds user data is cached for, capped at the ID token's expiry.
+        :type user_data_cache_ttl: float
+        :param proactive_refresh_margin: Refresh the tokens of recently active users in the background this many
+            seconds before they expire, so that requests do not wait on a token exchange. Tokens are only refreshed
+            on demand if None. The background task is stopped by `aclose()`.
+        :type proactive_refresh_margin: float | None
+        :param proactive_refresh_jitter: Up to this many seconds are added at random to each user's refresh margin,
+            spreading out refreshes of tokens issued together.
+        :type proactive_refresh_jitter: float
+        :param proactive_refresh_concurrency: Maximum number of background refreshes in flight at once.
+        :type proactive_refresh_concurrency: int
         """
 
-        self.auth_client = AuthClient(api_key, base_url=auth_base_url)
-        self.search_client = SearchClient(host=grpc_host, port=grpc_port)
+        self.auth_client = AuthClient(
+            api_key,
+            base_url=auth_base_url,
+            retry_policy=retry_policy,
+            rate_limit=auth_rate_limit,
+            connection_pool=auth_connection_pool,
+            http_client=auth_http_client,
+        )
+        self.search_client = SearchClient(
+            host=grpc_host,
+            port=grpc_port,
+            pool_size=grpc_pool_size,
+            search_cache=search_cache,
+            document_cache=document_cache,
+            lazy_decoding=lazy_decoding,
+            codec=codec,
+            timeout=grpc_timeout,
+            hedging=hedging,
+            retry_policy=retry_policy,
+            concurrency_limit=concurrency_limit,
+            circuit_breaker=circuit_breaker,
+            priorities=priorities,
+        )
+        self._fair_scheduler = _FairScheduler(fair_scheduling) if fair_scheduling is not None else None
+        self._user_quotas = _UserQuotas(user_quota) if user_quota is not None else None
         self.callback_uri = callback_uri
         self.read_user_data = read_user_data
         self.write_user_data = write_user_data
+        # The API may rotate the refresh token as soon as it receives an exchange, so a refresh always runs to completion
+        # and saves the new tokens, even if every caller waiting for it has been cancelled
+        self._token_refreshes: SingleFlight[str, UserData] = SingleFlight(cancel_abandoned=False)
+        self._user_data_cache: _LRUCache[str, UserData] | None = None
+        if user_data_cache_size is not None:
+            self._user_data_cache = _LRUCache(max_entries=user_data_cache_size, ttl=user_data_cache_ttl)
+        self.token_refresh_scheduler: TokenRefreshScheduler | None = None
+        if proactive_refresh_margin is not None:
+            self.token_refresh_scheduler = TokenRefreshScheduler(
+                self._refresh_expiring_user_data,
+                proactive_refresh_margin,
+                jitter=proactive_refresh_jitter,
+                max_concurrency=proactive_refresh_concurrency,
+            )
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Stop background token refreshes, and close the search client's gRPC channel and the auth client's HTTP
+        connections.
+        """
+        if self.token_refresh_scheduler is not None:
+            await self.token_refresh_scheduler.stop()
+        await self.search_client.aclose()
+        await self.auth_client.aclose()
+
+    @property
+    def fair_scheduling_stats(self) -> FairSchedulerStats | None:
+        """In-flight, queued and rejected call counters of the per-user scheduler, or None if not enabled."""
+        return self._fair_scheduler.stats if self._fair_scheduler is not None else None
+
+    @asynccontextmanager
+    async def _admit(self, user_id: str, operation: str) -> AsyncIterator[None]:
+        if self._user_quotas is not None:
+            await self._user_quotas.take(user_id, operation)
+        if self._fair_scheduler is None:
+            yield
+            return
+        await self._fair_scheduler.acquire(user_id)
+        try:
+            yield
+        finally:
+            self._fair_scheduler.release()
+
+    async def _read_user_data(self, user_id: str) -> UserData:
+        if self._user_data_cache is None:
+            return await self.read_user_data(user_id)
+        user_data = self._user_data_cache.get(user_id)
+        if user_data is None:
+            user_data = await self.read_user_data(user_id)
+            self._cache_user_data(user_id, user_data)
+        # Callers may modify the user data before writing it back
+        return dataclasses.replace(user_data, connections=list(user_data.connections)) if user_data else user_data
+
+    async def _write_user_data(self, user_id: str, user_data: UserData | None) -> None:
+        await self.write_user_data(user_id, user_data)
+        self._cache_user_data(user_id, user_data)
+
+    def _cache_user_data(self, user_id: str, user_data: UserData | None) -> None:
+        cache = self._user_data_cache
+        if cache is None:
+            return
+        if user_data is None:
+            cache.pop(user_id)
+            return
+        expires_at = None
+        if user_data.id_token_expiry:
+            expires_at = time.monotonic() + (user_data.id_token_expiry - datetime.now(UTC)).total_seconds()
+        cache.set(
+            user_id, dataclasses.replace(user_data, connections=list(user_data.connections)), expires_at=expires_at
+        )
 
     async def get_begin_connection_url(self, user_id: str, provider: str) -> str:
         """
@@ -75,9 +278,10 @@ class MultiUserClient:
         """
         state = str(uuid.uuid4())
         response = await self.auth_client.begin_connection(provider, self.callback_uri, state=state)
+        # Read-modify-write paths always read from storage, so a cached copy never overwrites newer user data
         user_data = await self.read_user_data(user_id)
         user_data.sign_in_state = state
-        await self.write_user_data(user_id, user_data)
+        await self._write_user_data(user_id, user_data)
         return response.url
 
     async def _refresh_user_data(
@@ -91,11 +295,37 @@ class MultiUserClient:
             id_token_expiry=datetime.now(UTC) + timedelta(seconds=tokens.expiresIn - 10),
             connections=connections.current_connections,
         )
-        await self.write_user_data(user_id, user_data)
+        await self._write_user_data(user_id, user_data)
         return user_data
 
-    async def get_users_redactive_email(self, user_id: str) -> str | None:
+    async def _refresh_user_tokens(self, user_id: str, refresh_token: str) -> UserData:
+        # At most one refresh per user is in flight; concurrent callers share its result
+        return await self._token_refreshes.do(user_id, lambda: self._refresh_stale_user_data(user_id, refresh_token))
+
+    async def _refresh_stale_user_data(self, user_id: str, refresh_token: str) -> UserData:
+        # A refresh that completed after the caller read `refresh_token` may have rotated it already, possibly in
+        # another process, so check storage rather than the cache
         user_data = await self.read_user_data(user_id)
+        if user_data and user_data.refresh_token and user_data.refresh_token != refresh_token:
+            if user_data.id_token_expiry and user_data.id_token_expiry > datetime.now(UTC):
+                return user_data
+            refresh_token = user_data.refresh_token
+        return await self._refresh_user_data(user_id, refresh_token=refresh_token)
+
+    async def _refresh_expiring_user_data(self, user_id: str) -> datetime | None:
+        user_data = await self.read_user_data(user_id)
+        if not user_data or not user_data.refresh_token:
+            return None
+        scheduler = self.token_refresh_scheduler
+        margin = timedelta(seconds=scheduler.margin + scheduler.jitter) if scheduler else timedelta()
+        if user_data.id_token_expiry and user_data.id_token_expiry - datetime.now(UTC) > margin:
+            # Refreshed elsewhere in the meantime
+            return user_data.id_token_expiry
+        user_data = await self._refresh_user_tokens(user_id, user_data.refresh_token)
+        return user_data.id_token_expiry
+
+    async def get_users_redactive_email(self, user_id: str) -> str | None:
+        user_data = await self._read_user_data(user_id)
         if not user_data or not user_data.id_token:
             return None
         token_body = jwt.decode(user_data.id_token, options={"verify_signature": False})
@@ -128,30 +358,48 @@ class MultiUserClient:
         :type user_id: str
         :return: A list of user's connected providers.
         """
-        user_data = await self.read_user_data(user_id)
+        user_data = await self._read_user_data(user_id)
         if user_data and user_data.id_token_expiry and user_data.id_token_expiry > datetime.now(UTC):
             return user_data.connections
         if user_data and user_data.refresh_token:
-            user_data = await self._refresh_user_data(user_id, refresh_token=user_data.refresh_token)
+            user_data = await self._refresh_user_tokens(user_id, user_data.refresh_token)
             return user_data.connections
         return []
 
     async def clear_user_data(self, user_id: str) -> None:
-        await self.write_user_data(user_id, None)
+        """
+        Remove the user's data from storage and from the in-process user data cache, and drop their cached search
+        results and documents.
+
+        :param user_id: The ID of the user.
+        :type user_id: str
+        """
+        await self._write_user_data(user_id, None)
+        for cache in (self.search_client.search_cache, self.search_client.document_cache):
+            if cache is not None:
+                cache.invalidate(user_id)
 
     async def _get_id_token(self, user_id: str) -> str:
-        user_data = await self.read_user_data(user_id)
+        user_data = await self._read_user_data(user_id)
         if not user_data or not user_data.refresh_token:
             raise InvalidRedactiveSessionError(user_id)
         if user_data.id_token_expiry and user_data.id_token_expiry < datetime.now(UTC):
-            user_data = await self._refresh_user_data(user_id, refresh_token=user_data.refresh_token)
+            user_data = await self._refresh_user_tokens(user_id, user_data.refresh_token)
         if not user_data.id_token:
             raise InvalidRedactiveSessionError(user_id)
+        if self.token_refresh_scheduler is not None:
+            self.token_refresh_scheduler.touch(user_id, user_data.id_token_expiry)
         return user_data.id_token
 
     async def search_chunks(
-        self, user_id: str, query: str, count: int = 10, filters: Filters | dict[str, Any] | None = None
-    ) -> SearchChunksResponse:
+        self,
+        user_id: str,
+        query: str,
+        count: int = 10,
+        filters: Filters | dict[str, Any] | None = None,
+        timeout: float | None = None,
+        priority: Priority | str = Priority.Interactive,
+    ) -> SearchChunksResponse | LazyMessage[SearchChunksResponse]:
         """
         Query for relevant chunks based on a semantic query.
 
@@ -163,13 +411,93 @@ class MultiUserClient:
         :type count: int, optional
         :param filters: The filters for relevant chunks. See `Filters` type.
         :type filters: Filters | dict[str, Any], optional
+        :param timeout: Deadline in seconds for the search call. Defaults to the client's `grpc_timeout`.
+        :type timeout: float, optional
+        :param priority: Scheduling priority of the call. Defaults to interactive.
+        :type priority: Priority | str, optional
+        :raises UserThrottledError: If the user is over their quota or has waited too long for their turn.
         :return: A list of relevant chunks that match the query
         :rtype: list[RelevantChunk]
         """
         id_token = await self._get_id_token(user_id)
-        return await self.search_client.search_chunks(id_token, query, count, filters=filters)
+        async with self._admit(user_id, "search"):
+            return await self.search_client.search_chunks(
+                id_token, query, count, filters=filters, timeout=timeout, priority=priority, cache_scope=user_id
+            )
+
+    async def search_chunks_many(
+        self,
+        user_id: str,
+        queries: Sequence[str],
+        count: int = 10,
+        filters: Filters | dict[str, Any] | None = None,
+        max_concurrency: int = 10,
+        timeout: float | None = None,
+        priority: Priority | str = Priority.Interactive,
+    ) -> list[SearchChunksResponse | LazyMessage[SearchChunksResponse] | Exception]:
+        """
+        Query for relevant chunks for several semantic queries concurrently, resolving the user's token once.
+
+        :param user_id: The ID of the user.
+        :type user_id: str
+        :param queries: The query strings used to find relevant chunks.
+        :type queries: Sequence[str]
+        :param count: The number of relevant chunks to retrieve per query. Defaults to 10.
+        :type count: int, optional
+        :param filters: The filters for relevant chunks, applied to every query. See `Filters` type.
+        :type filters: Filters | dict[str, Any], optional
+        :param max_concurrency: The maximum number of queries in flight at once. Defaults to 10.
+        :type max_concurrency: int, optional
+        :param timeout: Deadline in seconds for each query. Defaults to the client's `grpc_timeout`.
+        :type timeout: float, optional
+        :param priority: Scheduling priority of the queries. Defaults to interactive.
+        :type priority: Priority | str, optional
+        :return: One response, or the exception raised, per query in the order of `queries`. Each query counts as
+            one call against the user's quota and scheduling share; a query that is throttled is represented by a
+            `UserThrottledError`.
+        :rtype: list[SearchChunksResponse | LazyMessage[SearchChunksResponse] | Exception]
+        """
+        id_token = await self._get_id_token(user_id)
+        if self._user_quotas is None and self._fair_scheduler is None:
+            return await self.search_client.search_chunks_many(
+                id_token,
+                queries,
+                count,
+                filters=filters,
+                max_concurrency=max_concurrency,
+                timeout=timeout,
+                priority=priority,
+                cache_scope=user_id,
+            )
+
+        if max_concurrency < 1:
+            msg = "max_concurrency must be at least 1"
+            raise ValueError(msg)
 
-    async def get_document(self, user_id: str, ref: str) -> GetDocumentResponse:
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _search(query: str) -> SearchChunksResponse | LazyMessage[SearchChunksResponse]:
+            # Admit each query on its own, so a batch runs at the user's quota rate and takes turns with other users
+            async with semaphore, self._admit(user_id, "search"):
+                return await self.search_client.search_chunks(
+                    id_token, query, count, filters=filters, timeout=timeout, priority=priority, cache_scope=user_id
+                )
+
+        results = await asyncio.gather(*(_search(query) for query in queries), return_exceptions=True)
+        for result in results:
+            # Cancellation and other BaseExceptions are not per-query failures
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        return cast("list[SearchChunksResponse | LazyMessage[SearchChunksResponse] | Exception]", results)
+
+    async def get_document(
+        self,
+        user_id: str,
+        ref: str,
+        document_version: str | None = None,
+        timeout: float | None = None,
+        priority: Priority | str = Priority.Interactive,
+    ) -> GetDocumentResponse | LazyMessage[GetDocumentResponse]:
         """
         Get chunks from a document by its URL.
 
@@ -177,8 +505,56 @@ class MultiUserClient:
         :type user_id: str
         :param ref: A reference to the document we are retrieving.
         :type ref: str
+        :param document_version: The document version the caller expects, used to validate a cached copy of the
+            document. Ignored without a document cache.
+        :type document_version: str, optional
+        :param timeout: Deadline in seconds for the call. Defaults to the client's `grpc_timeout`.
+        :type timeout: float, optional
+        :param priority: Scheduling priority of the call, e.g. `Priority.Batch` for bulk document fetches. Defaults
+            to interactive.
+        :type priority: Priority | str, optional
+        :raises UserThrottledError: If the user is over their quota or has waited too long for their turn.
         :return: The complete list of chunks for the document.
         :rtype: list[Chunk]
         """
         id_token = await self._get_id_token(user_id)
-        return await self.search_client.get_document(id_token, ref)
+        async with self._admit(user_id, "document"):
+            return await self.search_client.get_document(
+                id_token,
+                ref,
+                document_version=document_version,
+                timeout=timeout,
+                priority=priority,
+                cache_scope=user_id,
+            )
+
+    async def iter_document(
+        self,
+        user_id: str,
+        ref: str,
+        timeout: float | None = None,
+        priority: Priority | str = Priority.Interactive,
+    ) -> AsyncIterator[Chunk]:
+        """
+        Iterate over the chunks of a document, decoding each chunk only when it is reached.
+
+        :param user_id: The ID of the user.
+        :type user_id: str
+        :param ref: A reference to the document we are retrieving.
+        :type ref: str
+        :param timeout: Deadline in seconds for the call, including receiving every chunk of a streamed document.
+            Defaults to the client's `grpc_timeout`.
+        :type timeout: float, optional
+        :param priority: Scheduling priority of the call. Defaults to interactive.
+        :type priority: Priority | str, optional
+        :raises UserThrottledError: If the user is over their quota or has waited too long for their turn.
+        :return: The chunks of the document, in order.
+        :rtype: AsyncIterator[Chunk]
+        """
+        id_token = await self._get_id_token(user_id)
+        # The user's scheduling slot is held until the stream ends
+        async with self._admit(user_id, "document"):
+            async for chunk in self.search_client.iter_document(
+                id_token, ref, timeout=timeout, priority=priority, cache_scope=user_id
+            ):
+                yield chunk
@@ -0,0 +1,107 @@
+from collections.abc import Sequence
+from enum import StrEnum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class FusionMode(StrEnum):
+    RerankOnly = "none"
+    """ Use the reranker score alone """
+    MinMax = "min-max"
+    """ Weighted sum of the min-max normalized retrieval and reranker scores """
+    ZScore = "z-score"
+    """ Weighted sum of the z-score normalized retrieval and reranker scores """
+    ReciprocalRank = "rrf"
+    """ Weighted reciprocal rank fusion of the retrieval and reranker rankings """
+
+
+def _min_max(scores: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    spread = scores.max() - scores.min()
+    return (scores - scores.min()) / spread if spread > 0 else np.zeros_like(scores)
+
+
+def _z_score(scores: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    std = scores.std()
+    return (scores - scores.mean()) / std if std > 0 else np.zeros_like(scores)
+
+
+def _reciprocal_rank(scores: "np.ndarray", rrf_k: int) -> "np.ndarray":
+    import numpy as np
+
+    ranks = np.empty(len(scores), dtype=np.float64)
+    ranks[np.argsort(-scores, kind="stable")] = np.arange(1, len(scores) + 1)
+    return 1.0 / (rrf_k + ranks)
+
+
+def fuse_scores(
+    retrieval_scores: "np.ndarray | Sequence[float]",
+    rerank_scores: "np.ndarray | Sequence[float]",
+    mode: FusionMode | str = FusionMode.RerankOnly,
+    weight: float = 0.5,
+    rrf_k: int = 60,
+) -> "np.ndarray":
+    """
+    Combine retrieval and reranker scores of the same candidates into a single score per candidate.
+
+    :param retrieval_scores: Similarity scores reported by Redactive's search.
+    :type retrieval_scores: np.ndarray | Sequence[float]
+    :param rerank_scores: Scores computed by the reranker.
+    :type rerank_scores: np.ndarray | Sequence[float]
+    :param mode: How to combine the scores. Defaults to using the reranker score alone.
+    :type mode: FusionMode | str, optional
+    :param weight: Weight of the reranker score, between 0 and 1; the retrieval score is weighted 1 - weight.
+        Defaults to 0.5.
+    :type weight: float, optional
+    :param rrf_k: Rank offset used by reciprocal rank fusion. Defaults to 60.
+    :type rrf_k: int, optional
+    :return: The fused scores, higher is better.
+    :rtype: np.ndarray
+    """
+    # numpy is only required for fusion, so that the rest of the package works without the reranking extra
+    import numpy as np
+
+    mode = FusionMode(mode)
+    retrieval_scores = np.asarray(retrieval_scores, dtype=np.float64)
+    rerank_scores = np.asarray(rerank_scores, dtype=np.float64)
+    if mode is FusionMode.RerankOnly or not len(rerank_scores):
+        return rerank_scores
+    if mode is FusionMode.MinMax:
+        retrieval_scores, rerank_scores = _min_max(retrieval_scores), _min_max(rerank_scores)
+    elif mode is FusionMode.ZScore:
+        retrieval_scores, rerank_scores = _z_score(retrieval_scores), _z_score(rerank_scores)
+    else:
+        retrieval_scores, rerank_scores = (
+            _reciprocal_rank(retrieval_scores, rrf_k),
+            _reciprocal_rank(rerank_scores, rrf_k),
+        )
+    return weight * rerank_scores + (1 - weight) * retrieval_scores
+
+
+def top_k_indices(scores: "np.ndarray", k: int) -> "np.ndarray":
+    """
+    Return the indices of the k highest scores, highest first, without sorting the other scores.
+
+    :param scores: Candidate scores.
+    :type scores: np.ndarray
+    :param k: Number of indices to return.
+    :type k: int
+    :rtype: np.ndarray
+    """
+    import numpy as np
+
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    # Ties are broken by original position, like a stable sort of the full list
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
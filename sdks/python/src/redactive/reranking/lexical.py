@@ -0,0 +1,88 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@dataclass
+class LexicalResult:
+    doc_id: int
+    """ Index of the document in the ranked list of documents """
+    score: float
+    rank: int
+
+
+class BM25Reranker:
+    scores_depend_on_candidates = True
+    """ Term statistics are computed over the candidates, so a document's score depends on the other candidates """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, tokenization_cache_size: int = 8192) -> None:
+        """
+        Model-free lexical reranker scoring documents with Okapi BM25.
+
+        Document frequencies and average document length are computed over the candidate documents being reranked.
+        Tokenized documents are cached, so candidates which come up again in later queries are not tokenized twice.
+
+        :param k1: Term frequency saturation. Defaults to 1.5.
+        :type k1: float, optional
+        :param b: Document length normalization. Defaults to 0.75.
+        :type b: float, optional
+        :param tokenization_cache_size: Number of tokenized documents to keep. Defaults to 8192.
+        :type tokenization_cache_size: int, optional
+        """
+        self.k1 = k1
+        self.b = b
+        self._analyze = lru_cache(maxsize=tokenization_cache_size)(self._analyze_uncached)
+
+    @staticmethod
+    def _tokenize(text: str) -> list[str]:
+        return _TOKEN_PATTERN.findall(text.lower())
+
+    def _analyze_uncached(self, text: str) -> tuple[Counter[str], int]:
+        tokens = self._tokenize(text)
+        return Counter(tokens), len(tokens)
+
+    def rank(self, query: str, docs: list[str]) -> list[LexicalResult]:
+        """
+        Rank documents by their BM25 score for the query.
+
+        :param query: The query.
+        :type query: str
+        :param docs: The candidate documents.
+        :type docs: list[str]
+        :return: Results for every document, highest score first.
+        :rtype: list[LexicalResult]
+        """
+        analyzed = [self._analyze(doc) for doc in docs]
+        query_terms = set(self._tokenize(query))
+        if not analyzed or not query_terms:
+            scores = [0.0] * len(docs)
+        else:
+            scores = self._scores(query_terms, analyzed)
+
+        order = sorted(range(len(docs)), key=scores.__getitem__, reverse=True)
+        return [LexicalResult(doc_id=index, score=scores[index], rank=rank) for rank, index in enumerate(order, 1)]
+
+    def _scores(self, query_terms: set[str], analyzed: list[tuple[Counter[str], int]]) -> list[float]:
+        n_docs = len(analyzed)
+        avg_length = (sum(length for _, length in analyzed) / n_docs) or 1.0
+        document_frequency = Counter(term for counts, _ in analyzed for term in query_terms if term in counts)
+        idf = {
+            term: math.log(1 + (n_docs - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+        k1, b = self.k1, self.b
+        scores = []
+        for counts, length in analyzed:
+            norm = k1 * (1 - b + b * length / avg_length)
+            score = 0.0
+            for term, term_idf in idf.items():
+                frequency = counts.get(term)
+                if frequency:
+                    score += term_idf * frequency * (k1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
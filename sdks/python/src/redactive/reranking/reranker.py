@@ -1,10 +1,28 @@
-from dataclasses import dataclass
+import asyncio
+import hashlib
+import heapq
+import math
+import random
+import threading
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
 from typing import Any
 
-from rerankers import Reranker
-
 from redactive import search_client
-from redactive.grpc.v2 import Filters, RelevantChunk
+from redactive.caching import CacheStats, _LRUCache, _normalize_query
+from redactive.grpc.v2 import Filters, RelevantChunk, RelevantChunkRelevance
+from redactive.lazy import LazyMessage
+from redactive.reranking.fusion import FusionMode, fuse_scores, top_k_indices
+from redactive.reranking.lexical import BM25Reranker
+
+try:
+    from rerankers import Reranker
+except ImportError:  # Only the built-in lexical rerankers are available
+    Reranker = None
+
+_LEXICAL_RERANKERS = {"bm25": BM25Reranker}
 
 
 @dataclass
@@ -21,13 +39,266 @@ class RerankingConfig:
     Reranking algorithm from https://github.com/AnswerDotAI/rerankers/tree/main
     If you would like to try a different algorithm, add it to the pyproject.toml dependencies for
     reranking.
+    Use "bm25" for the built-in lexical reranker, which needs neither the rerankers library nor a model.
+    """
+    reranker_options: dict[str, Any] = field(default_factory=dict)
+    """ Extra keyword arguments used to load the reranker, e.g. model_type or device """
+    max_batch_size: int = 8
+    """ Maximum number of concurrent rerank requests for the same query merged into one batch """
+    max_batch_wait: float = 0.005
+    """ Maximum number of seconds a rerank request waits for others with the same query to share its batch.
+        Requests to the lexical reranker are never held back.
+    """
+    score_cache_size: int = 10000
+    """ Maximum number of (query, chunk) reranker scores kept for reuse; 0 disables the score cache """
+    fusion: FusionMode | str = FusionMode.RerankOnly
+    """ How the reranker score is combined with the retrieval similarity score. See `FusionMode` """
+    fusion_weight: float = 0.5
+    """ Weight of the reranker score when fusing, between 0 and 1; the retrieval score gets 1 - fusion_weight """
+    rrf_k: int = 60
+    """ Rank offset for reciprocal rank fusion """
+    adaptive_fetch: bool = False
+    """ Size fetches from observed statistics instead of always fetching count * fetch_multiplier results.
+        fetch_multiplier and max_fetch_results remain the upper bound.
     """
+    target_recall: float = 0.95
+    """ Share of final top results that adaptive fetches should still retrieve, compared to a full fetch """
+    adaptive_window: int = 1000
+    """ Number of most recent top result positions kept to size adaptive fetches """
+    adaptive_min_observations: int = 20
+    """ Number of full fetches observed before adaptive fetches are sized down """
+    adaptive_exploration_rate: float = 0.1
+    """ Share of queries which still use a full fetch, so that the statistics keep up with changes """
+
+
+_loaded_rerankers: dict[tuple[str, tuple[tuple[str, Any], ...]], Any] = {}
+_loaded_rerankers_lock = threading.Lock()
+
+
+def _load_reranker(reranking_algorithm: str, **options: Any) -> Any:
+    if reranking_algorithm in _LEXICAL_RERANKERS:
+        return _LEXICAL_RERANKERS[reranking_algorithm](**options)
+    if Reranker is None:
+        msg = f"Reranking algorithm '{reranking_algorithm}' requires the 'reranking' extra: pip install redactive[reranking]"
+        raise ImportError(msg)
+    return Reranker(reranking_algorithm, **options)
+
+
+def get_reranker(reranking_algorithm: str, **options: Any) -> Any:
+    """
+    Return the process-wide reranker for an algorithm and its options, loading it on first use.
+
+    :param reranking_algorithm: "bm25", or a reranking algorithm or model name accepted by `rerankers.Reranker`.
+    :type reranking_algorithm: str
+    :raises ImportError: If the algorithm needs the rerankers library and it is not installed.
+    :return: The loaded reranker.
+    """
+    key = (reranking_algorithm, tuple(sorted(options.items())))
+    ranker = _loaded_rerankers.get(key)
+    if ranker is None:
+        with _loaded_rerankers_lock:
+            ranker = _loaded_rerankers.get(key)
+            if ranker is None:
+                ranker = _loaded_rerankers[key] = _load_reranker(reranking_algorithm, **options)
+    return ranker
+
+
+def _model_memory(ranker: Any) -> int:
+    model = getattr(ranker, "model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return 0
+    tensors = [*model.parameters(), *(model.buffers() if hasattr(model, "buffers") else ())]
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+def loaded_reranker_memory() -> dict[str, int]:
+    """
+    Report the memory, in bytes, held by the weights of each loaded reranker model. Rerankers which are not backed
+    by a PyTorch model are reported as 0.
+
+    :return: Memory in bytes by reranking algorithm.
+    :rtype: dict[str, int]
+    """
+    memory: dict[str, int] = {}
+    for (reranking_algorithm, _), ranker in list(_loaded_rerankers.items()):
+        memory[reranking_algorithm] = memory.get(reranking_algorithm, 0) + _model_memory(ranker)
+    return memory
+
+
+def clear_rerankers() -> None:
+    """
+    Unload every cached reranker.
+    """
+    with _loaded_rerankers_lock:
+        _loaded_rerankers.clear()
+
+
+def _score(ranker: Any, query: str, docs: list[str]) -> list[float]:
+    # Scores in the order of `docs`, rather than in ranked order
+    scores = [0.0] * len(docs)
+    for result in ranker.rank(query, docs):
+        scores[result.doc_id] = result.score
+    return scores
+
+
+def _score_batch(get_ranker: Callable[[], Any], query: str, requests: list[list[str]]) -> list[list[float]]:
+    ranker = get_ranker()
+    if getattr(ranker, "scores_depend_on_candidates", False) is True:
+        return [_score(ranker, query, docs) for docs in requests]
+
+    # Requests for the same query are merged into a single inference call
+    scores = _score(ranker, query, [doc for docs in requests for doc in docs])
+    results = []
+    offset = 0
+    for docs in requests:
+        results.append(scores[offset : offset + len(docs)])
+        offset += len(docs)
+    return results
+
+
+class _RerankBatcher:
+    """
+    Collects rerank requests for the same query arriving within a short window and scores them together on an
+    executor, keeping inference off the event loop. Each distinct query is a separate executor job, and requests are
+    sent at once if the ranker cannot merge them.
+    """
+
+    def __init__(
+        self,
+        get_ranker: Callable[[], Any],
+        executor: Executor | None,
+        max_batch_size: int,
+        max_wait: float,
+        *,
+        mergeable: bool = True,
+    ) -> None:
+        self._get_ranker = get_ranker
+        self._executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.mergeable = mergeable
+        self._pending: dict[str, list[tuple[list[str], asyncio.Future[list[float]]]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self.batches = 0
+        """ Number of batches sent to the executor """
+
+    async def score(self, query: str, docs: list[str]) -> list[float]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[float]] = loop.create_future()
+        pending = self._pending.setdefault(query, [])
+        pending.append((docs, future))
+        if not self.mergeable or len(pending) >= self.max_batch_size:
+            self._flush(query)
+        elif query not in self._timers:
+            self._timers[query] = loop.call_later(self.max_wait, self._flush, query)
+        return await future
+
+    def _flush(self, query: str) -> None:
+        timer = self._timers.pop(query, None)
+        if timer is not None:
+            timer.cancel()
+        batch = [request for request in self._pending.pop(query, []) if not request[1].done()]
+        if not batch:
+            return
+
+        self.batches += 1
+        scored = asyncio.get_running_loop().run_in_executor(
+            self._executor, _score_batch, self._get_ranker, query, [docs for docs, _ in batch]
+        )
+
+        def _deliver(scored: asyncio.Future[list[list[float]]]) -> None:
+            for index, (_, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if scored.cancelled():
+                    future.cancel()
+                elif (error := scored.exception()) is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(scored.result()[index])
+
+        scored.add_done_callback(_deliver)
+
+
+class _AdaptiveFetchSizer:
+    """
+    Tracks where the final top results ranked in the original retrieval order of full-size fetches, and sizes later
+    fetches to the smallest multiple of the requested count that retrieves the target share of them.
+    """
+
+    def __init__(self, target_recall: float, window: int, min_observations: int) -> None:
+        self.target_recall = target_recall
+        self.min_observations = min_observations
+        self._depths: deque[float] = deque(maxlen=window)
+        self.observations = 0
+        """ Number of full fetches recorded """
+
+    def record(self, selected_positions: list[int], count: int) -> None:
+        # Depth of each selected result in the original order, relative to the number of results requested
+        self._depths.extend((position + 1) / count for position in selected_positions)
+        self.observations += 1
+
+    def multiplier(self) -> float | None:
+        if self.observations < self.min_observations or not self._depths:
+            return None
+        # The "higher" quantile: the smallest recorded depth at or above the target share of depths
+        depths = sorted(self._depths)
+        return depths[math.ceil(self.target_recall * (len(depths) - 1))]
 
 
 class RerankingSearchClient(search_client.SearchClient):
-    def __init__(self, host: str = "grpc.redactive.ai", port: int = 443) -> None:
+    def __init__(
+        self,
+        host: str = "grpc.redactive.ai",
+        port: int = 443,
+        conf: RerankingConfig | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        Search client which reranks an enlarged set of search results locally.
+
+        :param host: The hostname or IP address of the Redactive API service.
+        :type host: str, optional
+        :param port: The port number of the Redactive API service.
+        :type port: int, optional
+        :param conf: Reranking configuration. Defaults to `RerankingConfig()`.
+        :type conf: RerankingConfig, optional
+        :param executor: Executor running reranker inference, off the event loop. Defaults to the event loop's
+            default thread pool.
+        :type executor: Executor, optional
+        """
         super().__init__(host, port)
-        self.conf = RerankingConfig
+        self.conf = conf if conf is not None else RerankingConfig()
+        self._batcher = _RerankBatcher(
+            self._get_ranker,
+            executor,
+            max_batch_size=self.conf.max_batch_size,
+            max_wait=self.conf.max_batch_wait,
+            # Lexical scores depend on the whole candidate set, so there is nothing to gain by waiting for others
+            mergeable=self.conf.reranking_algorithm not in _LEXICAL_RERANKERS,
+        )
+        self._fetch_sizer = _AdaptiveFetchSizer(
+            self.conf.target_recall, self.conf.adaptive_window, self.conf.adaptive_min_observations
+        )
+        self.last_fetch_count: int | None = None
+        """ Number of results fetched for the most recent query """
+        self._score_cache: _LRUCache[tuple[str, str, str], float] | None = None
+        if self.conf.score_cache_size > 0:
+            self._score_cache = _LRUCache(max_entries=self.conf.score_cache_size)
+
+    @property
+    def score_cache_stats(self) -> CacheStats:
+        """Hit and miss counters of the reranker score cache. `hit_rate` is the share of scores not recomputed."""
+        return self._score_cache.stats if self._score_cache is not None else CacheStats()
+
+    def _get_ranker(self) -> Any:
+        return get_reranker(self.conf.reranking_algorithm, **self.conf.reranker_options)
+
+    async def warm_up(self) -> None:
+        """
+        Load the configured reranker ahead of the first query, without blocking the event loop.
+        """
+        await asyncio.to_thread(self._get_ranker)
 
     async def query_chunks(
         self,
@@ -41,10 +312,59 @@ class RerankingSearchClient(search_client.SearchClient):
         big_fetch_count = count * self.conf.fetch_multiplier
         if big_fetch_count > self.conf.max_fetch_results:
             big_fetch_count = self.conf.max_fetch_results
+        fetch_count = self._fetch_count(count, big_fetch_count)
+        self.last_fetch_count = fetch_count
 
-        response = await super().search_chunks(access_token, query, big_fetch_count, filters)
-        ranker = Reranker(self.conf.reranking_algorithm)
-        return self.rerank(query, response.relevant_chunks, ranker, count)
+        response = await super().search_chunks(access_token, query, fetch_count, filters)
+        fetched_chunks = response.relevant_chunks
+        if not fetched_chunks:
+            return []
+        scores = await self._score(query, fetched_chunks)
+        fused, selected = self._select(fetched_chunks, scores, count)
+        if self.conf.adaptive_fetch and fetch_count == big_fetch_count:
+            # Only full fetches show where the top results would have come from
+            self._fetch_sizer.record(selected, count)
+        return self._copy_with_scores(fetched_chunks, fused, selected)
+
+    @property
+    def adaptive_fetch_multiplier(self) -> float | None:
+        """Fetch multiplier currently chosen by adaptive fetch sizing, or None until enough queries were observed."""
+        return self._fetch_sizer.multiplier()
+
+    def _fetch_count(self, count: int, max_fetch_count: int) -> int:
+        if not self.conf.adaptive_fetch or random.random() < self.conf.adaptive_exploration_rate:  # noqa: S311
+            return max_fetch_count
+        multiplier = self._fetch_sizer.multiplier()
+        if multiplier is None:
+            return max_fetch_count
+        # Never fewer than the results requested, nor more than the configured cap, which wins if they conflict
+        return min(max(count, math.ceil(multiplier * count)), max_fetch_count)
+
+    async def _score(self, query: str, fetched_chunks: list[RelevantChunk]) -> list[float]:
+        cache = self._score_cache
+        if cache is None or self.conf.reranking_algorithm in _LEXICAL_RERANKERS:
+            # Lexical scores depend on the whole candidate set, so they cannot be reused for other candidates
+            return await self._batcher.score(query, [c.chunk_body for c in fetched_chunks])
+
+        algorithm = repr((self.conf.reranking_algorithm, sorted(self.conf.reranker_options.items())))
+        normalized_query = _normalize_query(query)
+        keys = [
+            (
+                algorithm,
+                normalized_query,
+                c.chunk.chunk_hash or hashlib.sha256(c.chunk_body.encode()).hexdigest(),
+            )
+            for c in fetched_chunks
+        ]
+        cached = [cache.get(key) for key in keys]
+        uncached = [index for index, score in enumerate(cached) if score is None]
+        if uncached:
+            # Only chunks without a cached score are sent to the model
+            new_scores = await self._batcher.score(query, [fetched_chunks[index].chunk_body for index in uncached])
+            for index, score in zip(uncached, new_scores, strict=True):
+                cached[index] = score
+                cache.set(keys[index], score)
+        return [score for score in cached if score is not None]
 
     def rerank(self, query_string: str, fetched_chunks: list[RelevantChunk], ranker, top_k):
         """
@@ -55,12 +375,39 @@ class RerankingSearchClient(search_client.SearchClient):
         :param fetched_chunks: Chunks fetched from original query
         :type fetched_chunks: list[RelevantChunk]
         """
-        docs = [c.chunk_body for c in fetched_chunks]
-        ranker_results = ranker.rank(query_string, docs)
-        merged_results = []
-        for res in ranker_results:
-            original_chunk = fetched_chunks[res.doc_id]
-            original_chunk.relevance.similarity_score = res.score
-            merged_results.append(original_chunk)
-
-        return merged_results[:top_k]
+        scores = _score(ranker, query_string, [c.chunk_body for c in fetched_chunks])
+        return self._merge(fetched_chunks, scores, top_k)
+
+    def _merge(self, fetched_chunks: list[RelevantChunk], scores: list[float], top_k: int) -> list[RelevantChunk]:
+        fused, selected = self._select(fetched_chunks, scores, top_k)
+        return self._copy_with_scores(fetched_chunks, fused, selected)
+
+    def _select(
+        self, fetched_chunks: list[RelevantChunk], scores: list[float], top_k: int
+    ) -> tuple[Sequence[float], list[int]]:
+        if FusionMode(self.conf.fusion) is FusionMode.RerankOnly:
+            # Ties are broken by original position, like a stable sort of the full list. Fusion is the only step
+            # which needs numpy, so the default mode works without the reranking extra
+            return scores, heapq.nsmallest(top_k, range(len(scores)), key=lambda index: (-scores[index], index))
+        fused = fuse_scores(
+            [c.relevance.similarity_score for c in fetched_chunks],
+            scores,
+            self.conf.fusion,
+            weight=self.conf.fusion_weight,
+            rrf_k=self.conf.rrf_k,
+        )
+        return fused.tolist(), top_k_indices(fused, top_k).tolist()
+
+    @staticmethod
+    def _copy_with_scores(
+        fetched_chunks: list[RelevantChunk], fused: Sequence[float], selected: list[int]
+    ) -> list[RelevantChunk]:
+        # Copies of the selected chunks carrying the fused score; the fetched chunks are left untouched. Lazily
+        # decoded chunks are read-only, so only the selected ones are decoded in full
+        return [
+            replace(
+                chunk.to_message() if isinstance(chunk := fetched_chunks[index], LazyMessage) else chunk,
+                relevance=RelevantChunkRelevance(similarity_score=float(fused[index])),
+            )
+            for index in selected
+        ]
@@ -0,0 +1,509 @@
+import asyncio
+import contextlib
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, replace
+from enum import StrEnum
+from typing import Generic, TypeVar
+
+import httpx
+from grpclib.const import Status
+
+from redactive.scheduling import _TokenBucket
+
+T = TypeVar("T")
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    """ Maximum number of attempts per call, including the first one """
+    initial_backoff: float = 0.1
+    """ Delay in seconds before the first retry """
+    max_backoff: float = 2.0
+    """ Upper bound on the delay in seconds before a retry """
+    backoff_multiplier: float = 2.0
+    jitter: float = 1.0
+    """ Share of each delay drawn at random, from 0 (no jitter) to 1 (full jitter) """
+    retryable_grpc_statuses: frozenset[Status] = frozenset({Status.UNAVAILABLE})
+    retryable_http_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+    max_retry_after: float = 30.0
+    """ Upper bound on the delay in seconds a server may ask for with `Retry-After`; responses asking for a longer
+        delay are not retried """
+    budget_capacity: float = 10.0
+    """ Maximum number of retries the retry budget can hold, and the number it starts with """
+    budget_ratio: float = 0.1
+    """ Retries added to the retry budget per call, so that retries are at most this share of calls in the long run """
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            msg = "max_attempts must be at least 1"
+            raise ValueError(msg)
+        if not 0 <= self.jitter <= 1:
+            msg = "jitter must be between 0 and 1"
+            raise ValueError(msg)
+
+    def backoff(self, retry: int) -> float:
+        """
+        Return the delay in seconds before a retry.
+
+        :param retry: The number of the retry, starting at 1.
+        :type retry: int
+        """
+        delay = min(self.max_backoff, self.initial_backoff * self.backoff_multiplier ** (retry - 1))
+        return delay * (1 - self.jitter * random.random())  # noqa: S311
+
+
+@dataclass
+class RetryStats:
+    attempts: int = 0
+    """ Number of attempts made, including first attempts """
+    retries: int = 0
+    budget_exhausted: int = 0
+    """ Number of failed attempts not retried because the retry budget was spent """
+    budget: float = 0.0
+    """ Number of retries currently available in the retry budget """
+
+
+class _Retrier:
+    """
+    Retries calls failing with a retryable error, with exponential backoff, bounded by a token-bucket retry budget.
+    """
+
+    def __init__(self, policy: RetryPolicy, sleep: Callable[[float], Awaitable[None]] = asyncio.sleep) -> None:
+        self.policy = policy
+        self._sleep = sleep
+        self._budget = policy.budget_capacity
+        self._stats = RetryStats()
+
+    @property
+    def stats(self) -> RetryStats:
+        return replace(self._stats, budget=self._budget)
+
+    def _withdraw(self) -> bool:
+        if self._budget < 1:
+            self._stats.budget_exhausted += 1
+            return False
+        self._budget -= 1
+        return True
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        is_retryable: Callable[[Exception], bool],
+        time_remaining: Callable[[], float | None] = lambda: None,
+        retry_after: Callable[[Exception], float | None] = lambda _: None,
+    ) -> T:
+        """
+        Run `call`, retrying it while it fails with an error for which `is_retryable` is true.
+
+        `time_remaining` returns the time left before the caller's deadline, if any; a retry which could not start
+        before the deadline is not attempted. `retry_after` returns the delay the server asked for before a retry,
+        if any, which replaces a shorter backoff.
+        """
+        self._budget = min(self.policy.budget_capacity, self._budget + self.policy.budget_ratio)
+        attempt = 1
+        while True:
+            self._stats.attempts += 1
+            try:
+                return await call()
+            except Exception as e:
+                if attempt >= self.policy.max_attempts or not is_retryable(e):
+                    raise
+                delay = self.policy.backoff(attempt)
+                requested = retry_after(e)
+                if requested is not None:
+                    if requested > self.policy.max_retry_after:
+                        raise
+                    delay = max(delay, requested)
+                remaining = time_remaining()
+                if remaining is not None and remaining <= delay:
+                    raise
+                if not self._withdraw():
+                    raise
+            self._stats.retries += 1
+            attempt += 1
+            await self._sleep(delay)
+
+
+@dataclass
+class HedgingPolicy:
+    percentile: float = 95.0
+    """ A duplicate request is sent once the original has been outstanding for longer than this percentile of recent
+        response times """
+    initial_delay: float = 0.1
+    """ Delay in seconds before sending a duplicate, until `min_observations` response times have been recorded """
+    min_delay: float = 0.005
+    """ Lower bound on the delay in seconds before sending a duplicate """
+    window: int = 1000
+    """ Number of recent calls the response time percentile and hedge ratio are computed over """
+    min_observations: int = 20
+    max_hedge_ratio: float = 0.1
+    """ Upper bound on the share of recent calls which were hedged; no duplicate is sent while it is reached """
+
+    def __post_init__(self) -> None:
+        if not 0 < self.percentile < 100:  # noqa: PLR2004
+            msg = "percentile must be between 0 and 100"
+            raise ValueError(msg)
+        if not 0 <= self.max_hedge_ratio <= 1:
+            msg = "max_hedge_ratio must be between 0 and 1"
+            raise ValueError(msg)
+
+
+class _Hedger(Generic[T]):
+    """
+    Runs idempotent calls, sending a duplicate of any call still outstanding after a percentile of recent response
+    times and returning whichever answers first.
+    """
+
+    def __init__(self, policy: HedgingPolicy, clock: Callable[[], float] = time.monotonic) -> None:
+        self.policy = policy
+        self._clock = clock
+        self._latencies: deque[float] = deque(maxlen=policy.window)
+        self._hedged: deque[bool] = deque(maxlen=policy.window)
+        self._hedged_count = 0
+        self.hedges = 0
+        """ Number of duplicate requests sent """
+        self.hedge_wins = 0
+        """ Number of calls answered by the duplicate request """
+
+    @property
+    def delay(self) -> float:
+        if len(self._latencies) < self.policy.min_observations:
+            return max(self.policy.initial_delay, self.policy.min_delay)
+        latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * self.policy.percentile / 100))
+        return max(latencies[index], self.policy.min_delay)
+
+    def _record_call(self, hedged: bool) -> None:  # noqa: FBT001
+        if len(self._hedged) == self._hedged.maxlen and self._hedged[0]:
+            self._hedged_count -= 1
+        self._hedged.append(hedged)
+        self._hedged_count += hedged
+
+    def _may_hedge(self) -> bool:
+        return self._hedged_count < self.policy.max_hedge_ratio * max(len(self._hedged), 1)
+
+    async def _timed(self, call: Callable[[], Awaitable[T]]) -> T:
+        start = self._clock()
+        result = await call()
+        self._latencies.append(self._clock() - start)
+        return result
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        primary = asyncio.ensure_future(self._timed(call))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay)
+            if done or not self._may_hedge():
+                self._record_call(hedged=False)
+                return await primary
+
+            self._record_call(hedged=True)
+            self.hedges += 1
+            hedge = asyncio.ensure_future(self._timed(call))
+            tasks.add(hedge)
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None:
+                        self.hedge_wins += task is hedge
+                        return task.result()
+                if not tasks:
+                    # Both requests failed; report the original failure
+                    return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class ConcurrencyLimitExceededError(Exception):
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        super().__init__(f"Concurrency limit of {limit} calls reached")
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: float) -> None:
+        self.retry_after = retry_after
+        super().__init__(f"Circuit breaker is open, retry in {retry_after:.1f}s")
+
+
+@dataclass
+class ConcurrencyLimitPolicy:
+    initial_limit: int = 20
+    min_limit: int = 1
+    max_limit: int = 200
+    latency_threshold: float = 1.0
+    """ Calls slower than this many seconds are taken as a sign of overload, as are failures of the service """
+    backoff_ratio: float = 0.9
+    """ Factor the limit is multiplied by on a sign of overload """
+    max_queued: int = 100
+    """ Maximum number of calls waiting for the limit; further calls fail immediately """
+    max_queue_wait: float | None = 1.0
+    """ Maximum time in seconds a call waits for the limit before failing, or None to wait until its deadline """
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.min_limit <= self.initial_limit <= self.max_limit:
+            msg = "Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit"
+            raise ValueError(msg)
+        if not 0 < self.backoff_ratio < 1:
+            msg = "backoff_ratio must be between 0 and 1"
+            raise ValueError(msg)
+
+
+@dataclass
+class ConcurrencyLimitStats:
+    limit: int
+    in_flight: int
+    queued: int
+    rejected: int
+    """ Number of calls failed because the queue was full or the wait timed out """
+
+
+class _AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit: the limit grows by one per timely response while it is in use, and shrinks
+    multiplicatively on slow responses or failures. Calls over the limit queue in FIFO order.
+    """
+
+    def __init__(self, policy: ConcurrencyLimitPolicy) -> None:
+        self.policy = policy
+        self._limit = float(policy.initial_limit)
+        self._in_flight = 0
+        self._rejected = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def stats(self) -> ConcurrencyLimitStats:
+        return ConcurrencyLimitStats(
+            limit=int(self._limit), in_flight=self._in_flight, queued=len(self._waiters), rejected=self._rejected
+        )
+
+    def _reject(self) -> ConcurrencyLimitExceededError:
+        self._rejected += 1
+        return ConcurrencyLimitExceededError(int(self._limit))
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < int(self._limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot is handed over, so that no new call can take it first
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    async def acquire(self, timeout: float | None = None) -> None:
+        if self._in_flight < int(self._limit) and not self._waiters:
+            self._in_flight += 1
+            return
+        if len(self._waiters) >= self.policy.max_queued:
+            raise self._reject()
+
+        if self.policy.max_queue_wait is not None:
+            timeout = self.policy.max_queue_wait if timeout is None else min(timeout, self.policy.max_queue_wait)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(timeout):
+                await waiter
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the wait ended
+                self.release(None, overloaded=False)
+            else:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+            if isinstance(e, TimeoutError):
+                raise self._reject() from None
+            raise
+
+    def release(self, latency: float | None, *, overloaded: bool) -> None:
+        """
+        Release a slot. `latency` is the call's response time, or None if it completed without a response.
+        """
+        if overloaded or (latency is not None and latency > self.policy.latency_threshold):
+            self._limit = max(self.policy.min_limit, self._limit * self.policy.backoff_ratio)
+        elif latency is not None and self._in_flight * 2 >= self._limit:
+            # Only grow the limit while it is in use
+            self._limit = min(self.policy.max_limit, self._limit + 1)
+        self._in_flight -= 1
+        self._wake()
+
+
+class CircuitState(StrEnum):
+    Closed = "closed"
+    """ Calls are sent """
+    Open = "open"
+    """ Calls fail immediately """
+    HalfOpen = "half-open"
+    """ A few probe calls are sent, to find out whether the service has recovered """
+
+
+@dataclass
+class CircuitBreakerPolicy:
+    failure_rate_threshold: float = 0.5
+    """ The circuit opens once this share of recent calls failed """
+    minimum_calls: int = 20
+    """ Minimum number of recent calls before the failure rate is considered """
+    window: int = 100
+    """ Number of recent calls the failure rate is computed over """
+    open_duration: float = 30.0
+    """ Time in seconds the circuit stays open before probing the service """
+    half_open_probes: int = 3
+    """ Number of successful probe calls needed to close the circuit """
+
+    def __post_init__(self) -> None:
+        if not 0 < self.failure_rate_threshold <= 1:
+            msg = "failure_rate_threshold must be between 0 and 1"
+            raise ValueError(msg)
+
+
+class _CircuitBreaker:
+    def __init__(self, policy: CircuitBreakerPolicy, clock: Callable[[], float] = time.monotonic) -> None:
+        self.policy = policy
+        self._clock = clock
+        self._state = CircuitState.Closed
+        self._outcomes: deque[bool] = deque(maxlen=policy.window)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.Open and self._clock() - self._opened_at >= self.policy.open_duration:
+            self._state = CircuitState.HalfOpen
+            self._probes = 0
+            self._probe_successes = 0
+        return self._state
+
+    def _open(self) -> None:
+        self._state = CircuitState.Open
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self._failures = 0
+
+    def before_call(self) -> bool:
+        """
+        Admit a call, returning whether it is a probe.
+
+        :raises CircuitOpenError: If the circuit is open, or all probes are already in flight.
+        """
+        state = self.state
+        if state == CircuitState.Closed:
+            return False
+        if state == CircuitState.HalfOpen and self._probes + self._probe_successes < self.policy.half_open_probes:
+            self._probes += 1
+            return True
+        retry_after = max(0.0, self._opened_at + self.policy.open_duration - self._clock())
+        raise CircuitOpenError(retry_after)
+
+    def record(self, probe: bool, success: bool | None) -> None:  # noqa: FBT001
+        """
+        Record the outcome of a call; `success` is None if the call completed without an outcome, e.g. cancelled.
+        """
+        if probe:
+            self._probes -= 1
+            if success is False:
+                self._open()
+            elif success and self._state == CircuitState.HalfOpen:
+                self._probe_successes += 1
+                if self._probe_successes >= self.policy.half_open_probes:
+                    self._state = CircuitState.Closed
+            return
+        if success is None or self._state != CircuitState.Closed:
+            return
+        if len(self._outcomes) == self._outcomes.maxlen and not self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(success)
+        self._failures += not success
+        if len(
+            self._outcomes
+        ) >= self.policy.minimum_calls and self._failures >= self.policy.failure_rate_threshold * len(self._outcomes):
+            self._open()
+
+
+class RateLimitExceededError(httpx.RequestError):
+    def __init__(self, retry_after: float) -> None:
+        self.retry_after = retry_after
+        super().__init__(f"Client-side rate limit reached, retry in {retry_after:.1f}s")
+
+
+@dataclass
+class RateLimitPolicy:
+    requests_per_second: float = 10.0
+    """ Sustained rate of requests allowed """
+    burst: int = 20
+    """ Number of requests which may be sent at once after a quiet period """
+    max_wait: float = 10.0
+    """ Maximum time in seconds a request waits for its turn before being rejected """
+
+    def __post_init__(self) -> None:
+        if self.requests_per_second <= 0 or self.burst < 1:
+            msg = "requests_per_second must be positive and burst at least 1"
+            raise ValueError(msg)
+
+
+@dataclass
+class RateLimitStats:
+    admitted: int = 0
+    delayed: int = 0
+    """ Number of admitted requests which waited for their turn """
+    rejected: int = 0
+    total_wait: float = 0.0
+    """ Total time in seconds admitted requests waited """
+
+
+class _RateLimiter:
+    """
+    Admits requests at a sustained rate in arrival order, delaying them by up to `max_wait`. Admission is paused
+    entirely for as long as the server asks with `Retry-After`.
+    """
+
+    def __init__(
+        self,
+        policy: RateLimitPolicy,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.policy = policy
+        self._clock = clock
+        self._sleep = sleep
+        self._bucket = _TokenBucket(policy.requests_per_second, policy.burst, clock)
+        self._paused_until = 0.0
+        self._stats = RateLimitStats()
+
+    @property
+    def stats(self) -> RateLimitStats:
+        return replace(self._stats)
+
+    def pause(self, duration: float) -> None:
+        self._paused_until = max(self._paused_until, self._clock() + duration)
+
+    async def acquire(self) -> None:
+        """
+        Wait for the request's turn.
+
+        :raises RateLimitExceededError: If the request would wait longer than `max_wait`.
+        """
+        paused = max(0.0, self._paused_until - self._clock())
+        wait = None
+        if paused <= self.policy.max_wait:
+            # Reserving a token keeps requests in arrival order, as later requests wait for later tokens
+            wait = self._bucket.reserve(1, self.policy.max_wait)
+        if wait is None:
+            self._stats.rejected += 1
+            raise RateLimitExceededError(max(paused, self._bucket.time_until(1)))
+        wait = max(wait, paused)
+        self._stats.admitted += 1
+        if wait > 0:
+            self._stats.delayed += 1
+            self._stats.total_wait += wait
+            await self._sleep(wait)
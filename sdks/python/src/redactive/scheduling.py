@@ -0,0 +1,372 @@
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from enum import StrEnum
+
+from redactive.caching import _LRUCache
+
+
+class Priority(StrEnum):
+    Interactive = "interactive"
+    """ Latency-sensitive calls, e.g. made while a user waits for an answer """
+    Batch = "batch"
+    """ Background calls, e.g. bulk document crawls, which use the capacity interactive calls leave """
+
+
+class SchedulingMode(StrEnum):
+    Strict = "strict"
+    """ Queued interactive calls always start before queued batch calls """
+    Weighted = "weighted"
+    """ Queued calls start in proportion to the weight of their priority, so batch calls cannot be starved """
+
+
+@dataclass
+class PriorityPolicy:
+    max_concurrency: int = 100
+    """ Maximum number of calls in flight across all priorities """
+    mode: SchedulingMode | str = SchedulingMode.Strict
+    weights: dict[Priority, int] = field(default_factory=lambda: {Priority.Interactive: 4, Priority.Batch: 1})
+    """ Share of the capacity given to each priority while both have calls queued, in weighted mode """
+    interactive_reserve: int = 0
+    """ Number of slots batch calls may not use, kept free for interactive calls """
+
+    def __post_init__(self) -> None:
+        self.mode = SchedulingMode(self.mode)
+        if self.max_concurrency < 1:
+            msg = "max_concurrency must be at least 1"
+            raise ValueError(msg)
+        if not 0 <= self.interactive_reserve < self.max_concurrency:
+            msg = "interactive_reserve must be between 0 and max_concurrency - 1"
+            raise ValueError(msg)
+        if any(self.weights.get(priority, 0) < 1 for priority in Priority):
+            msg = "Every priority must have a weight of at least 1"
+            raise ValueError(msg)
+
+
+@dataclass
+class LaneStats:
+    queued: int = 0
+    in_flight: int = 0
+    started: int = 0
+    """ Number of calls started, whether immediately or after waiting """
+    total_wait: float = 0.0
+    """ Total time in seconds calls waited in the queue """
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.started if self.started else 0.0
+
+
+class _LaneScheduler:
+    """
+    Shares a number of call slots between priorities, queueing calls which cannot start yet per priority.
+    """
+
+    def __init__(
+        self,
+        policy: PriorityPolicy,
+        capacity: Callable[[], int] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.policy = policy
+        self._capacity = capacity
+        self._clock = clock
+        self._waiters: dict[Priority, deque[tuple[asyncio.Future[None], float]]] = {p: deque() for p in Priority}
+        self._in_flight = dict.fromkeys(Priority, 0)
+        self._stats = {priority: LaneStats() for priority in Priority}
+        self._credits = dict.fromkeys(Priority, 0)
+
+    @property
+    def stats(self) -> dict[Priority, LaneStats]:
+        return {
+            priority: replace(stats, queued=len(self._waiters[priority]), in_flight=self._in_flight[priority])
+            for priority, stats in self._stats.items()
+        }
+
+    def _can_start(self, priority: Priority) -> bool:
+        capacity = self.policy.max_concurrency
+        if self._capacity is not None:
+            capacity = min(capacity, self._capacity())
+        if priority == Priority.Batch:
+            capacity -= self.policy.interactive_reserve
+        return sum(self._in_flight.values()) < capacity
+
+    def _next_priority(self) -> Priority | None:
+        candidates = [priority for priority in Priority if self._waiters[priority] and self._can_start(priority)]
+        if len(candidates) <= 1 or self.policy.mode == SchedulingMode.Strict:
+            return candidates[0] if candidates else None
+        # Smooth weighted round-robin between the priorities with queued calls
+        for priority in candidates:
+            self._credits[priority] += self.policy.weights[priority]
+        chosen = max(candidates, key=lambda priority: self._credits[priority])
+        self._credits[chosen] -= sum(self.policy.weights[priority] for priority in candidates)
+        return chosen
+
+    def _start(self, priority: Priority, wait: float) -> None:
+        self._in_flight[priority] += 1
+        stats = self._stats[priority]
+        stats.started += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+
+    def _dispatch(self) -> None:
+        while (priority := self._next_priority()) is not None:
+            waiter, queued_at = self._waiters[priority].popleft()
+            if not waiter.done():
+                self._start(priority, self._clock() - queued_at)
+                waiter.set_result(None)
+
+    async def acquire(self, priority: Priority, timeout: float | None = None) -> None:
+        """
+        Wait for a slot for a call of the given priority.
+
+        :raises TimeoutError: If no slot is available within `timeout` seconds.
+        """
+        # The capacity may have grown since the last call ended
+        self._dispatch()
+        if not self._waiters[priority] and self._can_start(priority):
+            self._start(priority, 0.0)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, self._clock())
+        self._waiters[priority].append(entry)
+        try:
+            async with asyncio.timeout(timeout):
+                await waiter
+        except (TimeoutError, asyncio.CancelledError):
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the wait ended
+                self.release(priority)
+            else:
+                with contextlib.suppress(ValueError):
+                    self._waiters[priority].remove(entry)
+            raise
+
+    def release(self, priority: Priority) -> None:
+        self._in_flight[priority] -= 1
+        self._dispatch()
+
+
+class UserThrottledError(Exception):
+    def __init__(self, user_id: str, reason: str, retry_after: float | None = None) -> None:
+        self.user_id = user_id
+        self.retry_after = retry_after
+        super().__init__(f"Call for user '{user_id}' throttled: {reason}")
+
+
+@dataclass
+class FairSchedulingPolicy:
+    max_concurrency: int = 32
+    """ Maximum number of calls in flight across all users """
+    quantum: int = 1
+    """ Cost credited to a user each round; each call, including each query of a batched search, costs 1 """
+    max_queued_per_user: int = 100
+    """ Maximum number of calls a user may have waiting; further calls are rejected immediately """
+    max_wait: float | None = 5.0
+    """ Maximum time in seconds a call waits for its turn before being rejected, or None to wait indefinitely """
+
+    def __post_init__(self) -> None:
+        if self.max_concurrency < 1 or self.quantum < 1:
+            msg = "max_concurrency and quantum must be at least 1"
+            raise ValueError(msg)
+
+
+@dataclass
+class FairSchedulerStats:
+    in_flight: int
+    queued: int
+    waiting_users: int
+    rejected: int
+
+
+class _FairScheduler:
+    """
+    Shares a number of call slots between users by deficit round-robin: each user with queued calls is credited
+    `quantum` per round and starts calls while the credit covers their cost, so a user with many queued calls cannot
+    delay other users by more than a round.
+    """
+
+    def __init__(self, policy: FairSchedulingPolicy) -> None:
+        self.policy = policy
+        self._queues: dict[str, deque[tuple[asyncio.Future[None], int]]] = {}
+        self._active: deque[str] = deque()
+        self._deficits: dict[str, int] = {}
+        self._head_credited = False
+        self._in_flight = 0
+        self._rejected = 0
+
+    @property
+    def stats(self) -> FairSchedulerStats:
+        return FairSchedulerStats(
+            in_flight=self._in_flight,
+            queued=sum(len(queue) for queue in self._queues.values()),
+            waiting_users=len(self._active),
+            rejected=self._rejected,
+        )
+
+    def _deactivate(self, user_id: str) -> None:
+        if self._active and self._active[0] == user_id:
+            self._head_credited = False
+        self._active.remove(user_id)
+        del self._queues[user_id]
+        del self._deficits[user_id]
+
+    def _dispatch(self) -> None:
+        while self._active and self._in_flight < self.policy.max_concurrency:
+            user_id = self._active[0]
+            queue = self._queues[user_id]
+            waiter, cost = queue[0]
+            if waiter.done():
+                queue.popleft()
+                if not queue:
+                    self._deactivate(user_id)
+                continue
+            if not self._head_credited:
+                self._deficits[user_id] += self.policy.quantum
+                self._head_credited = True
+            if self._deficits[user_id] < cost:
+                self._active.rotate(-1)
+                self._head_credited = False
+                continue
+            self._deficits[user_id] -= cost
+            queue.popleft()
+            self._in_flight += 1
+            waiter.set_result(None)
+            if not queue:
+                self._deactivate(user_id)
+
+    async def acquire(self, user_id: str, cost: int = 1) -> None:
+        """
+        Wait for a slot for a call made on behalf of `user_id`.
+
+        :raises UserThrottledError: If the user has too many calls queued, or the call waited too long.
+        """
+        if not self._active and self._in_flight < self.policy.max_concurrency:
+            self._in_flight += 1
+            return
+        queue = self._queues.get(user_id)
+        if queue is not None and len(queue) >= self.policy.max_queued_per_user:
+            self._rejected += 1
+            raise UserThrottledError(user_id, "too many calls queued")
+
+        if queue is None:
+            queue = self._queues[user_id] = deque()
+            self._active.append(user_id)
+            self._deficits[user_id] = 0
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, cost)
+        queue.append(entry)
+        try:
+            async with asyncio.timeout(self.policy.max_wait):
+                await waiter
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the wait ended
+                self.release()
+            elif self._queues.get(user_id) is queue:
+                with contextlib.suppress(ValueError):
+                    queue.remove(entry)
+                if not queue:
+                    self._deactivate(user_id)
+            if isinstance(e, TimeoutError):
+                self._rejected += 1
+                raise UserThrottledError(user_id, "timed out waiting for a turn") from None
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+
+    def reserve(self, cost: float = 1, max_wait: float = 0.0) -> float | None:
+        """
+        Take `cost` tokens, returning how long the caller must wait for them to become available, or None if that
+        exceeds `max_wait`, in which case nothing is taken.
+        """
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        wait = max(0.0, (cost - self._tokens) / self.rate)
+        if wait > max_wait:
+            return None
+        # Tokens may go negative, reserving future tokens for a caller which waits
+        self._tokens -= cost
+        return wait
+
+    def time_until(self, cost: float = 1) -> float:
+        return max(0.0, (cost - self._tokens) / self.rate - (self._clock() - self._updated))
+
+
+@dataclass
+class UserQuota:
+    searches_per_second: float | None = None
+    """ Sustained rate of search queries allowed per user, or None for no limit """
+    search_burst: int = 10
+    documents_per_second: float | None = None
+    """ Sustained rate of document fetches allowed per user, or None for no limit """
+    document_burst: int = 10
+    max_wait: float = 0.0
+    """ Maximum time in seconds a call waits for its user's quota before being rejected """
+    max_users: int = 10000
+    """ Maximum number of users whose quota usage is tracked; the least recently active are forgotten """
+
+    def __post_init__(self) -> None:
+        for rate in (self.searches_per_second, self.documents_per_second):
+            if rate is not None and rate <= 0:
+                msg = "searches_per_second and documents_per_second must be positive or None"
+                raise ValueError(msg)
+        if self.search_burst < 1 or self.document_burst < 1 or self.max_users < 1:
+            msg = "search_burst, document_burst and max_users must be at least 1"
+            raise ValueError(msg)
+        if self.max_wait < 0:
+            msg = "max_wait must not be negative"
+            raise ValueError(msg)
+
+
+class _UserQuotas:
+    def __init__(self, quota: UserQuota, clock: Callable[[], float] = time.monotonic) -> None:
+        self.quota = quota
+        self._clock = clock
+        self._buckets: _LRUCache[tuple[str, str], _TokenBucket] = _LRUCache(max_entries=quota.max_users)
+
+    def _limits(self, operation: str) -> tuple[float | None, int]:
+        if operation == "search":
+            return self.quota.searches_per_second, self.quota.search_burst
+        return self.quota.documents_per_second, self.quota.document_burst
+
+    async def take(self, user_id: str, operation: str, cost: int = 1) -> None:
+        """
+        Take `cost` units of a user's quota for `operation` ("search" or "document"), waiting up to `max_wait`.
+
+        :raises UserThrottledError: If the quota is not available in time, or `cost` exceeds the quota's burst, in
+            which case `retry_after` is None.
+        """
+        rate, burst = self._limits(operation)
+        if rate is None:
+            return
+        if cost > burst:
+            # The bucket never holds more than `burst` tokens, so waiting would not help
+            msg = f"{operation} batch of {cost} exceeds the quota burst of {burst}"
+            raise UserThrottledError(user_id, msg)
+        bucket = self._buckets.get((user_id, operation))
+        if bucket is None:
+            bucket = _TokenBucket(rate, burst, self._clock)
+            self._buckets.set((user_id, operation), bucket)
+        wait = bucket.reserve(cost, self.quota.max_wait)
+        if wait is None:
+            raise UserThrottledError(user_id, f"{operation} quota exceeded", retry_after=bucket.time_until(cost))
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -1,9 +1,22 @@
-from typing import Any
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, ClassVar, Self, cast
 
-from grpclib.client import Channel
+import betterproto.lib.google.protobuf as betterproto_lib_google_protobuf
+from grpclib.const import Cardinality, Status
+from grpclib.exceptions import GRPCError, StreamTerminatedError
+from grpclib.metadata import Deadline
 
+from redactive._channel_pool import ChannelPool
 from redactive._connection_mode import get_default_grpc_host_and_port as _get_default_grpc_host_and_port
+from redactive._singleflight import SingleFlight
+from redactive._wire import RawMessage, iter_fields
+from redactive.caching import DocumentCache, SearchCache, _token_scope
+from redactive.codecs import CodecBackend, decode, protobuf_type
 from redactive.grpc.v2 import (
+    Chunk,
     Filters,
     GetDocumentRequest,
     GetDocumentResponse,
@@ -12,17 +25,139 @@ from redactive.grpc.v2 import (
     SearchChunksResponse,
     SearchStub,
 )
+from redactive.lazy import LazyMessage
+from redactive.resilience import (
+    CircuitBreakerPolicy,
+    CircuitState,
+    ConcurrencyLimitPolicy,
+    ConcurrencyLimitStats,
+    HedgingPolicy,
+    RetryPolicy,
+    RetryStats,
+    _AdaptiveConcurrencyLimiter,
+    _CircuitBreaker,
+    _Hedger,
+    _Retrier,
+)
+from redactive.scheduling import LaneStats, Priority, PriorityPolicy, _LaneScheduler
+
+_ROUTES = {
+    "search_chunks": "/redactive.grpc.v2.Search/SearchChunks",
+    "get_document": "/redactive.grpc.v2.Search/GetDocument",
+}
+
+# grpclib only calls `FromString` on a reply type, so RawMessage stands in for a message class whose replies are the
+# serialized bytes. grpclib's signatures require a betterproto message class, hence the cast.
+_RAW_REPLY = cast("type[Any]", RawMessage)
+
+# Statuses reporting that the service, rather than the request, failed
+_SERVICE_FAILURE_STATUSES = frozenset(
+    {Status.UNAVAILABLE, Status.RESOURCE_EXHAUSTED, Status.DEADLINE_EXCEEDED, Status.INTERNAL, Status.UNKNOWN}
+)
+
+
+class DocumentRetrievalError(Exception):
+    def __init__(self, error: betterproto_lib_google_protobuf.Struct | None) -> None:
+        self.error = error
+        super().__init__(f"Document retrieval failed: {error.to_dict() if error is not None else 'unknown error'}")
+
+
+def _iter_document_chunks(data: bytes, codec: CodecBackend = CodecBackend.Betterproto) -> Iterator[Chunk]:
+    # Decodes the chunks of a serialized GetDocumentResponse one at a time, as they are consumed
+    success = False
+    error = None
+    chunk_views = []
+    for field_number, _, value in iter_fields(data):
+        if field_number == 1:
+            success = bool(value)
+        elif field_number == 2:
+            error = betterproto_lib_google_protobuf.Struct().parse(bytes(value))
+        elif field_number == 3:
+            chunk_views.append(value)
+    if not success:
+        raise DocumentRetrievalError(error)
+    for view in chunk_views:
+        yield decode(Chunk, view, codec)
+
+
+def _to_filters(filters: Filters | dict[str, Any] | None) -> Filters | None:
+    if isinstance(filters, dict):
+        return Filters(**filters)
+    return filters
 
 
 class SearchClient:
-    def __init__(self, host: str | None = None, port: int | None = None) -> None:
+    document_stream_route: ClassVar[str | None] = None
+    """ Route of a server-streaming GetDocument-style RPC, used by `iter_document` when the service provides one.
+        Each streamed message is expected to be a GetDocumentResponse carrying a batch of chunks.
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        *,
+        pool_size: int = 1,
+        search_cache: SearchCache | None = None,
+        document_cache: DocumentCache | None = None,
+        coalesce_requests: bool = False,
+        lazy_decoding: bool = False,
+        codec: CodecBackend | str = CodecBackend.Betterproto,
+        timeout: float | None = None,
+        hedging: HedgingPolicy | None = None,
+        retry_policy: RetryPolicy | None = None,
+        concurrency_limit: ConcurrencyLimitPolicy | None = None,
+        circuit_breaker: CircuitBreakerPolicy | None = None,
+        priorities: PriorityPolicy | None = None,
+    ) -> None:
         """
         Redactive API search client.
 
+        The client owns long-lived gRPC channels which are opened lazily on the first call and shared by all
+        concurrent calls. Close them with `aclose()` or by using the client as an async context manager.
+
         :param host: The hostname or IP address of the Redactive API service.
         :type host: str, optional
         :param port: The port number of the Redactive API service.
         :type port: int, optional
+        :param pool_size: The number of gRPC channels (HTTP/2 connections) to spread calls over. Defaults to 1.
+        :type pool_size: int, optional
+        :param search_cache: Cache for `search_chunks` responses. Responses are not cached if None.
+        :type search_cache: SearchCache, optional
+        :param document_cache: Cache for `get_document` responses. Documents are not cached if None.
+        :type document_cache: DocumentCache, optional
+        :param coalesce_requests: Share a single call between identical requests made concurrently with the same
+            access token. The response object is then shared by every caller. Defaults to False.
+        :type coalesce_requests: bool, optional
+        :param lazy_decoding: Return `search_chunks` and `get_document` responses as read-only `LazyMessage` views
+            which decode each field, including each chunk's body and metadata, only when it is first accessed.
+            Defaults to False.
+        :type lazy_decoding: bool, optional
+        :param codec: The codec backend decoding responses. `CodecBackend.Protobuf` decodes with the C-accelerated
+            `google.protobuf` runtime and converts the result to the same `redactive.grpc.v2` messages. Defaults to
+            `CodecBackend.Betterproto`.
+        :type codec: CodecBackend | str, optional
+        :param timeout: Default deadline in seconds for `search_chunks` and `get_document` calls, sent to the service
+            as the gRPC deadline. Calls have no deadline if None.
+        :type timeout: float, optional
+        :param hedging: Send a duplicate of a `search_chunks` or `get_document` call which has not been answered
+            after a percentile of recent response times, and return whichever response arrives first. Calls are not
+            hedged if None.
+        :type hedging: HedgingPolicy, optional
+        :param retry_policy: Policy for retrying calls which fail with a retryable gRPC status or a connection error.
+            Retries are not attempted past the call's deadline. Calls are not retried if None.
+        :type retry_policy: RetryPolicy, optional
+        :param concurrency_limit: Adaptive limit on the number of calls in flight, which shrinks as the service slows
+            down or fails. Calls over the limit wait in a queue, or fail with `ConcurrencyLimitExceededError` once it
+            is full. Calls are not limited if None.
+        :type concurrency_limit: ConcurrencyLimitPolicy, optional
+        :param circuit_breaker: Circuit breaker which fails calls with `CircuitOpenError`, without sending them, once
+            too many recent calls failed. Calls are always sent if None.
+        :type circuit_breaker: CircuitBreakerPolicy, optional
+        :param priorities: Share the client's capacity between interactive and batch calls (see the `priority`
+            argument of each method), giving interactive calls precedence. With a concurrency limit, the capacity is
+            also bounded by the current limit. Calls are started in arrival order if None.
+        :type priorities: PriorityPolicy, optional
         """
         if host is not None and port is None:
             msg = "Port must also be specified if host is specified"
@@ -30,11 +165,229 @@ class SearchClient:
         if port is not None and host is None:
             msg = "Host must also be specified if port is specified"
             raise ValueError(msg)
-        if host is None and port is None:
+        if host is None or port is None:
+            # Both are unset here, as setting only one of them is rejected above
             host, port = _get_default_grpc_host_and_port()
 
         self.host = host
         self.port = port
+        self.search_cache = search_cache
+        self.document_cache = document_cache
+        self.lazy_decoding = lazy_decoding
+        self.codec = CodecBackend(codec)
+        if self.codec == CodecBackend.Protobuf:
+            # Fail early if the generated protobuf code cannot be loaded by the installed runtime
+            protobuf_type(SearchChunksResponse)
+        self.timeout = timeout
+        self._pool = ChannelPool(host, port, size=pool_size)
+        self._in_flight: SingleFlight[tuple[str, str, bytes, bool, float | None], Any] | None = (
+            SingleFlight() if coalesce_requests else None
+        )
+        self._hedgers: dict[str, _Hedger[Any]] | None = None
+        if hedging is not None:
+            self._hedgers = {method: _Hedger(hedging) for method in _ROUTES}
+        self._retrier = _Retrier(retry_policy) if retry_policy is not None else None
+        self._limiter = _AdaptiveConcurrencyLimiter(concurrency_limit) if concurrency_limit is not None else None
+        self._circuit_breaker = _CircuitBreaker(circuit_breaker) if circuit_breaker is not None else None
+        self._scheduler: _LaneScheduler | None = None
+        if priorities is not None:
+            limiter = self._limiter
+            self._scheduler = _LaneScheduler(
+                priorities, capacity=(lambda: limiter.limit) if limiter is not None else None
+            )
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close the underlying gRPC channels. The client may still be used afterwards; channels are reopened on the
+        next call.
+        """
+        self._pool.close()
+
+    @property
+    def channel_in_flight(self) -> list[int]:
+        """Number of calls currently in flight on each pooled gRPC channel."""
+        return self._pool.in_flight
+
+    @property
+    def coalesced_calls(self) -> int:
+        """Number of calls answered by joining an identical call already in flight."""
+        return self._in_flight.coalesced if self._in_flight is not None else 0
+
+    @property
+    def hedged_calls(self) -> int:
+        """Number of duplicate requests sent by hedging."""
+        return sum(hedger.hedges for hedger in self._hedgers.values()) if self._hedgers is not None else 0
+
+    @property
+    def retry_stats(self) -> RetryStats:
+        """Attempt, retry and retry budget counters."""
+        return self._retrier.stats if self._retrier is not None else RetryStats()
+
+    @property
+    def concurrency_limit_stats(self) -> ConcurrencyLimitStats | None:
+        """Current adaptive concurrency limit, calls in flight and queued, or None without a concurrency limit."""
+        return self._limiter.stats if self._limiter is not None else None
+
+    @property
+    def circuit_state(self) -> CircuitState:
+        """State of the circuit breaker; always closed without a circuit breaker."""
+        return self._circuit_breaker.state if self._circuit_breaker is not None else CircuitState.Closed
+
+    @property
+    def lane_stats(self) -> dict[Priority, LaneStats] | None:
+        """Queue depth, calls in flight and queue wait times per priority, or None without priorities."""
+        return self._scheduler.stats if self._scheduler is not None else None
+
+    @staticmethod
+    def _is_service_failure(error: Exception) -> bool:
+        if isinstance(error, GRPCError):
+            return error.status in _SERVICE_FAILURE_STATUSES
+        return isinstance(error, OSError | StreamTerminatedError)
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, GRPCError):
+            return self._retrier is not None and error.status in self._retrier.policy.retryable_grpc_statuses
+        # TimeoutError is an OSError, but signals that the deadline was exceeded
+        return isinstance(error, OSError | StreamTerminatedError) and not isinstance(error, TimeoutError)
+
+    async def _call(
+        self,
+        method: str,
+        request: Any,
+        access_token: str,
+        *,
+        raw: bool = False,
+        timeout: float | None = None,
+        priority: Priority = Priority.Interactive,
+    ) -> Any:
+        timeout = timeout if timeout is not None else self.timeout
+        # The deadline is fixed once, so that coalesced and hedged requests share it
+        deadline = Deadline.from_timeout(timeout) if timeout is not None else None
+        if self._in_flight is None:
+            return await self._retried_rpc(method, request, access_token, raw, deadline, priority)
+        key = (method, _token_scope(access_token), bytes(request), raw, timeout)
+        return await self._in_flight.do(
+            key, lambda: self._retried_rpc(method, request, access_token, raw, deadline, priority)
+        )
+
+    async def _retried_rpc(
+        self,
+        method: str,
+        request: Any,
+        access_token: str,
+        raw: bool,  # noqa: FBT001
+        deadline: Deadline | None,
+        priority: Priority,
+    ) -> Any:
+        if self._retrier is None:
+            return await self._hedged_rpc(method, request, access_token, raw, deadline, priority)
+        return await self._retrier.run(
+            lambda: self._hedged_rpc(method, request, access_token, raw, deadline, priority),
+            self._is_retryable,
+            deadline.time_remaining if deadline is not None else lambda: None,
+        )
+
+    async def _hedged_rpc(
+        self,
+        method: str,
+        request: Any,
+        access_token: str,
+        raw: bool,  # noqa: FBT001
+        deadline: Deadline | None,
+        priority: Priority,
+    ) -> Any:
+        if self._hedgers is None:
+            return await self._rpc(method, request, access_token, raw=raw, deadline=deadline, priority=priority)
+        return await self._hedgers[method].run(
+            lambda: self._rpc(method, request, access_token, raw=raw, deadline=deadline, priority=priority)
+        )
+
+    async def _rpc(
+        self,
+        method: str,
+        request: Any,
+        access_token: str,
+        *,
+        raw: bool = False,
+        deadline: Deadline | None = None,
+        priority: Priority = Priority.Interactive,
+    ) -> Any:
+        async with self._admit(priority, deadline):
+            return await self._send(method, request, access_token, raw, deadline)
+
+    @asynccontextmanager
+    async def _admit(self, priority: Priority, deadline: Deadline | None) -> AsyncIterator[None]:
+        # Holds a call's place with the circuit breaker, scheduler and concurrency limiter until it ends
+        if self._scheduler is None and self._limiter is None and self._circuit_breaker is None:
+            yield
+            return
+
+        probe = self._circuit_breaker.before_call() if self._circuit_breaker is not None else False
+        # True if the service failed, False if it responded, None if the call ended without an outcome
+        failed: bool | None = None
+        try:
+            if self._scheduler is not None:
+                await self._scheduler.acquire(priority, deadline.time_remaining() if deadline is not None else None)
+            try:
+                if self._limiter is not None:
+                    await self._limiter.acquire(deadline.time_remaining() if deadline is not None else None)
+                start = time.monotonic()
+                try:
+                    yield
+                    failed = False
+                except Exception as e:
+                    failed = self._is_service_failure(e)
+                    raise
+                finally:
+                    if self._limiter is not None:
+                        latency = time.monotonic() - start if failed is False else None
+                        self._limiter.release(latency, overloaded=bool(failed))
+            finally:
+                if self._scheduler is not None:
+                    self._scheduler.release(priority)
+        finally:
+            if self._circuit_breaker is not None:
+                self._circuit_breaker.record(probe, None if failed is None else not failed)
+
+    async def _send(
+        self,
+        method: str,
+        request: Any,
+        access_token: str,
+        raw: bool,  # noqa: FBT001
+        deadline: Deadline | None,
+    ) -> Any:
+        async with self._pool.acquire() as channel:
+            stub = SearchStub(channel, deadline=deadline, metadata=({"authorization": f"Bearer {access_token}"}))
+            if raw:
+                # Keep the serialized response, for callers which decode it incrementally
+                return await stub._unary_unary(_ROUTES[method], request, _RAW_REPLY)
+            return await getattr(stub, method)(request)
+
+    async def _call_decoded(
+        self,
+        method: str,
+        request: Any,
+        access_token: str,
+        response_type: type,
+        timeout: float | None,
+        priority: Priority,
+    ) -> Any:
+        if not self.lazy_decoding and self.codec == CodecBackend.Betterproto:
+            return await self._call(method, request, access_token, timeout=timeout, priority=priority)
+        data = await self._call(method, request, access_token, raw=True, timeout=timeout, priority=priority)
+        return self._decode(response_type, data)
+
+    def _decode(self, response_type: type, data: bytes) -> Any:
+        if self.lazy_decoding:
+            return LazyMessage(response_type, data)
+        return decode(response_type, data, self.codec)
 
     async def search_chunks(
         self,
@@ -42,7 +395,10 @@ class SearchClient:
         query: str,
         count: int = 10,
         filters: Filters | dict[str, Any] | None = None,
-    ) -> SearchChunksResponse:
+        timeout: float | None = None,
+        priority: Priority | str = Priority.Interactive,
+        cache_scope: str | None = None,
+    ) -> SearchChunksResponse | LazyMessage[SearchChunksResponse]:
         """
         Query for relevant chunks based on a semantic query.
 
@@ -54,26 +410,111 @@ class SearchClient:
         :type count: int, optional
         :param filters: The filters for relevant chunks. See `Filters` type.
         :type filters: Filters | dict[str, Any], optional
+        :param timeout: Deadline in seconds for the call. Defaults to the client's `timeout`.
+        :type timeout: float, optional
+        :param priority: Scheduling priority of the call. Defaults to interactive.
+        :type priority: Priority | str, optional
+        :param cache_scope: Identifies the user in the search and document caches, e.g. a user ID the caller has
+            authenticated. Defaults to a digest of `access_token`, so cached results are only served to callers
+            presenting the same token.
+        :type cache_scope: str, optional
+        :raises asyncio.TimeoutError: If the deadline is exceeded.
         :return: A list of relevant chunks that match the query
         :rtype: list[RelevantChunk]
         """
-        async with Channel(self.host, self.port, ssl=True) as channel:
-            stub = SearchStub(channel, metadata=({"authorization": f"Bearer {access_token}"}))
+        request = SearchChunksRequest(count=count, query=Query(semantic_query=query), filters=_to_filters(filters))
+        priority = Priority(priority)
+        if self.search_cache is None and self.document_cache is None:
+            return await self._call_decoded(
+                "search_chunks", request, access_token, SearchChunksResponse, timeout, priority
+            )
 
-            _filters: Filters | None = None
-            if isinstance(filters, Filters):
-                _filters = filters
-            elif isinstance(filters, dict):
-                _filters = Filters(**filters)
+        scope = cache_scope if cache_scope is not None else _token_scope(access_token)
+        response = None
+        if self.search_cache is not None:
+            data = self.search_cache.get_serialized(scope, request)
+            response = self._decode(SearchChunksResponse, data) if data is not None else None
+        if response is None:
+            response = await self._call_decoded(
+                "search_chunks", request, access_token, SearchChunksResponse, timeout, priority
+            )
+            if self.search_cache is not None:
+                self.search_cache.set(scope, request, response)
+        if self.document_cache is not None:
+            self.document_cache.observe(scope, response.relevant_chunks)
+        return response
 
-            request = SearchChunksRequest(count=count, query=Query(semantic_query=query), filters=_filters)
-            return await stub.search_chunks(request)
+    async def search_chunks_many(
+        self,
+        access_token: str,
+        queries: Sequence[str],
+        count: int = 10,
+        filters: Filters | dict[str, Any] | None = None,
+        max_concurrency: int = 10,
+        timeout: float | None = None,
+        priority: Priority | str = Priority.Interactive,
+        cache_scope: str | None = None,
+    ) -> list[SearchChunksResponse | LazyMessage[SearchChunksResponse] | Exception]:
+        """
+        Query for relevant chunks for several semantic queries concurrently.
+
+        :param access_token: The user's Redactive access token.
+        :type access_token: str
+        :param queries: The query strings used to find relevant chunks.
+        :type queries: Sequence[str]
+        :param count: The number of relevant chunks to retrieve per query. Defaults to 10.
+        :type count: int, optional
+        :param filters: The filters for relevant chunks, applied to every query. See `Filters` type.
+        :type filters: Filters | dict[str, Any], optional
+        :param max_concurrency: The maximum number of queries in flight at once. Defaults to 10.
+        :type max_concurrency: int, optional
+        :param timeout: Deadline in seconds for each query. Defaults to the client's `timeout`.
+        :type timeout: float, optional
+        :param priority: Scheduling priority of the queries. Defaults to interactive.
+        :type priority: Priority | str, optional
+        :param cache_scope: Identifies the user in the search and document caches, e.g. a user ID the caller has
+            authenticated. Defaults to a digest of `access_token`, so cached results are only served to callers
+            presenting the same token.
+        :type cache_scope: str, optional
+        :return: One response per query, in the order of `queries`. A query that failed is represented by the
+            exception it raised instead of a response.
+        :rtype: list[SearchChunksResponse | LazyMessage[SearchChunksResponse] | Exception]
+        """
+        if max_concurrency < 1:
+            msg = "max_concurrency must be at least 1"
+            raise ValueError(msg)
+
+        _filters = _to_filters(filters)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _search(query: str) -> SearchChunksResponse | LazyMessage[SearchChunksResponse]:
+            async with semaphore:
+                return await self.search_chunks(
+                    access_token,
+                    query,
+                    count,
+                    filters=_filters,
+                    timeout=timeout,
+                    priority=priority,
+                    cache_scope=cache_scope,
+                )
+
+        results = await asyncio.gather(*(_search(query) for query in queries), return_exceptions=True)
+        for result in results:
+            # Cancellation and other BaseExceptions are not per-query failures
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        return cast("list[SearchChunksResponse | LazyMessage[SearchChunksResponse] | Exception]", results)
 
     async def get_document(
         self,
         access_token: str,
         ref: str,
-    ) -> GetDocumentResponse:
+        document_version: str | None = None,
+        timeout: float | None = None,
+        priority: Priority | str = Priority.Interactive,
+        cache_scope: str | None = None,
+    ) -> GetDocumentResponse | LazyMessage[GetDocumentResponse]:
         """
         Query for chunks by document name.
 
@@ -81,11 +522,129 @@ class SearchClient:
         :type access_token: str
         :param ref: A reference to the document we are retrieving.
         :type ref: str
+        :param document_version: The document version the caller expects, used to validate a cached copy of the
+            document. Defaults to the version last reported by search results. Ignored without a document cache.
+        :type document_version: str, optional
+        :param timeout: Deadline in seconds for the call. Defaults to the client's `timeout`.
+        :type timeout: float, optional
+        :param priority: Scheduling priority of the call, e.g. `Priority.Batch` for bulk document fetches. Defaults
+            to interactive.
+        :type priority: Priority | str, optional
+        :param cache_scope: Identifies the user in the search and document caches, e.g. a user ID the caller has
+            authenticated. Defaults to a digest of `access_token`, so cached results are only served to callers
+            presenting the same token.
+        :type cache_scope: str, optional
+        :raises asyncio.TimeoutError: If the deadline is exceeded.
         :return: The complete list of chunks for the matching document.
         :rtype: list[Chunk]
         """
-        async with Channel(self.host, self.port, ssl=True) as channel:
-            stub = SearchStub(channel, metadata=({"authorization": f"Bearer {access_token}"}))
+        request = GetDocumentRequest(ref=ref)
+        priority = Priority(priority)
+        if self.document_cache is None:
+            return await self._call_decoded(
+                "get_document", request, access_token, GetDocumentResponse, timeout, priority
+            )
+
+        # Cached documents are split into their chunks, so they are always decoded in full
+        scope = cache_scope if cache_scope is not None else _token_scope(access_token)
+        response = self.document_cache.get(scope, ref, document_version)
+        if response is None:
+            if self.codec == CodecBackend.Betterproto:
+                response = await self._call("get_document", request, access_token, timeout=timeout, priority=priority)
+            else:
+                data = await self._call(
+                    "get_document", request, access_token, raw=True, timeout=timeout, priority=priority
+                )
+                response = decode(GetDocumentResponse, data, self.codec)
+            self.document_cache.set(scope, ref, response)
+        return response
+
+    async def iter_document(
+        self,
+        access_token: str,
+        ref: str,
+        timeout: float | None = None,
+        priority: Priority | str = Priority.Interactive,
+        cache_scope: str | None = None,
+    ) -> AsyncIterator[Chunk]:
+        """
+        Iterate over the chunks of a document, decoding each chunk only when it is reached.
+
+        Unlike `get_document`, the chunks are not all decoded up front, so the first chunk is available sooner and
+        a caller which stops early never pays for decoding the rest. If the service provides a server-streaming
+        document RPC (see `document_stream_route`), chunks are also received incrementally.
+
+        :param access_token: The user's Redactive access token.
+        :type access_token: str
+        :param ref: A reference to the document we are retrieving.
+        :type ref: str
+        :param timeout: Deadline in seconds for the call, including receiving every chunk of a streamed document.
+            Defaults to the client's `timeout`.
+        :type timeout: float, optional
+        :param priority: Scheduling priority of the call. Defaults to interactive.
+        :type priority: Priority | str, optional
+        :param cache_scope: Identifies the user in the search and document caches, e.g. a user ID the caller has
+            authenticated. Defaults to a digest of `access_token`, so cached results are only served to callers
+            presenting the same token.
+        :type cache_scope: str, optional
+        :raises DocumentRetrievalError: If the service reports that the document could not be retrieved.
+        :raises asyncio.TimeoutError: If the deadline is exceeded.
+        :return: The chunks of the matching document, in order.
+        :rtype: AsyncIterator[Chunk]
+        """
+        request = GetDocumentRequest(ref=ref)
+        priority = Priority(priority)
+        if self.document_cache is not None:
+            scope = cache_scope if cache_scope is not None else _token_scope(access_token)
+            cached = self.document_cache.get(scope, ref)
+            if cached is not None:
+                for chunk in cached.chunks:
+                    yield chunk
+                return
+
+        route = self.document_stream_route
+        if route is None:
+            data = await self._call("get_document", request, access_token, raw=True, timeout=timeout, priority=priority)
+            for chunk in _iter_document_chunks(data, self.codec):
+                yield chunk
+            return
+
+        timeout = timeout if timeout is not None else self.timeout
+        deadline = Deadline.from_timeout(timeout) if timeout is not None else None
+        if self._retrier is None:
+            opened = await self._open_document_stream(route, request, access_token, deadline, priority)
+        else:
+            # Only opening the stream is retried; once chunks have been yielded, a failure is the caller's to handle
+            opened = await self._retrier.run(
+                lambda: self._open_document_stream(route, request, access_token, deadline, priority),
+                self._is_retryable,
+                deadline.time_remaining if deadline is not None else lambda: None,
+            )
+        stack, stream, data = opened
+        async with stack:
+            while data is not None:
+                for chunk in _iter_document_chunks(data, self.codec):
+                    yield chunk
+                data = await stream.recv_message()
 
-            request = GetDocumentRequest(ref=ref)
-            return await stub.get_document(request)
+    async def _open_document_stream(
+        self, route: str, request: GetDocumentRequest, access_token: str, deadline: Deadline | None, priority: Priority
+    ) -> tuple[AsyncExitStack, Any, bytes | None]:
+        # Opens the stream under the same admission as unary calls, and waits for its first message
+        async with AsyncExitStack() as stack:
+            await stack.enter_async_context(self._admit(priority, deadline))
+            channel = await stack.enter_async_context(self._pool.acquire())
+            stream = await stack.enter_async_context(
+                channel.request(
+                    route,
+                    Cardinality.UNARY_STREAM,
+                    GetDocumentRequest,
+                    _RAW_REPLY,
+                    deadline=deadline,
+                    metadata={"authorization": f"Bearer {access_token}"},
+                )
+            )
+            await stream.send_message(request, end=True)
+            data = await stream.recv_message()
+            # The caller takes over the stream, and with it the admission and channel
+            return stack.pop_all(), stream, data
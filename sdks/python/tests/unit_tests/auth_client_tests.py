@@ -1,13 +1,18 @@
 from typing import Any
 from urllib.parse import urlencode
 
+import httpx
 import pytest
 
 from redactive.auth_client import (
     AuthClient,
     BeginConnectionResponse,
+    ConnectionPoolPolicy,
     ExchangeTokenResponse,
+    RateLimitedError,
+    create_http_client,
 )
+from redactive.resilience import RateLimitPolicy, RetryPolicy
 
 
 def build_uri_query(data: dict[str, Any]) -> str:
@@ -48,3 +53,97 @@ async def test_exchange_tokens(mock_client, httpx_mock):
     )
     exchange_response = await mock_client.exchange_tokens(code, refresh_token)
     assert isinstance(exchange_response, ExchangeTokenResponse)
+
+
+@pytest.mark.asyncio
+async def test_list_connections_retries_unavailable(httpx_mock):
+    client = AuthClient(
+        api_key="test_api_key", base_url="https://mock.api", retry_policy=RetryPolicy(initial_backoff=0)
+    )
+    httpx_mock.add_response(status_code=503)
+    httpx_mock.add_exception(httpx.ReadError("connection reset"))
+    httpx_mock.add_response(json={"user_id": "user123", "current_connections": ["confluence"]})
+
+    response = await client.list_connections("access_token")
+
+    assert response.current_connections == ["confluence"]
+    assert client.retry_stats.attempts == 3
+    assert client.retry_stats.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_exchange_tokens_is_not_retried_after_gateway_timeout(httpx_mock):
+    client = AuthClient(
+        api_key="test_api_key", base_url="https://mock.api", retry_policy=RetryPolicy(initial_backoff=0)
+    )
+    httpx_mock.add_response(status_code=504, text="gateway timeout")
+
+    with pytest.raises(httpx.RequestError, match="gateway timeout"):
+        await client.exchange_tokens(refresh_token="refresh_token")
+    assert client.retry_stats.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_exchange_tokens_retries_rate_limited_response(httpx_mock):
+    client = AuthClient(
+        api_key="test_api_key",
+        base_url="https://mock.api",
+        retry_policy=RetryPolicy(initial_backoff=0),
+        rate_limit=RateLimitPolicy(),
+    )
+    httpx_mock.add_response(status_code=429, headers={"Retry-After": "0.01"})
+    httpx_mock.add_response(json={"idToken": "id", "refreshToken": "refresh", "expiresIn": 3600})
+
+    response = await client.exchange_tokens(refresh_token="refresh_token")
+
+    assert response.idToken == "id"
+    assert client.retry_stats.retries == 1
+    assert client.rate_limit_stats.admitted == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_response_raises_typed_error(mock_client, httpx_mock):
+    httpx_mock.add_response(status_code=429, headers={"Retry-After": "120"}, text="slow down")
+
+    with pytest.raises(RateLimitedError, match="slow down") as exc_info:
+        await mock_client.list_connections("access_token")
+    assert exc_info.value.retry_after == 120
+
+
+def test_rate_limiter_is_shared_per_api_key():
+    policy = RateLimitPolicy()
+    client = AuthClient(api_key="shared_key", base_url="https://mock.api", rate_limit=policy)
+    same_key = AuthClient(api_key="shared_key", base_url="https://mock.api", rate_limit=policy)
+    other_key = AuthClient(api_key="other_key", base_url="https://mock.api", rate_limit=policy)
+
+    assert client._rate_limiter is same_key._rate_limiter
+    assert client._rate_limiter is not other_key._rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_shared_http_client(httpx_mock):
+    http_client = create_http_client(ConnectionPoolPolicy(max_connections=10, keepalive_expiry=30))
+    first = AuthClient(api_key="first_key", base_url="https://first.api/", http_client=http_client)
+    second = AuthClient(api_key="second_key", base_url="https://second.api", http_client=http_client)
+    httpx_mock.add_response(
+        url="https://first.api/api/auth/token", json={"idToken": "a", "refreshToken": "b", "expiresIn": 1}
+    )
+    httpx_mock.add_response(
+        url="https://second.api/api/auth/token", json={"idToken": "c", "refreshToken": "d", "expiresIn": 1}
+    )
+
+    async with first, second:
+        await first.exchange_tokens(code="code")
+        await second.exchange_tokens(code="code")
+
+    requests = httpx_mock.get_requests()
+    assert [request.headers["Authorization"] for request in requests] == ["Bearer first_key", "Bearer second_key"]
+    assert not http_client.is_closed
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_own_http_client():
+    async with AuthClient(api_key="test_api_key", base_url="https://mock.api") as client:
+        assert not client._client.is_closed
+    assert client._client.is_closed
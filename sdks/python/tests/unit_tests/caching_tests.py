@@ -0,0 +1,153 @@
+import hashlib
+
+from redactive.caching import DocumentCache, SearchCache, _LRUCache
+from redactive.grpc.v2 import (
+    Chunk,
+    ChunkMetadata,
+    ChunkReference,
+    Filters,
+    GetDocumentResponse,
+    Query,
+    RelevantChunk,
+    SearchChunksRequest,
+    SearchChunksResponse,
+    SourceReference,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_request(query: str, count: int = 10, filters: Filters | None = None) -> SearchChunksRequest:
+    return SearchChunksRequest(count=count, query=Query(semantic_query=query), filters=filters)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = _LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+
+
+def test_lru_cache_respects_byte_bound():
+    cache = _LRUCache(max_entries=10, max_bytes=10)
+    cache.set("a", "a", size=6)
+    cache.set("b", "b", size=6)
+    cache.set("huge", "huge", size=11)
+
+    assert "a" not in cache
+    assert "huge" not in cache
+    assert cache.stats.bytes == 6
+
+
+def test_lru_cache_expires_entries():
+    clock = FakeClock()
+    cache = _LRUCache(max_entries=10, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, expires_at=5)
+
+    clock.now = 6
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+
+
+def test_search_cache_normalizes_query_and_scopes_by_user():
+    cache = SearchCache()
+    response = SearchChunksResponse(success=True, relevant_chunks=[RelevantChunk(chunk_body="body")])
+    cache.set("user-1", make_request("Tell me  about AI"), response)
+
+    hit = cache.get("user-1", make_request(" tell me about ai "))
+    assert hit == response
+    assert hit is not response
+    assert cache.get("user-2", make_request("Tell me about AI")) is None
+    assert cache.get("user-1", make_request("Tell me about AI", count=5)) is None
+    assert cache.get("user-1", make_request("Tell me about AI", filters=Filters(scope=["confluence"]))) is None
+
+
+def test_search_cache_skips_unsuccessful_responses():
+    cache = SearchCache()
+    cache.set("user-1", make_request("query"), SearchChunksResponse(success=False))
+
+    assert cache.get("user-1", make_request("query")) is None
+
+
+def test_search_cache_invalidate_scope():
+    cache = SearchCache()
+    response = SearchChunksResponse(success=True)
+    cache.set("user-1", make_request("query"), response)
+    cache.set("user-2", make_request("query"), response)
+
+    cache.invalidate("user-1")
+
+    assert cache.get("user-1", make_request("query")) is None
+    assert cache.get("user-2", make_request("query")) == response
+
+
+def make_document(version: str, bodies: list[str]) -> GetDocumentResponse:
+    return GetDocumentResponse(
+        success=True,
+        chunks=[
+            Chunk(
+                source=SourceReference(document_id="doc", document_version=version),
+                chunk=ChunkReference(chunk_id=str(i), chunk_hash=hashlib.sha256(body.encode()).hexdigest()),
+                chunk_body=body,
+            )
+            for i, body in enumerate(bodies)
+        ],
+        providers_used=["confluence"],
+    )
+
+
+def test_document_cache_validates_version():
+    cache = DocumentCache()
+    document = make_document("v1", ["first", "second"])
+    cache.set("user-1", "https://example.com/doc", document)
+
+    assert cache.get("user-1", "https://example.com/doc") == document
+    assert cache.get("user-1", "https://example.com/doc", document_version="v1") == document
+    assert cache.get("user-1", "https://example.com/doc", document_version="v2") is None
+    assert cache.get("user-2", "https://example.com/doc", document_version="v1") is None
+
+
+def test_document_cache_uses_versions_from_search_results():
+    cache = DocumentCache()
+    cache.set("user-1", "https://example.com/doc", make_document("v1", ["first"]))
+    cache.observe(
+        "user-1",
+        [
+            RelevantChunk(
+                source=SourceReference(document_version="v2"),
+                document_metadata=ChunkMetadata(link="https://example.com/doc"),
+            )
+        ],
+    )
+
+    assert cache.get("user-1", "https://example.com/doc") is None
+
+
+def test_document_cache_stores_identical_chunks_once():
+    cache = DocumentCache()
+    cache.set("user-1", "doc-a", make_document("v1", ["shared", "only in a"]))
+    cache.set("user-1", "doc-b", make_document("v1", ["shared", "only in b"]))
+    cache.set("user-2", "doc-a", make_document("v1", ["shared", "only in a"]))
+
+    assert cache.unique_chunks == 3
+    cache.invalidate("user-1")
+    assert cache.unique_chunks == 2
+    cache.invalidate()
+    assert cache.unique_chunks == 0
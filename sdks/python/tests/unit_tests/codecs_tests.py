@@ -0,0 +1,78 @@
+from datetime import UTC, datetime
+
+import betterproto.lib.google.protobuf as betterproto_lib_google_protobuf
+import pytest
+
+from redactive.codecs import CodecBackend, decode, from_protobuf, protobuf_type, to_protobuf
+from redactive.grpc.v2 import (
+    Chunk,
+    ChunkMetadata,
+    Filters,
+    GetDocumentResponse,
+    RelevantChunk,
+    RelevantChunkRelevance,
+    SearchChunksRequest,
+    SearchChunksResponse,
+    SourceReference,
+    TimeSpan,
+)
+
+
+def _response() -> SearchChunksResponse:
+    return SearchChunksResponse(
+        success=True,
+        error=betterproto_lib_google_protobuf.Struct(
+            fields={"message": betterproto_lib_google_protobuf.Value(string_value="partial results")}
+        ),
+        relevant_chunks=[
+            RelevantChunk(
+                source=SourceReference(system="confluence", document_version="3", document_path="path"),
+                relevance=RelevantChunkRelevance(similarity_score=0.5),
+                chunk_body="body",
+                document_metadata=ChunkMetadata(created_at=datetime(2024, 1, 1, tzinfo=UTC)),
+            ),
+            RelevantChunk(chunk_body="other body"),
+        ],
+        providers_used=["confluence", "sharepoint"],
+    )
+
+
+@pytest.mark.parametrize("backend", list(CodecBackend))
+def test_decode(backend):
+    response = _response()
+
+    decoded = decode(SearchChunksResponse, bytes(response), backend)
+
+    assert decoded == response
+    assert decoded.relevant_chunks[1].source == SourceReference()
+    assert decoded.relevant_chunks[1].document_metadata.created_at is None
+    assert decoded.relevant_chunks[0].source.document_name is None
+
+
+def test_decode_matches_betterproto_for_empty_messages():
+    for message_type in (SearchChunksResponse, GetDocumentResponse, Chunk, Filters):
+        assert decode(message_type, b"", CodecBackend.Protobuf) == message_type().parse(b"")
+
+
+def test_protobuf_round_trip():
+    request = SearchChunksRequest(
+        count=3, filters=Filters(scope=["confluence"], created=TimeSpan(after=datetime(2024, 1, 1, tzinfo=UTC)))
+    )
+
+    message = to_protobuf(request)
+
+    assert isinstance(message, protobuf_type(SearchChunksRequest))
+    assert message.count == 3
+    assert list(message.filters.scope) == ["confluence"]
+    assert from_protobuf(SearchChunksRequest, message) == request
+
+
+def test_protobuf_type_of_nested_message():
+    assert protobuf_type(RelevantChunkRelevance).DESCRIPTOR.full_name == "redactive.grpc.v2.RelevantChunk.Relevance"
+    with pytest.raises(TypeError):
+        protobuf_type(betterproto_lib_google_protobuf.Struct)
+
+
+def test_invalid_backend():
+    with pytest.raises(ValueError):
+        decode(SearchChunksResponse, b"", "json")
@@ -0,0 +1,37 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from redactive.reranking.fusion import FusionMode, fuse_scores, top_k_indices  # noqa: E402
+
+
+def test_rerank_only_keeps_reranker_scores():
+    fused = fuse_scores(np.array([0.9, 0.1]), np.array([1.0, 3.0]), FusionMode.RerankOnly)
+
+    assert fused.tolist() == [1.0, 3.0]
+
+
+def test_min_max_fusion():
+    fused = fuse_scores(np.array([0.9, 0.5, 0.1]), np.array([0.0, 10.0, 5.0]), "min-max", weight=0.5)
+
+    assert fused == pytest.approx([0.5, 0.75, 0.25])
+
+
+def test_z_score_fusion_of_constant_scores():
+    fused = fuse_scores(np.array([0.5, 0.5]), np.array([1.0, 3.0]), "z-score", weight=0.5)
+
+    assert fused == pytest.approx([-0.5, 0.5])
+
+
+def test_reciprocal_rank_fusion():
+    fused = fuse_scores(np.array([0.9, 0.5, 0.1]), np.array([0.0, 10.0, 5.0]), "rrf", weight=0.5, rrf_k=0)
+
+    assert fused == pytest.approx([(1 / 1 + 1 / 3) / 2, (1 / 2 + 1 / 1) / 2, (1 / 3 + 1 / 2) / 2])
+
+
+def test_top_k_indices_orders_highest_first_with_stable_ties():
+    scores = np.array([0.2, 0.9, 0.5, 0.9, 0.1])
+
+    assert top_k_indices(scores, 3).tolist() == [1, 3, 2]
+    assert top_k_indices(scores, 10).tolist() == [1, 3, 2, 0, 4]
+    assert top_k_indices(scores, 0).tolist() == []
@@ -0,0 +1,85 @@
+from datetime import UTC, datetime
+from unittest import mock
+
+import pytest
+
+from redactive.grpc.v2 import (
+    ChunkMetadata,
+    RelevantChunk,
+    RelevantChunkRelevance,
+    SearchChunksResponse,
+    SourceReference,
+)
+from redactive.lazy import LazyMessage
+
+
+def _response() -> SearchChunksResponse:
+    return SearchChunksResponse(
+        success=True,
+        relevant_chunks=[
+            RelevantChunk(
+                chunk_body=f"chunk {i}",
+                source=SourceReference(system="confluence", document_version=f"v{i}"),
+                relevance=RelevantChunkRelevance(similarity_score=i / 4),
+                document_metadata=ChunkMetadata(created_at=datetime(2024, 1, 1, tzinfo=UTC), link=f"https://{i}"),
+            )
+            for i in range(3)
+        ],
+        providers_used=["confluence"],
+    )
+
+
+def test_lazy_message_exposes_message_attributes():
+    response = _response()
+    lazy = LazyMessage(SearchChunksResponse, bytes(response))
+
+    assert lazy.success is True
+    assert lazy.error is None
+    assert lazy.providers_used == ["confluence"]
+    assert len(lazy.relevant_chunks) == 3
+    chunk = lazy.relevant_chunks[1]
+    assert isinstance(chunk, LazyMessage)
+    assert chunk.chunk_body == "chunk 1"
+    assert chunk.relevance.similarity_score == 0.25
+    assert chunk.source.document_version == "v1"
+    assert chunk.document_metadata.created_at == datetime(2024, 1, 1, tzinfo=UTC)
+    assert chunk.document_metadata.modified_at is None
+    assert lazy == response
+    assert lazy.to_message() == response
+    assert bytes(lazy) == bytes(response)
+
+
+def test_lazy_message_decodes_only_accessed_fields():
+    lazy = LazyMessage(SearchChunksResponse, bytes(_response()))
+
+    with mock.patch.object(ChunkMetadata, "parse", autospec=True, side_effect=ChunkMetadata.parse) as mock_parse:
+        assert [chunk.chunk_body for chunk in lazy.relevant_chunks] == ["chunk 0", "chunk 1", "chunk 2"]
+        mock_parse.assert_not_called()
+
+
+def test_lazy_message_missing_fields():
+    lazy = LazyMessage(RelevantChunk, b"")
+
+    assert lazy.chunk_body == ""
+    assert lazy.relevance == RelevantChunkRelevance()
+    with pytest.raises(AttributeError):
+        lazy.unknown_field  # noqa: B018
+    with pytest.raises(AttributeError):
+        lazy.chunk_body = "body"
+
+
+def test_lazy_message_delegates_message_methods():
+    response = _response()
+    lazy = LazyMessage(SearchChunksResponse, bytes(response))
+
+    assert isinstance(lazy, SearchChunksResponse)
+    assert isinstance(lazy.relevant_chunks[0], RelevantChunk)
+    assert lazy.SerializeToString() == bytes(response)
+    with mock.patch.object(
+        SearchChunksResponse, "parse", autospec=True, side_effect=SearchChunksResponse.parse
+    ) as mock_parse:
+        assert lazy.to_dict() == response.to_dict()
+        assert lazy.to_json() == response.to_json()
+        assert lazy.is_set("success")
+        # The whole message is decoded once, for all of them
+        assert mock_parse.call_count == 1
@@ -0,0 +1,71 @@
+import subprocess
+import sys
+
+from redactive.reranking.lexical import BM25Reranker
+from redactive.reranking.reranker import clear_rerankers, get_reranker
+
+
+def test_bm25_ranks_matching_documents_first():
+    ranker = BM25Reranker()
+    docs = [
+        "The quarterly report covers revenue and costs.",
+        "Onboarding guide for new engineers: setting up the dev environment.",
+        "Engineering onboarding checklist and onboarding buddies.",
+    ]
+
+    results = ranker.rank("engineering onboarding", docs)
+
+    assert [result.doc_id for result in results] == [2, 1, 0]
+    assert [result.rank for result in results] == [1, 2, 3]
+    assert results[-1].score == 0.0
+
+
+def test_bm25_rare_terms_weigh_more():
+    ranker = BM25Reranker()
+    docs = ["vessel report", "vessel borealis", "vessel log", "vessel crew"]
+
+    results = ranker.rank("borealis vessel", docs)
+
+    assert results[0].doc_id == 1
+
+
+def test_bm25_handles_empty_inputs():
+    ranker = BM25Reranker()
+
+    assert ranker.rank("query", []) == []
+    assert [result.score for result in ranker.rank("", ["a document"])] == [0.0]
+
+
+def test_bm25_reuses_tokenization():
+    ranker = BM25Reranker()
+    docs = ["first document", "second document"]
+
+    ranker.rank("first", docs)
+    ranker.rank("second", docs)
+
+    assert ranker._analyze.cache_info().hits == 2
+
+
+def test_bm25_is_available_by_name():
+    clear_rerankers()
+    ranker = get_reranker("bm25", k1=1.2)
+
+    assert isinstance(ranker, BM25Reranker)
+    assert ranker.k1 == 1.2
+    clear_rerankers()
+
+
+def test_bm25_reranking_works_without_numpy():
+    # numpy is only installed with the reranking extra
+    script = """
+import sys
+sys.modules["numpy"] = None
+from redactive.grpc.v2 import RelevantChunk
+from redactive.reranking.reranker import RerankingConfig, RerankingSearchClient, get_reranker
+client = RerankingSearchClient(conf=RerankingConfig(reranking_algorithm="bm25"))
+chunks = [RelevantChunk(chunk_body=body) for body in ["cats", "dogs", "dogs and cats"]]
+print([chunk.chunk_body for chunk in client.rerank("dogs", chunks, get_reranker("bm25"), 2)])
+"""
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "['dogs', 'dogs and cats']"
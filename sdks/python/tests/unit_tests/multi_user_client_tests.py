@@ -1,12 +1,16 @@
+import asyncio
 import base64
 import json
+from datetime import UTC, datetime, timedelta
 from unittest import mock
 
 import pytest
 
 from redactive.auth_client import AuthClient
-from redactive.grpc.v2 import RelevantChunk
+from redactive.caching import SearchCache
+from redactive.grpc.v2 import RelevantChunk, SearchChunksResponse
 from redactive.multi_user_client import MultiUserClient, UserData
+from redactive.scheduling import FairSchedulingPolicy, Priority, UserQuota, UserThrottledError
 from redactive.search_client import SearchClient
 
 
@@ -23,7 +27,10 @@ def mock_auth_client() -> mock.AsyncMock:
 
 @pytest.fixture
 def mock_search_client() -> mock.AsyncMock:
-    return mock.AsyncMock(spec=SearchClient)
+    search_client = mock.AsyncMock(spec=SearchClient)
+    search_client.search_cache = None
+    search_client.document_cache = None
+    return search_client
 
 
 @pytest.fixture
@@ -99,7 +106,35 @@ async def test_search_chunks(multi_user_client: MultiUserClient, mock_search_cli
     result = await multi_user_client.search_chunks(user_id, query, count, filters=filters)
 
     assert result == relevant_chunks
-    multi_user_client.search_client.search_chunks.assert_called_with("idToken123", query, count, filters=filters)
+    multi_user_client.search_client.search_chunks.assert_called_with(
+        "idToken123", query, count, filters=filters, timeout=None, priority=Priority.Interactive, cache_scope=user_id
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_chunks_many(multi_user_client: MultiUserClient, mock_search_client: mock.AsyncMock) -> None:
+    user_id = "user123"
+    queries = ["first query", "second query"]
+    responses = [mock.Mock(), mock.Mock()]
+
+    multi_user_client.search_client = mock_search_client
+    multi_user_client.search_client.search_chunks_many.return_value = responses
+    multi_user_client.read_user_data.side_effect = mock_read_user_data
+
+    result = await multi_user_client.search_chunks_many(user_id, queries, 5, max_concurrency=4)
+
+    assert result == responses
+    multi_user_client.read_user_data.assert_called_once_with(user_id)
+    multi_user_client.search_client.search_chunks_many.assert_called_with(
+        "idToken123",
+        queries,
+        5,
+        filters=None,
+        max_concurrency=4,
+        timeout=None,
+        priority=Priority.Interactive,
+        cache_scope=user_id,
+    )
 
 
 @pytest.mark.asyncio
@@ -115,7 +150,9 @@ async def test_get_document_by_url(multi_user_client: MultiUserClient, mock_sear
     result = await multi_user_client.get_document(user_id, url)
 
     assert result == chunks
-    multi_user_client.search_client.get_document.assert_called_with("idToken123", url)
+    multi_user_client.search_client.get_document.assert_called_with(
+        "idToken123", url, document_version=None, timeout=None, priority=Priority.Interactive, cache_scope=user_id
+    )
 
 
 async def test_get_begin_connection_url(multi_user_client: MultiUserClient, mock_auth_client: mock.AsyncMock) -> None:
@@ -200,3 +237,315 @@ async def test_get_users_redactive_email_with_no_token(multi_user_client: MultiU
 
     result = await multi_user_client.get_users_redactive_email(user_id)
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_completes_when_caller_is_cancelled(
+    multi_user_client: MultiUserClient, mock_auth_client: mock.AsyncMock, mock_search_client: mock.AsyncMock
+) -> None:
+    expired_user_data = UserData(
+        refresh_token="refreshToken123", id_token="expiredIdToken", id_token_expiry=datetime.now(UTC) - timedelta(1)
+    )
+    exchanged = asyncio.Event()
+
+    async def exchange_tokens(*args):
+        exchanged.set()
+        await asyncio.sleep(0.01)
+        return mock.Mock(idToken="idToken456", refreshToken="refreshToken456", expiresIn=3600)
+
+    mock_auth_client.exchange_tokens.side_effect = exchange_tokens
+    mock_auth_client.list_connections.return_value = mock.Mock(current_connections=["confluence"])
+    multi_user_client.auth_client = mock_auth_client
+    multi_user_client.search_client = mock_search_client
+    multi_user_client.read_user_data.return_value = expired_user_data
+
+    caller = asyncio.create_task(multi_user_client.search_chunks("user123", "query"))
+    await exchanged.wait()
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    await asyncio.sleep(0.05)
+
+    multi_user_client.write_user_data.assert_called_once()
+    assert multi_user_client.write_user_data.call_args.args[1].refresh_token == "refreshToken456"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_token_refreshes_are_shared(
+    multi_user_client: MultiUserClient, mock_auth_client: mock.AsyncMock, mock_search_client: mock.AsyncMock
+) -> None:
+    user_id = "user123"
+    expired_user_data = UserData(
+        refresh_token="refreshToken123", id_token="expiredIdToken", id_token_expiry=datetime.now(UTC) - timedelta(1)
+    )
+
+    async def exchange_tokens(*args):
+        await asyncio.sleep(0.01)
+        return mock.Mock(idToken="idToken456", refreshToken="refreshToken456", expiresIn=3600)
+
+    mock_auth_client.exchange_tokens.side_effect = exchange_tokens
+    mock_auth_client.list_connections.return_value = mock.Mock(current_connections=["confluence"])
+    multi_user_client.auth_client = mock_auth_client
+    multi_user_client.search_client = mock_search_client
+    multi_user_client.read_user_data.return_value = expired_user_data
+
+    await asyncio.gather(*(multi_user_client.search_chunks(user_id, "query") for _ in range(5)))
+
+    mock_auth_client.exchange_tokens.assert_called_once_with(None, "refreshToken123")
+    multi_user_client.write_user_data.assert_called_once()
+    for call in mock_search_client.search_chunks.call_args_list:
+        assert call.args[0] == "idToken456"
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_skipped_if_already_rotated(
+    multi_user_client: MultiUserClient, mock_auth_client: mock.AsyncMock
+) -> None:
+    refreshed_user_data = UserData(
+        refresh_token="refreshToken456", id_token="idToken456", id_token_expiry=datetime.now(UTC) + timedelta(hours=1)
+    )
+    multi_user_client.auth_client = mock_auth_client
+    multi_user_client.read_user_data.return_value = refreshed_user_data
+
+    user_data = await multi_user_client._refresh_user_tokens("user123", "refreshToken123")
+
+    assert user_data == refreshed_user_data
+    mock_auth_client.exchange_tokens.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_user_data_cache_avoids_storage_reads(mock_search_client: mock.AsyncMock) -> None:
+    user_data = UserData(
+        refresh_token="refreshToken123", id_token="idToken123", id_token_expiry=datetime.now(UTC) + timedelta(hours=1)
+    )
+    multi_user_client = MultiUserClient(
+        api_key="test_api_key",
+        callback_uri="http://callback.uri",
+        read_user_data=mock.AsyncMock(return_value=user_data),
+        write_user_data=mock.AsyncMock(),
+        user_data_cache_size=10,
+    )
+    multi_user_client.search_client = mock_search_client
+
+    await multi_user_client.search_chunks("user123", "query")
+    await multi_user_client.search_chunks("user123", "query")
+    multi_user_client.read_user_data.assert_called_once_with("user123")
+
+    await multi_user_client.clear_user_data("user123")
+    await multi_user_client.search_chunks("user123", "query")
+    assert multi_user_client.read_user_data.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_user_data_cache_expires_with_id_token(mock_search_client: mock.AsyncMock) -> None:
+    user_data = UserData(id_token="idToken123", id_token_expiry=datetime.now(UTC) - timedelta(1))
+    multi_user_client = MultiUserClient(
+        api_key="test_api_key",
+        callback_uri="http://callback.uri",
+        read_user_data=mock.AsyncMock(return_value=user_data),
+        write_user_data=mock.AsyncMock(),
+        user_data_cache_size=10,
+    )
+
+    assert await multi_user_client.get_user_connections("user123") == []
+    assert await multi_user_client.get_user_connections("user123") == []
+    assert multi_user_client.read_user_data.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_user_data_cache_is_not_written_back(
+    mock_auth_client: mock.AsyncMock, mock_search_client: mock.AsyncMock
+) -> None:
+    id_token_expiry = datetime.now(UTC) + timedelta(hours=1)
+    storage = {"user123": UserData(refresh_token="refreshToken1", id_token="idToken1", id_token_expiry=id_token_expiry)}
+
+    async def read_user_data(user_id: str) -> UserData:
+        return storage[user_id]
+
+    async def write_user_data(user_id: str, user_data: UserData | None) -> None:
+        storage[user_id] = user_data
+
+    multi_user_client = MultiUserClient(
+        api_key="test_api_key",
+        callback_uri="http://callback.uri",
+        read_user_data=read_user_data,
+        write_user_data=write_user_data,
+        user_data_cache_size=10,
+    )
+    mock_auth_client.begin_connection.return_value = mock.Mock(url="http://auth.url")
+    mock_auth_client.exchange_tokens.return_value = mock.Mock(
+        idToken="idToken3", refreshToken="refreshToken3", expiresIn=3600
+    )
+    mock_auth_client.list_connections.return_value = mock.Mock(current_connections=["confluence"])
+    multi_user_client.auth_client = mock_auth_client
+    multi_user_client.search_client = mock_search_client
+    await multi_user_client.search_chunks("user123", "query")
+
+    # Another process rotates the refresh token and begins a connection
+    storage["user123"] = UserData(
+        refresh_token="refreshToken2", id_token="idToken2", id_token_expiry=id_token_expiry, sign_in_state="state2"
+    )
+    assert await multi_user_client.handle_connection_callback("user123", "code", "state2") is True
+    assert storage["user123"].refresh_token == "refreshToken3"
+
+    storage["user123"] = UserData(refresh_token="refreshToken4", id_token="idToken4", id_token_expiry=id_token_expiry)
+    await multi_user_client.get_begin_connection_url("user123", "confluence")
+    assert storage["user123"].refresh_token == "refreshToken4"
+
+
+@pytest.mark.asyncio
+async def test_search_cache_is_scoped_by_user_id() -> None:
+    id_token_expiry = datetime.now(UTC) + timedelta(hours=1)
+    storage = {"user123": UserData(refresh_token="r", id_token="idToken1", id_token_expiry=id_token_expiry)}
+    multi_user_client = MultiUserClient(
+        api_key="test_api_key",
+        callback_uri="http://callback.uri",
+        read_user_data=mock.AsyncMock(side_effect=lambda user_id: storage.get(user_id)),
+        write_user_data=mock.AsyncMock(),
+        search_cache=SearchCache(),
+    )
+    response = SearchChunksResponse(success=True, relevant_chunks=[RelevantChunk(chunk_body="body")])
+
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", return_value=response) as mock_search_chunks:
+        await multi_user_client.search_chunks("user123", "query")
+        # A refreshed ID token still hits the user's cached responses
+        storage["user123"] = UserData(refresh_token="r", id_token="idToken2", id_token_expiry=id_token_expiry)
+        await multi_user_client.search_chunks("user123", "query")
+        assert mock_search_chunks.call_count == 1
+
+        await multi_user_client.clear_user_data("user123")
+        storage["user123"] = UserData(refresh_token="r", id_token="idToken3", id_token_expiry=id_token_expiry)
+        await multi_user_client.search_chunks("user123", "query")
+        assert mock_search_chunks.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_proactive_refresh_of_active_users(
+    mock_auth_client: mock.AsyncMock, mock_search_client: mock.AsyncMock
+) -> None:
+    user_data = UserData(
+        refresh_token="refreshToken123",
+        id_token="idToken123",
+        id_token_expiry=datetime.now(UTC) + timedelta(seconds=30),
+    )
+    multi_user_client = MultiUserClient(
+        api_key="test_api_key",
+        callback_uri="http://callback.uri",
+        read_user_data=mock.AsyncMock(return_value=user_data),
+        write_user_data=mock.AsyncMock(),
+        proactive_refresh_margin=60,
+    )
+    mock_auth_client.exchange_tokens.return_value = mock.Mock(
+        idToken="idToken456", refreshToken="refreshToken456", expiresIn=3600
+    )
+    mock_auth_client.list_connections.return_value = mock.Mock(current_connections=[])
+    multi_user_client.auth_client = mock_auth_client
+    multi_user_client.search_client = mock_search_client
+
+    async with multi_user_client:
+        await multi_user_client.search_chunks("user123", "query")
+        mock_auth_client.exchange_tokens.assert_not_called()
+
+        assert await multi_user_client.token_refresh_scheduler.run_once() == 1
+        mock_auth_client.exchange_tokens.assert_called_once_with(None, "refreshToken123")
+
+
+@pytest.mark.asyncio
+async def test_iter_document(multi_user_client: MultiUserClient, mock_search_client: mock.AsyncMock) -> None:
+    chunks = [mock.Mock(), mock.Mock()]
+
+    async def iter_document(id_token, ref, timeout, priority, cache_scope):
+        for chunk in chunks:
+            yield chunk
+
+    multi_user_client.search_client = mock_search_client
+    multi_user_client.search_client.iter_document = mock.Mock(side_effect=iter_document)
+    multi_user_client.read_user_data.side_effect = mock_read_user_data
+
+    result = [chunk async for chunk in multi_user_client.iter_document("user123", "http://example.com")]
+
+    assert result == chunks
+    multi_user_client.search_client.iter_document.assert_called_with(
+        "idToken123", "http://example.com", timeout=None, priority=Priority.Interactive, cache_scope="user123"
+    )
+
+
+@pytest.mark.asyncio
+async def test_user_quota(mock_search_client: mock.AsyncMock) -> None:
+    client = MultiUserClient(
+        api_key="test_api_key",
+        callback_uri="http://callback.uri",
+        read_user_data=mock.AsyncMock(side_effect=lambda _: UserData(refresh_token="r", id_token="idToken")),
+        write_user_data=mock.AsyncMock(),
+        user_quota=UserQuota(searches_per_second=0.1, search_burst=2),
+    )
+    client.search_client = mock_search_client
+
+    await client.search_chunks("user123", "query")
+    _, throttled = await client.search_chunks_many("user123", ["a", "b"])
+    assert isinstance(throttled, UserThrottledError)
+    with pytest.raises(UserThrottledError):
+        await client.search_chunks("user123", "query")
+    await client.search_chunks("user456", "query")
+    await client.get_document("user123", "ref")
+
+    assert mock_search_client.search_chunks.call_count == 3
+    mock_search_client.search_chunks_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_user_quota_paces_batch_larger_than_burst(mock_search_client: mock.AsyncMock) -> None:
+    client = MultiUserClient(
+        api_key="test_api_key",
+        callback_uri="http://callback.uri",
+        read_user_data=mock.AsyncMock(side_effect=lambda _: UserData(refresh_token="r", id_token="idToken")),
+        write_user_data=mock.AsyncMock(),
+        user_quota=UserQuota(searches_per_second=1000, search_burst=2, max_wait=60),
+        fair_scheduling=FairSchedulingPolicy(max_concurrency=1),
+    )
+    client.search_client = mock_search_client
+
+    results = await client.search_chunks_many("user123", [str(i) for i in range(11)])
+
+    assert not any(isinstance(result, Exception) for result in results)
+    assert mock_search_client.search_chunks.call_count == 11
+
+
+@pytest.mark.asyncio
+async def test_fair_scheduling(mock_search_client: mock.AsyncMock) -> None:
+    client = MultiUserClient(
+        api_key="test_api_key",
+        callback_uri="http://callback.uri",
+        read_user_data=mock.AsyncMock(side_effect=lambda user_id: UserData(refresh_token="r", id_token=user_id)),
+        write_user_data=mock.AsyncMock(),
+        fair_scheduling=FairSchedulingPolicy(max_concurrency=1),
+    )
+    client.search_client = mock_search_client
+    served = []
+
+    async def search_chunks(id_token, *args, **kwargs):
+        served.append(id_token)
+        await asyncio.sleep(0.001)
+
+    mock_search_client.search_chunks.side_effect = search_chunks
+
+    heavy = [asyncio.ensure_future(client.search_chunks("heavy", "query")) for _ in range(4)]
+    await asyncio.sleep(0)
+    await asyncio.gather(*heavy, client.search_chunks("light", "query"))
+
+    assert served.index("light") <= 2
+    assert client.fair_scheduling_stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_clients(
+    multi_user_client: MultiUserClient, mock_auth_client: mock.AsyncMock, mock_search_client: mock.AsyncMock
+) -> None:
+    multi_user_client.auth_client = mock_auth_client
+    multi_user_client.search_client = mock_search_client
+
+    async with multi_user_client:
+        pass
+
+    mock_auth_client.aclose.assert_awaited_once()
+    mock_search_client.aclose.assert_awaited_once()
@@ -0,0 +1,202 @@
+import asyncio
+import threading
+from unittest import mock
+
+import pytest
+
+from redactive.grpc.v2 import RelevantChunk, RelevantChunkRelevance, SearchChunksResponse
+from redactive.reranking import reranker
+from redactive.reranking.reranker import RerankingConfig, RerankingSearchClient
+
+
+@pytest.fixture(autouse=True)
+def mock_reranker():
+    reranker.clear_rerankers()
+    with mock.patch("redactive.reranking.reranker.Reranker") as mock_reranker:
+        yield mock_reranker
+    reranker.clear_rerankers()
+
+
+def make_chunks(*bodies: str) -> list[RelevantChunk]:
+    return [
+        RelevantChunk(chunk_body=body, relevance=RelevantChunkRelevance(similarity_score=1.0 - i / 10))
+        for i, body in enumerate(bodies)
+    ]
+
+
+def test_rerankers_are_loaded_once(mock_reranker):
+    mock_reranker.side_effect = lambda *args, **kwargs: mock.Mock()
+    first = reranker.get_reranker("cross-encoder")
+    second = reranker.get_reranker("cross-encoder")
+    other = reranker.get_reranker("cross-encoder", device="cpu")
+
+    assert first is second
+    assert first is not other
+    assert mock_reranker.call_args_list == [mock.call("cross-encoder"), mock.call("cross-encoder", device="cpu")]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_configured_reranker(mock_reranker):
+    client = RerankingSearchClient(conf=RerankingConfig(reranking_algorithm="colbert"))
+    await client.warm_up()
+
+    mock_reranker.assert_called_once_with("colbert")
+    assert set(reranker.loaded_reranker_memory()) == {"colbert"}
+
+
+@pytest.mark.asyncio
+async def test_query_chunks_reuses_loaded_reranker(mock_reranker):
+    mock_reranker.return_value.rank.side_effect = lambda query, docs: [
+        mock.Mock(doc_id=i, score=float(i)) for i in reversed(range(len(docs)))
+    ]
+    response = SearchChunksResponse(success=True, relevant_chunks=make_chunks("a", "b", "c"))
+
+    client = RerankingSearchClient()
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", side_effect=lambda *_: response):
+        results = await client.query_chunks("test-access_token", "query", count=2)
+        await client.query_chunks("test-access_token", "query", count=2)
+
+    assert [chunk.chunk_body for chunk in results] == ["c", "b"]
+    mock_reranker.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reranks_are_batched_off_event_loop(mock_reranker):
+    rank_calls = []
+
+    def rank(query, docs):
+        rank_calls.append((query, list(docs), threading.get_ident()))
+        return [mock.Mock(doc_id=i, score=float(len(doc))) for i, doc in enumerate(docs)]
+
+    mock_reranker.return_value.rank.side_effect = rank
+
+    async def search_chunks(stub, request):
+        return SearchChunksResponse(success=True, relevant_chunks=make_chunks("a", "bbb", "cc"))
+
+    client = RerankingSearchClient(conf=RerankingConfig(max_batch_size=2, max_batch_wait=0.01))
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", autospec=True, side_effect=search_chunks):
+        results = await asyncio.gather(
+            client.query_chunks("test-access_token", "query", count=2),
+            client.query_chunks("test-access_token", "query", count=2),
+            client.query_chunks("test-access_token", "other query", count=1),
+        )
+
+    assert [[chunk.chunk_body for chunk in result] for result in results] == [["bbb", "cc"], ["bbb", "cc"], ["bbb"]]
+    # Distinct queries cannot share an inference call, so each is its own executor job
+    assert client._batcher.batches == 2
+    assert [(query, len(docs)) for query, docs, _ in rank_calls] == [("query", 6), ("other query", 3)]
+    assert all(thread != threading.get_ident() for _, _, thread in rank_calls)
+
+
+@pytest.mark.asyncio
+async def test_lexical_reranks_are_not_held_back():
+    async def search_chunks(stub, request):
+        return SearchChunksResponse(success=True, relevant_chunks=make_chunks("cats", "dogs", "dogs and cats"))
+
+    client = RerankingSearchClient(conf=RerankingConfig(reranking_algorithm="bm25", max_batch_wait=60))
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", autospec=True, side_effect=search_chunks):
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                client.query_chunks("test-access_token", "dogs", count=1),
+                client.query_chunks("test-access_token", "dogs", count=1),
+            ),
+            timeout=5,
+        )
+
+    assert [[chunk.chunk_body for chunk in result] for result in results] == [["dogs"], ["dogs"]]
+    assert client._batcher.batches == 2
+
+
+@pytest.mark.asyncio
+async def test_reranker_scores_are_cached_per_query_and_chunk(mock_reranker):
+    scored_docs = []
+
+    def rank(query, docs):
+        scored_docs.extend(docs)
+        return [mock.Mock(doc_id=i, score=float(len(doc))) for i, doc in enumerate(docs)]
+
+    mock_reranker.return_value.rank.side_effect = rank
+    responses = iter(
+        [
+            SearchChunksResponse(success=True, relevant_chunks=make_chunks("a", "bbb")),
+            SearchChunksResponse(success=True, relevant_chunks=make_chunks("bbb", "cc")),
+            SearchChunksResponse(success=True, relevant_chunks=make_chunks("bbb", "cc")),
+        ]
+    )
+
+    client = RerankingSearchClient(conf=RerankingConfig(max_batch_wait=0))
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", side_effect=lambda *_: next(responses)):
+        await client.query_chunks("test-access_token", "query", count=2)
+        results = await client.query_chunks("test-access_token", " Query ", count=2)
+        await client.query_chunks("test-access_token", "other query", count=2)
+
+    assert [chunk.chunk_body for chunk in results] == ["bbb", "cc"]
+    assert scored_docs == ["a", "bbb", "cc", "bbb", "cc"]
+    assert client.score_cache_stats.hits == 1
+    assert client.score_cache_stats.hit_rate == pytest.approx(1 / 6)
+
+
+def test_rerank_fuses_scores_without_mutating_fetched_chunks(mock_reranker):
+    mock_reranker.return_value.rank.side_effect = lambda query, docs: [
+        mock.Mock(doc_id=i, score=score) for i, score in enumerate([0.0, 10.0, 5.0])
+    ]
+    fetched_chunks = make_chunks("a", "b", "c")
+
+    client = RerankingSearchClient(conf=RerankingConfig(fusion="min-max", fusion_weight=0.5))
+    results = client.rerank("query", fetched_chunks, reranker.get_reranker("cross-encoder"), 2)
+
+    assert [chunk.chunk_body for chunk in results] == ["b", "a"]
+    assert [chunk.relevance.similarity_score for chunk in results] == pytest.approx([0.75, 0.5])
+    assert [chunk.relevance.similarity_score for chunk in fetched_chunks] == pytest.approx([1.0, 0.9, 0.8])
+
+
+@pytest.mark.asyncio
+async def test_adaptive_fetch_sizes_down_to_target_recall(mock_reranker):
+    # The reranker agrees with the retrieval order, so the top results always come from the top of the fetch
+    mock_reranker.return_value.rank.side_effect = lambda query, docs: [
+        mock.Mock(doc_id=i, score=-float(i)) for i in range(len(docs))
+    ]
+    fetch_counts = []
+
+    def search_chunks(request):
+        fetch_counts.append(request.count)
+        return SearchChunksResponse(success=True, relevant_chunks=make_chunks(*map(str, range(request.count))))
+
+    conf = RerankingConfig(
+        adaptive_fetch=True, adaptive_min_observations=3, adaptive_exploration_rate=0, max_batch_wait=0
+    )
+    client = RerankingSearchClient(conf=conf)
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", side_effect=search_chunks):
+        for _ in range(5):
+            await client.query_chunks("test-access_token", "query", count=2)
+
+    assert fetch_counts == [20, 20, 20, 2, 2]
+    assert client.adaptive_fetch_multiplier == 1.0
+    assert client.last_fetch_count == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_fetch_respects_max_fetch_results(mock_reranker):
+    mock_reranker.return_value.rank.side_effect = lambda query, docs: [
+        mock.Mock(doc_id=i, score=-float(i)) for i in range(len(docs))
+    ]
+    fetch_counts = []
+
+    def search_chunks(request):
+        fetch_counts.append(request.count)
+        return SearchChunksResponse(success=True, relevant_chunks=make_chunks(*map(str, range(request.count))))
+
+    conf = RerankingConfig(
+        max_fetch_results=5,
+        adaptive_fetch=True,
+        adaptive_min_observations=2,
+        adaptive_exploration_rate=0,
+        max_batch_wait=0,
+    )
+    client = RerankingSearchClient(conf=conf)
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", side_effect=search_chunks):
+        for _ in range(4):
+            await client.query_chunks("test-access_token", "query", count=8)
+
+    assert client.adaptive_fetch_multiplier is not None
+    assert fetch_counts == [5, 5, 5, 5]
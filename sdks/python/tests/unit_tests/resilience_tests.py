@@ -0,0 +1,295 @@
+import asyncio
+
+import httpx
+import pytest
+
+from redactive.resilience import (
+    CircuitBreakerPolicy,
+    CircuitOpenError,
+    CircuitState,
+    ConcurrencyLimitExceededError,
+    ConcurrencyLimitPolicy,
+    ConcurrencyLimitStats,
+    HedgingPolicy,
+    RateLimitExceededError,
+    RateLimitPolicy,
+    RetryPolicy,
+    _AdaptiveConcurrencyLimiter,
+    _CircuitBreaker,
+    _Hedger,
+    _RateLimiter,
+    _Retrier,
+)
+
+
+def _call(delay: float, result: str | Exception):
+    async def _run() -> str:
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return _run
+
+
+@pytest.mark.asyncio
+async def test_fast_call_is_not_hedged():
+    hedger = _Hedger(HedgingPolicy(initial_delay=0.05))
+
+    assert await hedger.run(_call(0, "response")) == "response"
+    assert hedger.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged():
+    hedger = _Hedger(HedgingPolicy(initial_delay=0.01, max_hedge_ratio=1))
+    calls = [_call(1, "slow"), _call(0, "fast")]
+
+    assert await hedger.run(lambda: calls.pop(0)()) == "fast"
+    assert hedger.hedges == 1
+    assert hedger.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_failure_waits_for_original():
+    hedger = _Hedger(HedgingPolicy(initial_delay=0.01, max_hedge_ratio=1))
+    calls = [_call(0.05, "original"), _call(0, ValueError("hedge failed"))]
+
+    assert await hedger.run(lambda: calls.pop(0)()) == "original"
+    assert hedger.hedge_wins == 0
+
+
+@pytest.mark.asyncio
+async def test_original_failure_is_raised_when_both_fail():
+    hedger = _Hedger(HedgingPolicy(initial_delay=0.01, max_hedge_ratio=1))
+    calls = [_call(0.02, ValueError("original failed")), _call(0.03, KeyError("hedge failed"))]
+
+    with pytest.raises(ValueError, match="original failed"):
+        await hedger.run(lambda: calls.pop(0)())
+
+
+def test_delay_follows_latency_percentile():
+    hedger = _Hedger(HedgingPolicy(percentile=90, initial_delay=1, min_observations=10, min_delay=0))
+    assert hedger.delay == 1
+
+    hedger._latencies.extend(i / 100 for i in range(1, 101))
+
+    assert hedger.delay == pytest.approx(0.91)
+
+
+@pytest.mark.asyncio
+async def test_hedge_ratio_is_capped():
+    hedger = _Hedger(HedgingPolicy(initial_delay=0.001, max_hedge_ratio=0.5))
+
+    for _ in range(4):
+        await hedger.run(_call(0.01, "response"))
+
+    assert hedger.hedges == 2
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        HedgingPolicy(percentile=100)
+
+
+class _Sleeps(list):
+    async def __call__(self, delay: float) -> None:
+        self.append(delay)
+
+
+def _failing(*results):
+    results = list(results)
+
+    async def _run():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return _run
+
+
+@pytest.mark.asyncio
+async def test_retry_until_success():
+    sleeps = _Sleeps()
+    retrier = _Retrier(RetryPolicy(max_attempts=3, initial_backoff=0.1, jitter=0), sleep=sleeps)
+
+    result = await retrier.run(_failing(ConnectionError(), ConnectionError(), "response"), lambda _: True)
+
+    assert result == "response"
+    assert sleeps == [0.1, 0.2]
+    assert retrier.stats.attempts == 3
+    assert retrier.stats.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_error_is_raised():
+    retrier = _Retrier(RetryPolicy(), sleep=_Sleeps())
+
+    with pytest.raises(KeyError):
+        await retrier.run(_failing(KeyError(), "response"), lambda e: isinstance(e, ConnectionError))
+    assert retrier.stats.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_max_attempts():
+    retrier = _Retrier(RetryPolicy(max_attempts=2), sleep=_Sleeps())
+
+    with pytest.raises(ConnectionError):
+        await retrier.run(_failing(ConnectionError(), ConnectionError(), "response"), lambda _: True)
+    assert retrier.stats.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_budget():
+    retrier = _Retrier(RetryPolicy(max_attempts=2, budget_capacity=1, budget_ratio=0), sleep=_Sleeps())
+
+    assert await retrier.run(_failing(ConnectionError(), "response"), lambda _: True) == "response"
+    with pytest.raises(ConnectionError):
+        await retrier.run(_failing(ConnectionError(), "response"), lambda _: True)
+
+    assert retrier.stats.retries == 1
+    assert retrier.stats.budget_exhausted == 1
+
+
+@pytest.mark.asyncio
+async def test_no_retry_past_deadline():
+    retrier = _Retrier(RetryPolicy(initial_backoff=1, jitter=0), sleep=_Sleeps())
+
+    with pytest.raises(ConnectionError):
+        await retrier.run(_failing(ConnectionError(), "response"), lambda _: True, time_remaining=lambda: 0.5)
+
+
+@pytest.mark.asyncio
+async def test_retry_after_replaces_shorter_backoff():
+    sleeps = _Sleeps()
+    retrier = _Retrier(RetryPolicy(initial_backoff=0.1, jitter=0, max_retry_after=5), sleep=sleeps)
+
+    result = await retrier.run(_failing(ConnectionError(), "response"), lambda _: True, retry_after=lambda _: 2)
+    assert result == "response"
+    assert sleeps == [2]
+
+    with pytest.raises(ConnectionError):
+        await retrier.run(_failing(ConnectionError(), "response"), lambda _: True, retry_after=lambda _: 10)
+    assert sleeps == [2]
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(initial_backoff=1, max_backoff=3, jitter=0.5)
+
+    assert 0.5 <= policy.backoff(1) <= 1
+    assert 1.5 <= policy.backoff(5) <= 3
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_queues_calls():
+    limiter = _AdaptiveConcurrencyLimiter(ConcurrencyLimitPolicy(initial_limit=1, max_queued=1))
+    await limiter.acquire()
+
+    waiting = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.stats.queued == 1
+    with pytest.raises(ConcurrencyLimitExceededError):
+        await limiter.acquire()
+
+    limiter.release(0.01, overloaded=False)
+    await waiting
+    assert limiter.stats == ConcurrencyLimitStats(limit=2, in_flight=1, queued=0, rejected=1)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_queue_timeout():
+    limiter = _AdaptiveConcurrencyLimiter(ConcurrencyLimitPolicy(initial_limit=1, max_queue_wait=0.01))
+    await limiter.acquire()
+
+    with pytest.raises(ConcurrencyLimitExceededError):
+        await limiter.acquire()
+    assert limiter.stats.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_adapts_to_latency():
+    policy = ConcurrencyLimitPolicy(initial_limit=2, min_limit=1, latency_threshold=0.5, backoff_ratio=0.5)
+    limiter = _AdaptiveConcurrencyLimiter(policy)
+
+    await limiter.acquire()
+    await limiter.acquire()
+    limiter.release(0.1, overloaded=False)
+    assert limiter.stats.limit == 3
+
+    await limiter.acquire()
+    limiter.release(1.0, overloaded=False)
+    assert limiter.stats.limit == 1
+    limiter.release(None, overloaded=True)
+    assert limiter.stats.limit == 1
+    assert limiter.stats.in_flight == 0
+
+
+def test_circuit_breaker_opens_and_recovers():
+    now = [0.0]
+    breaker = _CircuitBreaker(
+        CircuitBreakerPolicy(failure_rate_threshold=0.5, minimum_calls=4, open_duration=10, half_open_probes=2),
+        clock=lambda: now[0],
+    )
+
+    for success in (True, False, True, False):
+        breaker.record(breaker.before_call(), success)
+    assert breaker.state == CircuitState.Open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 10
+    assert breaker.state == CircuitState.HalfOpen
+    probes = [breaker.before_call(), breaker.before_call()]
+    assert probes == [True, True]
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    for probe in probes:
+        breaker.record(probe, True)
+    assert breaker.state == CircuitState.Closed
+
+
+def test_circuit_breaker_reopens_on_failed_probe():
+    now = [0.0]
+    breaker = _CircuitBreaker(CircuitBreakerPolicy(minimum_calls=1, open_duration=10), clock=lambda: now[0])
+    breaker.record(breaker.before_call(), False)
+
+    now[0] = 10
+    breaker.record(breaker.before_call(), False)
+
+    assert breaker.state == CircuitState.Open
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_queues_requests():
+    now = [0.0]
+    sleeps = _Sleeps()
+    limiter = _RateLimiter(RateLimitPolicy(requests_per_second=10, burst=2, max_wait=0.25), lambda: now[0], sleeps)
+
+    for _ in range(4):
+        await limiter.acquire()
+    with pytest.raises(RateLimitExceededError):
+        await limiter.acquire()
+
+    assert sleeps == [pytest.approx(0.1), pytest.approx(0.2)]
+    assert limiter.stats.admitted == 4
+    assert limiter.stats.delayed == 2
+    assert limiter.stats.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_pause():
+    now = [0.0]
+    sleeps = _Sleeps()
+    limiter = _RateLimiter(RateLimitPolicy(max_wait=1), lambda: now[0], sleeps)
+
+    limiter.pause(0.5)
+    await limiter.acquire()
+    limiter.pause(2)
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        await limiter.acquire()
+
+    assert sleeps == [0.5]
+    assert exc_info.value.retry_after == 2
+    # Callers handling the auth client's request errors also handle rejections by the rate limiter
+    assert isinstance(exc_info.value, httpx.RequestError)
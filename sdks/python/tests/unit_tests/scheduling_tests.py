@@ -0,0 +1,220 @@
+import asyncio
+
+import pytest
+
+from redactive.scheduling import (
+    FairSchedulingPolicy,
+    Priority,
+    PriorityPolicy,
+    SchedulingMode,
+    UserQuota,
+    UserThrottledError,
+    _FairScheduler,
+    _LaneScheduler,
+    _TokenBucket,
+    _UserQuotas,
+)
+
+
+async def _queue(scheduler: _LaneScheduler, started: list[Priority], priority: Priority) -> asyncio.Task:
+    async def _acquire() -> None:
+        await scheduler.acquire(priority)
+        started.append(priority)
+
+    task = asyncio.ensure_future(_acquire())
+    await asyncio.sleep(0)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_strict_priority():
+    scheduler = _LaneScheduler(PriorityPolicy(max_concurrency=1))
+    started = []
+    await scheduler.acquire(Priority.Batch)
+
+    tasks = [
+        await _queue(scheduler, started, Priority.Batch),
+        await _queue(scheduler, started, Priority.Interactive),
+    ]
+    assert scheduler.stats[Priority.Batch].queued == 1
+    assert scheduler.stats[Priority.Interactive].queued == 1
+
+    scheduler.release(Priority.Batch)
+    await asyncio.sleep(0)
+    scheduler.release(Priority.Interactive)
+    await asyncio.gather(*tasks)
+
+    assert started == [Priority.Interactive, Priority.Batch]
+    assert scheduler.stats[Priority.Interactive].started == 1
+    assert scheduler.stats[Priority.Batch].started == 2
+    assert scheduler.stats[Priority.Batch].max_wait > 0
+
+
+@pytest.mark.asyncio
+async def test_weighted_priority():
+    policy = PriorityPolicy(
+        max_concurrency=1, mode=SchedulingMode.Weighted, weights={Priority.Interactive: 2, Priority.Batch: 1}
+    )
+    scheduler = _LaneScheduler(policy)
+    started = []
+    await scheduler.acquire(Priority.Batch)
+    tasks = [
+        await _queue(scheduler, started, priority) for priority in [Priority.Batch] * 3 + [Priority.Interactive] * 3
+    ]
+
+    for _ in tasks:
+        scheduler.release(started[-1] if started else Priority.Batch)
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert started[:3] == [Priority.Interactive, Priority.Batch, Priority.Interactive]
+
+
+@pytest.mark.asyncio
+async def test_interactive_reserve():
+    scheduler = _LaneScheduler(PriorityPolicy(max_concurrency=2, interactive_reserve=1))
+    await scheduler.acquire(Priority.Batch)
+
+    with pytest.raises(TimeoutError):
+        await scheduler.acquire(Priority.Batch, timeout=0.01)
+    await scheduler.acquire(Priority.Interactive, timeout=0.01)
+
+    assert scheduler.stats[Priority.Batch].queued == 0
+    assert scheduler.stats[Priority.Interactive].in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_capacity_follows_limit():
+    limit = [1]
+    scheduler = _LaneScheduler(PriorityPolicy(max_concurrency=10), capacity=lambda: limit[0])
+    await scheduler.acquire(Priority.Interactive)
+
+    with pytest.raises(TimeoutError):
+        await scheduler.acquire(Priority.Interactive, timeout=0.01)
+    limit[0] = 2
+    await scheduler.acquire(Priority.Interactive, timeout=0.01)
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        PriorityPolicy(max_concurrency=1, interactive_reserve=1)
+    with pytest.raises(ValueError):
+        PriorityPolicy(mode="fifo")
+
+
+async def _queue_user(scheduler: _FairScheduler, started: list[str], user_id: str, cost: int = 1) -> asyncio.Task:
+    async def _acquire() -> None:
+        await scheduler.acquire(user_id, cost)
+        started.append(user_id)
+
+    task = asyncio.ensure_future(_acquire())
+    await asyncio.sleep(0)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_fair_scheduler_round_robin():
+    scheduler = _FairScheduler(FairSchedulingPolicy(max_concurrency=1))
+    started = []
+    await scheduler.acquire("heavy")
+    tasks = [await _queue_user(scheduler, started, "heavy") for _ in range(3)]
+    tasks += [await _queue_user(scheduler, started, "light") for _ in range(2)]
+    assert scheduler.stats.queued == 5
+    assert scheduler.stats.waiting_users == 2
+
+    for _ in range(5):
+        scheduler.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert started == ["heavy", "light", "heavy", "light", "heavy"]
+    assert scheduler.stats.waiting_users == 0
+
+
+@pytest.mark.asyncio
+async def test_fair_scheduler_cost():
+    scheduler = _FairScheduler(FairSchedulingPolicy(max_concurrency=1))
+    started = []
+    await scheduler.acquire("other")
+    tasks = [await _queue_user(scheduler, started, "batch", cost=3), await _queue_user(scheduler, started, "light")]
+    tasks += [await _queue_user(scheduler, started, "light") for _ in range(2)]
+
+    for _ in range(4):
+        scheduler.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    # The costly call waits until its user has been credited for three rounds
+    assert started == ["light", "light", "batch", "light"]
+
+
+@pytest.mark.asyncio
+async def test_fair_scheduler_rejects():
+    scheduler = _FairScheduler(FairSchedulingPolicy(max_concurrency=1, max_queued_per_user=1, max_wait=0.01))
+    await scheduler.acquire("user")
+    task = asyncio.ensure_future(scheduler.acquire("user"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(UserThrottledError, match="too many calls queued"):
+        await scheduler.acquire("user")
+    with pytest.raises(UserThrottledError, match="timed out") as exc_info:
+        await task
+    assert exc_info.value.user_id == "user"
+    assert scheduler.stats.rejected == 2
+    assert scheduler.stats.queued == 0
+
+    scheduler.release()
+    await scheduler.acquire("other")
+
+
+def test_token_bucket():
+    now = [0.0]
+    bucket = _TokenBucket(rate=2, burst=2, clock=lambda: now[0])
+
+    assert bucket.reserve(2) == 0
+    assert bucket.reserve(1) is None
+    assert bucket.reserve(1, max_wait=1) == 0.5
+    assert bucket.time_until(1) == 1
+    now[0] = 1.0
+    assert bucket.reserve(1) == 0
+
+
+@pytest.mark.asyncio
+async def test_user_quotas():
+    now = [0.0]
+    quotas = _UserQuotas(UserQuota(searches_per_second=1, search_burst=2), clock=lambda: now[0])
+
+    await quotas.take("user", "search", 2)
+    with pytest.raises(UserThrottledError, match="search quota exceeded") as exc_info:
+        await quotas.take("user", "search")
+    assert exc_info.value.retry_after == 1
+    # Other users and operations have their own allowance
+    await quotas.take("other", "search")
+    await quotas.take("user", "document", 100)
+    now[0] = 1.0
+    await quotas.take("user", "search")
+
+
+@pytest.mark.asyncio
+async def test_user_quota_rejects_batch_larger_than_burst():
+    quotas = _UserQuotas(UserQuota(searches_per_second=100, search_burst=5, max_wait=10))
+
+    with pytest.raises(UserThrottledError, match="exceeds the quota burst of 5") as exc_info:
+        await quotas.take("user", "search", 6)
+    assert exc_info.value.retry_after is None
+    # Nothing was taken from the user's allowance
+    await quotas.take("user", "search", 5)
+
+
+def test_invalid_fair_scheduling_policy():
+    with pytest.raises(ValueError):
+        FairSchedulingPolicy(max_concurrency=0)
+
+
+def test_invalid_user_quota():
+    with pytest.raises(ValueError):
+        UserQuota(searches_per_second=0)
+    with pytest.raises(ValueError):
+        UserQuota(document_burst=0)
+    with pytest.raises(ValueError):
+        UserQuota(max_wait=-1)
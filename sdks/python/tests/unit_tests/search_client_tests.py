@@ -1,3 +1,4 @@
+import asyncio
 from unittest import mock
 
 import pytest
@@ -67,3 +68,463 @@ async def test_get_chunks_by_url(mock_channel_context):
         client = SearchClient()
         await client.get_document(access_token, url)
         mock_get_chunks_by_url.assert_called_once_with(GetDocumentRequest(ref=url))
+
+
+@pytest.mark.asyncio
+async def test_channel_is_reused_between_calls():
+    client = SearchClient()
+
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", side_effect=mock.AsyncMock()):
+        await client.search_chunks("test-access_token", "query one")
+        channel = client._pool._channels[0]
+        await client.search_chunks("test-access_token", "query two")
+
+    assert channel is not None
+    assert client._pool._channels[0] is channel
+
+
+@pytest.mark.asyncio
+async def test_channel_is_reset_after_connection_failure():
+    client = SearchClient()
+
+    with (
+        mock.patch("redactive.grpc.v2.SearchStub.search_chunks", side_effect=ConnectionResetError()),
+        pytest.raises(ConnectionResetError),
+    ):
+        await client.search_chunks("test-access_token", "query")
+
+    assert client._pool._channels == [None]
+    assert client.channel_in_flight == [0]
+
+
+@pytest.mark.asyncio
+async def test_channel_is_kept_after_deadline_exceeded():
+    client = SearchClient(timeout=5)
+    release = asyncio.Event()
+
+    async def search_chunks(stub, request):
+        if request.query.semantic_query == "slow":
+            # grpclib raises TimeoutError once the deadline has passed
+            raise TimeoutError
+        await release.wait()
+
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", autospec=True, side_effect=search_chunks):
+        in_flight = asyncio.create_task(client.search_chunks("test-access_token", "fast"))
+        await asyncio.sleep(0)
+        channel = client._pool._channels[0]
+        channel.close = mock.Mock()
+        with pytest.raises(TimeoutError):
+            await client.search_chunks("test-access_token", "slow")
+        release.set()
+        await in_flight
+
+    channel.close.assert_not_called()
+    assert client._pool._channels[0] is channel
+    assert client.channel_in_flight == [0]
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_channel():
+    async with SearchClient() as client:
+        with mock.patch("redactive.grpc.v2.SearchStub.get_document", side_effect=mock.AsyncMock()):
+            await client.get_document("test-access_token", "https://example.com")
+        channel = client._pool._channels[0]
+        channel.close = mock.Mock()
+
+    channel.close.assert_called_once()
+    assert client._pool._channels == [None]
+
+
+@pytest.mark.asyncio
+async def test_calls_are_dispatched_to_least_loaded_channel():
+    client = SearchClient(pool_size=3)
+    release = asyncio.Event()
+    used_channels = []
+
+    async def slow_search_chunks(stub, request):
+        used_channels.append(stub.channel)
+        await release.wait()
+
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", autospec=True, side_effect=slow_search_chunks):
+        tasks = [asyncio.create_task(client.search_chunks("test-access_token", f"query {i}")) for i in range(4)]
+        await asyncio.sleep(0)
+        assert sorted(client.channel_in_flight) == [1, 1, 2]
+        release.set()
+        await asyncio.gather(*tasks)
+
+    assert len(set(map(id, used_channels))) == 3
+    assert client.channel_in_flight == [0, 0, 0]
+
+
+def test_pool_size_must_be_positive():
+    with pytest.raises(ValueError):
+        SearchClient(pool_size=0)
+
+
+@pytest.mark.asyncio
+async def test_search_chunks_many_preserves_order_and_errors():
+    from redactive.grpc.v2 import SearchChunksResponse
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_search_chunks(stub, request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01 if request.query.semantic_query == "first" else 0)
+        in_flight -= 1
+        if request.query.semantic_query == "broken":
+            raise RuntimeError(request.query.semantic_query)
+        return SearchChunksResponse(success=True, providers_used=[request.query.semantic_query])
+
+    queries = ["first", "broken", "third", "fourth", "fifth"]
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", autospec=True, side_effect=fake_search_chunks):
+        client = SearchClient()
+        results = await client.search_chunks_many("test-access_token", queries, count=3, max_concurrency=2)
+
+    assert max_in_flight == 2
+    assert isinstance(results[1], RuntimeError)
+    assert [r.providers_used[0] for i, r in enumerate(results) if i != 1] == ["first", "third", "fourth", "fifth"]
+
+
+@pytest.mark.asyncio
+async def test_search_chunks_many_raises_cancellation():
+    async def fake_search_chunks(stub, request):
+        if request.query.semantic_query == "cancelled":
+            raise asyncio.CancelledError
+
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", autospec=True, side_effect=fake_search_chunks):
+        client = SearchClient()
+        with pytest.raises(asyncio.CancelledError):
+            await client.search_chunks_many("test-access_token", ["first", "cancelled"])
+
+
+@pytest.mark.asyncio
+async def test_search_chunks_uses_cache():
+    from redactive.caching import SearchCache
+    from redactive.grpc.v2 import SearchChunksResponse
+
+    cache = SearchCache()
+    client = SearchClient(search_cache=cache)
+    with mock.patch(
+        "redactive.grpc.v2.SearchStub.search_chunks", return_value=SearchChunksResponse(success=True)
+    ) as mock_search_chunks:
+        await client.search_chunks("test-access_token", "query")
+        await client.search_chunks("test-access_token", "query")
+        await client.search_chunks("other-access_token", "query")
+
+    assert mock_search_chunks.call_count == 2
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_get_document_uses_cache_while_version_is_current():
+    from redactive.caching import DocumentCache
+    from redactive.grpc.v2 import Chunk, GetDocumentResponse, SourceReference
+
+    document = GetDocumentResponse(
+        success=True, chunks=[Chunk(source=SourceReference(document_version="v1"), chunk_body="body")]
+    )
+    client = SearchClient(document_cache=DocumentCache())
+    with mock.patch("redactive.grpc.v2.SearchStub.get_document", return_value=document) as mock_get_document:
+        await client.get_document("test-access_token", "https://example.com")
+        cached = await client.get_document("test-access_token", "https://example.com")
+        await client.get_document("test-access_token", "https://example.com", document_version="v2")
+
+    assert cached == document
+    assert mock_get_document.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_are_coalesced():
+    from redactive.grpc.v2 import SearchChunksResponse
+
+    async def slow_search_chunks(stub, request):
+        await asyncio.sleep(0.01)
+        return SearchChunksResponse(success=True)
+
+    client = SearchClient(coalesce_requests=True)
+    with mock.patch(
+        "redactive.grpc.v2.SearchStub.search_chunks", autospec=True, side_effect=slow_search_chunks
+    ) as mock_search_chunks:
+        await asyncio.gather(
+            client.search_chunks("test-access_token", "query"),
+            client.search_chunks("test-access_token", "query"),
+            client.search_chunks("other-access_token", "query"),
+            client.search_chunks("test-access_token", "other query"),
+        )
+
+    assert mock_search_chunks.call_count == 3
+    assert client.coalesced_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_document_decodes_chunks_lazily():
+    from redactive.grpc.v2 import Chunk, GetDocumentResponse
+
+    response = GetDocumentResponse(success=True, chunks=[Chunk(chunk_body=f"chunk {i}") for i in range(3)])
+    client = SearchClient()
+    with (
+        mock.patch("redactive.grpc.v2.SearchStub._unary_unary", return_value=bytes(response)),
+        mock.patch.object(Chunk, "parse", autospec=True, side_effect=Chunk.parse) as mock_parse,
+    ):
+        async for chunk in client.iter_document("test-access_token", "https://example.com"):
+            assert chunk.chunk_body == "chunk 0"
+            break
+
+    mock_parse.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_iter_document_raises_on_failure():
+    from redactive.grpc.v2 import GetDocumentResponse
+    from redactive.search_client import DocumentRetrievalError
+
+    client = SearchClient()
+    with (
+        mock.patch("redactive.grpc.v2.SearchStub._unary_unary", return_value=bytes(GetDocumentResponse())),
+        pytest.raises(DocumentRetrievalError),
+    ):
+        async for _ in client.iter_document("test-access_token", "https://example.com"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_iter_document_uses_streaming_rpc_when_available():
+    from redactive.grpc.v2 import Chunk, GetDocumentResponse
+
+    class StreamingSearchClient(SearchClient):
+        document_stream_route = "/redactive.grpc.v2.Search/StreamDocument"
+
+    messages = [
+        bytes(GetDocumentResponse(success=True, chunks=[Chunk(chunk_body="first"), Chunk(chunk_body="second")])),
+        bytes(GetDocumentResponse(success=True, chunks=[Chunk(chunk_body="third")])),
+    ]
+    stream = mock.AsyncMock()
+    stream.__aenter__.return_value = stream
+    stream.recv_message.side_effect = [*messages, None]
+
+    client = StreamingSearchClient()
+    with mock.patch("grpclib.client.Channel.request", return_value=stream) as mock_request:
+        chunks = [chunk.chunk_body async for chunk in client.iter_document("test-access_token", "https://example.com")]
+
+    assert chunks == ["first", "second", "third"]
+    assert mock_request.call_args.args[0] == "/redactive.grpc.v2.Search/StreamDocument"
+
+
+@pytest.mark.asyncio
+async def test_streamed_document_is_admitted_and_retried():
+    from grpclib.const import Status
+    from grpclib.exceptions import GRPCError
+
+    from redactive.grpc.v2 import Chunk, GetDocumentResponse
+    from redactive.resilience import CircuitBreakerPolicy, RetryPolicy
+    from redactive.scheduling import Priority, PriorityPolicy
+
+    class StreamingSearchClient(SearchClient):
+        document_stream_route = "/redactive.grpc.v2.Search/StreamDocument"
+
+    unavailable = mock.AsyncMock()
+    unavailable.__aenter__.return_value = unavailable
+    unavailable.recv_message.side_effect = GRPCError(Status.UNAVAILABLE)
+    stream = mock.AsyncMock()
+    stream.__aenter__.return_value = stream
+    stream.recv_message.side_effect = [
+        bytes(GetDocumentResponse(success=True, chunks=[Chunk(chunk_body="first")])),
+        None,
+    ]
+
+    client = StreamingSearchClient(
+        retry_policy=RetryPolicy(initial_backoff=0),
+        circuit_breaker=CircuitBreakerPolicy(),
+        priorities=PriorityPolicy(max_concurrency=1),
+    )
+    with mock.patch("grpclib.client.Channel.request", side_effect=[unavailable, stream]) as mock_request:
+        chunks = [
+            chunk.chunk_body
+            async for chunk in client.iter_document("test-access_token", "https://example.com", timeout=5)
+        ]
+
+    assert chunks == ["first"]
+    assert client.retry_stats.retries == 1
+    assert mock_request.call_args.kwargs["deadline"] is not None
+    assert client.lane_stats[Priority.Interactive].started == 2
+    assert client.lane_stats[Priority.Interactive].in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_search_chunks_lazy_decoding():
+    from redactive.caching import SearchCache
+    from redactive.grpc.v2 import RelevantChunk, SearchChunksResponse
+    from redactive.lazy import LazyMessage
+
+    response = SearchChunksResponse(success=True, relevant_chunks=[RelevantChunk(chunk_body="body")])
+    client = SearchClient(search_cache=SearchCache(), lazy_decoding=True)
+    with mock.patch("redactive.grpc.v2.SearchStub._unary_unary", return_value=bytes(response)) as mock_unary_unary:
+        first = await client.search_chunks("test-access_token", "query")
+        second = await client.search_chunks("test-access_token", "query")
+
+    mock_unary_unary.assert_called_once()
+    for result in (first, second):
+        assert isinstance(result, LazyMessage)
+        assert result.relevant_chunks[0].chunk_body == "body"
+        assert result == response
+
+
+@pytest.mark.asyncio
+async def test_search_chunks_protobuf_codec():
+    from redactive.grpc.v2 import RelevantChunk, SearchChunksResponse
+
+    response = SearchChunksResponse(success=True, relevant_chunks=[RelevantChunk(chunk_body="body")])
+    client = SearchClient(codec="protobuf")
+    with mock.patch("redactive.grpc.v2.SearchStub._unary_unary", return_value=bytes(response)):
+        result = await client.search_chunks("test-access_token", "query")
+
+    assert isinstance(result, SearchChunksResponse)
+    assert result == response
+
+
+def test_invalid_codec():
+    with pytest.raises(ValueError):
+        SearchClient(codec="json")
+
+
+@pytest.mark.asyncio
+async def test_call_deadline():
+    deadlines = [mock.sentinel.default_deadline, mock.sentinel.call_deadline]
+    client = SearchClient(timeout=5)
+    with (
+        mock.patch("redactive.search_client.SearchStub") as mock_stub,
+        mock.patch("grpclib.metadata.Deadline.from_timeout", side_effect=deadlines) as mock_from_timeout,
+    ):
+        mock_stub.return_value.search_chunks = mock.AsyncMock()
+        mock_stub.return_value.get_document = mock.AsyncMock()
+        await client.search_chunks("test-access_token", "query")
+        await client.get_document("test-access_token", "https://example.com", timeout=0.5)
+
+    assert [call.args for call in mock_from_timeout.call_args_list] == [(5,), (0.5,)]
+    assert [call.kwargs["deadline"] for call in mock_stub.call_args_list] == [
+        mock.sentinel.default_deadline,
+        mock.sentinel.call_deadline,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_slow_search_is_hedged():
+    from redactive.grpc.v2 import SearchChunksResponse
+    from redactive.resilience import HedgingPolicy
+
+    responses = [SearchChunksResponse(providers_used=["slow"]), SearchChunksResponse(providers_used=["fast"])]
+    delays = [1, 0]
+
+    async def _search_chunks(_):
+        response = responses.pop(0)
+        await asyncio.sleep(delays.pop(0))
+        return response
+
+    client = SearchClient(hedging=HedgingPolicy(initial_delay=0.01, max_hedge_ratio=1))
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", side_effect=_search_chunks):
+        response = await client.search_chunks("test-access_token", "query")
+
+    assert response.providers_used == ["fast"]
+    assert client.hedged_calls == 1
+    await asyncio.sleep(0)
+    assert client.channel_in_flight == [0]
+
+
+@pytest.mark.asyncio
+async def test_unavailable_search_is_retried():
+    from grpclib.const import Status
+    from grpclib.exceptions import GRPCError
+
+    from redactive.grpc.v2 import SearchChunksResponse
+    from redactive.resilience import RetryPolicy
+
+    response = SearchChunksResponse(success=True)
+    client = SearchClient(retry_policy=RetryPolicy(initial_backoff=0))
+    with mock.patch(
+        "redactive.grpc.v2.SearchStub.search_chunks",
+        side_effect=[GRPCError(Status.UNAVAILABLE), ConnectionResetError(), response],
+    ):
+        assert await client.search_chunks("test-access_token", "query") is response
+
+    assert client.retry_stats.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_precondition_is_not_retried():
+    from grpclib.const import Status
+    from grpclib.exceptions import GRPCError
+
+    from redactive.resilience import RetryPolicy
+
+    client = SearchClient(retry_policy=RetryPolicy(initial_backoff=0))
+    with (
+        mock.patch("redactive.grpc.v2.SearchStub.search_chunks", side_effect=GRPCError(Status.FAILED_PRECONDITION)),
+        pytest.raises(GRPCError),
+    ):
+        await client.search_chunks("test-access_token", "query")
+
+    assert client.retry_stats.attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_on_failures():
+    from grpclib.const import Status
+    from grpclib.exceptions import GRPCError
+
+    from redactive.resilience import CircuitBreakerPolicy, CircuitOpenError, CircuitState
+
+    client = SearchClient(circuit_breaker=CircuitBreakerPolicy(minimum_calls=2))
+    with mock.patch(
+        "redactive.grpc.v2.SearchStub.search_chunks", side_effect=GRPCError(Status.UNAVAILABLE)
+    ) as mock_search_chunks:
+        for _ in range(2):
+            with pytest.raises(GRPCError):
+                await client.search_chunks("test-access_token", "query")
+        with pytest.raises(CircuitOpenError):
+            await client.search_chunks("test-access_token", "query")
+
+    assert client.circuit_state == CircuitState.Open
+    assert mock_search_chunks.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_releases_slots():
+    from redactive.resilience import ConcurrencyLimitPolicy
+
+    client = SearchClient(concurrency_limit=ConcurrencyLimitPolicy(initial_limit=1))
+    with mock.patch("redactive.grpc.v2.SearchStub.search_chunks", side_effect=mock.AsyncMock()):
+        await asyncio.gather(*(client.search_chunks("test-access_token", f"query {i}") for i in range(3)))
+
+    assert client.concurrency_limit_stats.in_flight == 0
+    assert client.concurrency_limit_stats.limit > 1
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_take_precedence():
+    from redactive.scheduling import Priority, PriorityPolicy
+
+    order = []
+    release = asyncio.Event()
+
+    async def _get_document(request):
+        order.append(request.ref)
+        await release.wait()
+
+    client = SearchClient(priorities=PriorityPolicy(max_concurrency=1))
+    with mock.patch("redactive.grpc.v2.SearchStub.get_document", side_effect=_get_document):
+        calls = [
+            asyncio.ensure_future(client.get_document("test-access_token", f"batch {i}", priority=Priority.Batch))
+            for i in range(2)
+        ]
+        await asyncio.sleep(0)
+        calls.append(asyncio.ensure_future(client.get_document("test-access_token", "interactive")))
+        await asyncio.sleep(0)
+        assert client.lane_stats[Priority.Batch].queued == 1
+        release.set()
+        await asyncio.gather(*calls)
+
+    assert order == ["batch 0", "interactive", "batch 1"]
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from redactive._singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_coalesced():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert single_flight.coalesced == 4
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_caller_does_not_cancel_shared_call():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "result"
+
+    first = asyncio.create_task(single_flight.do("key", fetch))
+    second = asyncio.create_task(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "result"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_shared_call_is_cancelled_when_last_caller_cancels():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.create_task(single_flight.do("key", fetch))
+    await started.wait()
+    caller.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0)
+
+    assert caller.cancelled()
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_abandoned_call_runs_to_completion():
+    single_flight = SingleFlight(cancel_abandoned=False)
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    caller = asyncio.create_task(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    caller.cancel()
+    await asyncio.sleep(0)
+
+    joined = asyncio.create_task(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await joined == "result"
+    assert caller.cancelled()
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_new_caller_does_not_join_cancelled_call():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            # Cancellation takes a while to complete
+            await asyncio.sleep(0.01)
+            raise
+        return "stale"
+
+    caller = asyncio.create_task(single_flight.do("key", fetch))
+    await started.wait()
+    caller.cancel()
+    await asyncio.sleep(0)
+
+    async def fresh_fetch():
+        return "result"
+
+    assert await single_flight.do("key", fresh_fetch) == "result"
+    assert caller.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_cached():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(2)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    with pytest.raises(RuntimeError):
+        await single_flight.do("key", fetch)
+    assert calls == 2
@@ -0,0 +1,54 @@
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+import pytest
+
+from redactive._token_refresh import TokenRefreshScheduler
+
+
+@pytest.fixture
+async def scheduler():
+    new_expiry = datetime.now(UTC) + timedelta(hours=1)
+    scheduler = TokenRefreshScheduler(mock.AsyncMock(return_value=new_expiry), margin=60, jitter=0)
+    yield scheduler
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_refreshes_only_tokens_about_to_expire(scheduler: TokenRefreshScheduler) -> None:
+    scheduler.touch("expiring", datetime.now(UTC) + timedelta(seconds=30))
+    scheduler.touch("fresh", datetime.now(UTC) + timedelta(minutes=30))
+
+    assert await scheduler.run_once() == 1
+    scheduler._refresh.assert_awaited_once_with("expiring")
+    assert await scheduler.run_once() == 0
+    assert scheduler.refreshes == 1
+
+
+@pytest.mark.asyncio
+async def test_inactive_users_are_forgotten(scheduler: TokenRefreshScheduler) -> None:
+    scheduler.active_window = 0
+    scheduler.touch("inactive", datetime.now(UTC))
+
+    assert await scheduler.run_once() == 0
+    assert scheduler.active_users == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_refreshes_are_retried(scheduler: TokenRefreshScheduler) -> None:
+    scheduler._refresh.side_effect = RuntimeError("auth unavailable")
+    scheduler.touch("expiring", datetime.now(UTC))
+
+    assert await scheduler.run_once() == 0
+    assert await scheduler.run_once() == 0
+    assert scheduler.failures == 2
+    assert scheduler.active_users == 1
+
+
+@pytest.mark.asyncio
+async def test_users_without_session_are_forgotten(scheduler: TokenRefreshScheduler) -> None:
+    scheduler._refresh.return_value = None
+    scheduler.touch("signed-out", datetime.now(UTC))
+
+    assert await scheduler.run_once() == 0
+    assert scheduler.active_users == 0